@@ -0,0 +1,216 @@
+# src/benchmarks/e2e_bench.py
+"""
+Offline end-to-end benchmark of the full pipeline against local stand-in services.
+
+    python -m src.benchmarks.e2e_bench [--sizes 100,1000,10000] [--alerts DIR] [--crossref FILE]
+                                       [--doi-links F] [--llm-latency S] [--crossref-latency S] [--profiles N]
+                                       [--baseline PATH] [--update-baseline] [--tolerance 0.3]
+
+For each corpus size, alert emails are served by a fake IMAP server, CrossRef lookups by
+a stub replaying saved (or synthetic) responses, and chat completions by a fake server
+with the given latency. `python -m src.main` then runs in a fresh working directory, and
+its run profile supplies per-stage timings. Wall time, articles/sec per stage and peak
+memory (max RSS) are reported.
+
+--profiles N writes N digest profiles (each with its own instructions) into the working
+directory. Ingest stages should cost the same for any N; only summarization scales with it.
+
+--alerts takes saved alert *.html files; all of them are used and the size is the number of
+articles they hold. --crossref takes responses saved by `matching_bench --record`.
+
+With a baseline file, the run fails (exit 1) when throughput drops, or stage time or
+peak memory grows, by more than --tolerance. --update-baseline writes this run as the new
+baseline instead. Baselines are machine-specific, so record one on the machine that checks it.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from src.benchmarks.fake_services import CrossRefStub, FakeChatServer, FakeImapServer
+from src.benchmarks.fixtures import (
+    ARTICLES_PER_ALERT, load_alert_corpus, load_crossref_responses, render_alert_corpus,
+    synthetic_articles, synthetic_crossref_responses,
+)
+from src.email_client.email_parser import parse_scholar_alerts
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "e2e_baseline.json")
+
+# Timers from the run profile reported as stages, in pipeline order
+STAGES = [
+    "ingest_new_articles", "parse_scholar_alerts", "extract_link_dois", "enrich_articles", "crossref.http",
+    "store_articles",
+    "summarize_articles", "llm.request", "llm.first_token", "generate_summary_report",
+]
+# Stages faster than this in the baseline are too noisy to gate on
+MIN_GATED_SECONDS = 0.05
+
+
+def build_corpus(size: int, alerts_dir: str = None, crossref_path: str = None, doi_links: float = 0.0):
+    """Return (alert HTML bodies, CrossRef responses, article count)."""
+    if alerts_dir:
+        bodies = load_alert_corpus(alerts_dir)
+        articles = [a for parsed in parse_scholar_alerts(bodies, workers=1) for a in parsed]
+    else:
+        articles = synthetic_articles(size, distinct=True, doi_links=doi_links)
+        bodies = render_alert_corpus(articles, ARTICLES_PER_ALERT)
+    responses = load_crossref_responses(crossref_path) if crossref_path else synthetic_crossref_responses(articles)
+    return bodies, responses, len(articles)
+
+
+def write_profiles(workdir: str, count: int) -> None:
+    """Write count digest profiles whose prompts differ, so every profile makes its own LLM calls."""
+    profiles = {
+        f"team-{i}": {"instructions": f"You are a scholarly assistant writing the weekly digest for research team {i}."}
+        for i in range(1, count + 1)
+    }
+    with open(os.path.join(workdir, "profiles.json"), "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2)
+
+
+def run_pipeline(env: dict, workdir: str):
+    """Run `python -m src.main` in workdir. Returns (exit code, wall seconds, max RSS in MB)."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "src.main"], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    # Read stderr to EOF before waiting, so a full pipe can't block the child (it logs every email)
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        sys.stderr.write(stderr.decode(errors="replace")[-4000:])
+    return process.returncode, time.perf_counter() - start, usage.ru_maxrss / 1024
+
+
+def bench_size(size: int, args) -> dict:
+    bodies, responses, num_articles = build_corpus(size, args.alerts, args.crossref, args.doi_links)
+    imap = FakeImapServer(bodies)
+    crossref = CrossRefStub(responses, latency=args.crossref_latency)
+    chat = FakeChatServer(latency=args.llm_latency)
+    imap.start(), crossref.start(), chat.start()
+
+    workdir = tempfile.mkdtemp(prefix=f"scholar-bench-{size}-")
+    if args.profiles:
+        write_profiles(workdir, args.profiles)
+    env = dict(
+        os.environ,
+        PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        EMAIL_SERVER="127.0.0.1", EMAIL_IMAP_PORT=str(imap.port), EMAIL_USE_SSL="0",
+        EMAIL_USERNAME="bench@example.org", EMAIL_PASSWORD="bench",
+        CROSSREF_API_URL=f"http://127.0.0.1:{crossref.port}/works", CROSSREF_RATE_LIMIT="0",
+        OPENAI_API_BASE=chat.api_base, OPENAI_API_KEY="bench",
+    )
+    try:
+        code, wall, peak_rss_mb = run_pipeline(env, workdir)
+        profiles = sorted(glob.glob(os.path.join(workdir, "data", "profiles", "run_profile_*.json")))
+        profile = {}
+        if profiles:
+            with open(profiles[-1], "r", encoding="utf-8") as f:
+                profile = json.load(f)
+    finally:
+        llm_calls = chat.calls
+        imap.stop(), crossref.stop(), chat.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    timers = profile.get("timers", {})
+    stages = {
+        name: {"seconds": timers[name]["seconds"],
+               "articles_per_sec": round(num_articles / timers[name]["seconds"], 1) if timers[name]["seconds"] else None}
+        for name in STAGES if name in timers
+    }
+    return {
+        "articles": num_articles,
+        "emails": len(bodies),
+        "exit_code": code,
+        "unread_left": imap.unread,
+        "llm_calls": llm_calls,
+        "wall_seconds": round(wall, 3),
+        "articles_per_sec": round(num_articles / wall, 1),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "stages": stages,
+        "counters": profile.get("counters", {}),
+    }
+
+
+def print_result(size, result) -> None:
+    print(f"\n== {result['articles']} articles / {result['emails']} emails "
+          f"(exit {result['exit_code']}, {result['unread_left']} left unread, {result['llm_calls']} LLM calls) ==")
+    print(f"  {'main.main (wall)':<26}{result['wall_seconds']:>10.2f}s{result['articles_per_sec']:>12,.1f} articles/s")
+    for name, stage in result["stages"].items():
+        rate = f"{stage['articles_per_sec']:>12,.1f} articles/s" if stage["articles_per_sec"] else ""
+        print(f"  {name:<26}{stage['seconds']:>10.2f}s{rate}")
+    print(f"  {'peak memory (max RSS)':<26}{result['peak_rss_mb']:>10.1f} MB")
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float):
+    problems = []
+    for size, result in results.items():
+        base = baseline.get(size)
+        if not base:
+            continue
+        if result["articles_per_sec"] < base["articles_per_sec"] * (1 - tolerance):
+            problems.append(f"{size}: throughput {result['articles_per_sec']} < baseline {base['articles_per_sec']}")
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{size}: peak memory {result['peak_rss_mb']} MB > baseline {base['peak_rss_mb']} MB")
+        for name, stage in result["stages"].items():
+            base_seconds = base.get("stages", {}).get(name, {}).get("seconds", 0)
+            if base_seconds >= MIN_GATED_SECONDS and stage["seconds"] > base_seconds * (1 + tolerance):
+                problems.append(f"{size}: {name} took {stage['seconds']:.2f}s > baseline {base_seconds:.2f}s")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma-separated article counts")
+    parser.add_argument("--alerts", help="directory of saved alert *.html files instead of a synthetic corpus")
+    parser.add_argument("--crossref", help="saved CrossRef responses (matching_bench --record format)")
+    parser.add_argument("--doi-links", type=float, default=0.6,
+                        help="share of synthetic article links that carry a DOI")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake chat completion")
+    parser.add_argument("--crossref-latency", type=float, default=0.0, help="seconds per CrossRef stub request")
+    parser.add_argument("--profiles", type=int, default=0, help="digest profiles to summarize (0: no profiles file)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed regression, as a fraction")
+    parser.add_argument("--keep", action="store_true", help="keep the per-size working directories")
+    args = parser.parse_args(argv)
+
+    sizes = [0] if args.alerts else [int(size) for size in args.sizes.split(",")]
+    results = {}
+    for size in sizes:
+        result = bench_size(size, args)
+        results[str(result["articles"])] = result
+        print_result(size, result)
+        if result["exit_code"] != 0:
+            print(f"Pipeline failed for {result['articles']} articles.")
+            return 1
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    problems = find_regressions(results, baseline, args.tolerance)
+    if problems:
+        print("\nRegressions against baseline:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
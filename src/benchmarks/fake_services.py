@@ -0,0 +1,350 @@
+# src/benchmarks/fake_services.py
+"""
+Local stand-ins for the services the pipeline talks to, for offline benchmarks:
+an IMAP server holding alert emails, a CrossRef works endpoint replaying saved
+responses, and an OpenAI-style chat-completion server with configurable latency.
+Each runs on 127.0.0.1 in background threads; start() returns the bound port.
+"""
+import json
+import re
+import select
+import socket
+import socketserver
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from src.utils.text import normalize_title
+
+
+class _Service:
+    server = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def _serve(self, server) -> int:
+        self.server = server
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self.port
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+# --- IMAP ---------------------------------------------------------------------
+
+def _parse_message_set(message_set: str, last: int) -> List[int]:
+    numbers = []
+    for part in message_set.split(","):
+        lo, _, hi = part.partition(":")
+        lo = last if lo == "*" else int(lo)
+        hi = lo if not hi else (last if hi == "*" else int(hi))
+        numbers.extend(range(min(lo, hi), max(lo, hi) + 1))
+    return numbers
+
+
+class _ImapHandler(socketserver.StreamRequestHandler):
+    """The subset of IMAP4rev1 the fetcher uses: LOGIN, SELECT, UID SEARCH/FETCH/STORE, IDLE, CLOSE, LOGOUT."""
+
+    # Message count last reported to this client with "* N EXISTS"
+    reported_exists = 0
+
+    def setup(self):
+        super().setup()
+        self.server.connections.add(self.connection)
+
+    def finish(self):
+        self.server.connections.discard(self.connection)
+        super().finish()
+
+    def send(self, line) -> None:
+        self.wfile.write((line if isinstance(line, bytes) else line.encode()) + b"\r\n")
+
+    def handle(self):
+        mailbox = self.server.mailbox
+        self.send("* OK [CAPABILITY IMAP4rev1 IDLE] fake IMAP ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            tag, _, rest = line.decode().strip().partition(" ")
+            command, _, args = rest.partition(" ")
+            command = command.upper()
+            if command == "UID":
+                command, _, args = args.partition(" ")
+                command = "UID " + command.upper()
+            handler = getattr(self, "cmd_" + command.replace(" ", "_"), None)
+            if handler is None:
+                self.send(f"{tag} BAD unsupported command {command}")
+                continue
+            if handler(tag, args, mailbox) is False:
+                return
+
+    def cmd_CAPABILITY(self, tag, args, mailbox):
+        self.send("* CAPABILITY IMAP4rev1 IDLE")
+        self.send(f"{tag} OK CAPABILITY completed")
+
+    def cmd_NOOP(self, tag, args, mailbox):
+        self.send(f"{tag} OK NOOP completed")
+
+    def cmd_LOGIN(self, tag, args, mailbox):
+        self.send(f"{tag} OK LOGIN completed")
+
+    def cmd_SELECT(self, tag, args, mailbox):
+        self.reported_exists = len(mailbox.messages)
+        self.send(f"* {self.reported_exists} EXISTS")
+        self.send("* FLAGS (\\Seen)")
+        self.send(f"{tag} OK [READ-WRITE] SELECT completed")
+
+    def cmd_UID_SEARCH(self, tag, args, mailbox):
+        with mailbox.lock:
+            uids = [str(uid) for uid in sorted(mailbox.messages) if uid not in mailbox.seen]
+        self.send("* SEARCH " + " ".join(uids) if uids else "* SEARCH")
+        self.send(f"{tag} OK SEARCH completed")
+
+    def cmd_UID_FETCH(self, tag, args, mailbox):
+        message_set, _, items = args.partition(" ")
+        items = items.upper()
+        last = max(mailbox.messages, default=0)
+        for seq, uid in enumerate(_parse_message_set(message_set, last), start=1):
+            body = mailbox.messages.get(uid)
+            if body is None:
+                continue
+            if "BODYSTRUCTURE" in items:
+                lines = body.count(b"\n") + 1
+                self.send(
+                    f'* {seq} FETCH (UID {uid} BODYSTRUCTURE ("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "8BIT" '
+                    f'{len(body)} {lines}))'
+                )
+            else:
+                section = re.search(r"BODY\.PEEK\[([^\]]*)\]", items).group(1)
+                self.wfile.write(f"* {seq} FETCH (UID {uid} BODY[{section}] {{{len(body)}}}\r\n".encode())
+                self.wfile.write(body)
+                self.send(")")
+        self.send(f"{tag} OK FETCH completed")
+
+    def cmd_UID_STORE(self, tag, args, mailbox):
+        message_set, _, _ = args.partition(" ")
+        last = max(mailbox.messages, default=0)
+        with mailbox.lock:
+            for seq, uid in enumerate(_parse_message_set(message_set, last), start=1):
+                if uid in mailbox.messages:
+                    mailbox.seen.add(uid)
+                    self.send(f"* {seq} FETCH (UID {uid} FLAGS (\\Seen))")
+        self.send(f"{tag} OK STORE completed")
+
+    def cmd_IDLE(self, tag, args, mailbox):
+        # Report new messages as they arrive until the client sends DONE
+        self.send("+ idling")
+        while True:
+            with mailbox.lock:
+                count = len(mailbox.messages)
+            if count != self.reported_exists:
+                self.reported_exists = count
+                self.send(f"* {count} EXISTS")
+            if select.select([self.connection], [], [], 0.05)[0]:
+                line = self.rfile.readline()
+                if not line:
+                    return False
+                if line.strip().upper() == b"DONE":
+                    break
+        self.send(f"{tag} OK IDLE terminated")
+
+    def cmd_CLOSE(self, tag, args, mailbox):
+        self.send(f"{tag} OK CLOSE completed")
+
+    def cmd_LOGOUT(self, tag, args, mailbox):
+        self.send("* BYE logging out")
+        self.send(f"{tag} OK LOGOUT completed")
+        return False
+
+
+class _Mailbox:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.messages: Dict[int, bytes] = {}
+        self.seen = set()
+
+
+class FakeImapServer(_Service):
+    """Serves the given HTML alert bodies as unread single-part text/html messages."""
+
+    def __init__(self, html_bodies: List[str] = ()):
+        self.mailbox = _Mailbox()
+        self.add_messages(html_bodies)
+
+    def add_messages(self, html_bodies: List[str]) -> None:
+        with self.mailbox.lock:
+            next_uid = max(self.mailbox.messages, default=0) + 1
+            for uid, body in enumerate(html_bodies, start=next_uid):
+                self.mailbox.messages[uid] = body.encode("utf-8")
+
+    @property
+    def unread(self) -> int:
+        with self.mailbox.lock:
+            return len(self.mailbox.messages) - len(self.mailbox.seen)
+
+    def drop_connections(self) -> None:
+        """Close every open client connection without a BYE, like a server restart or network drop."""
+        for connection in list(self.server.connections):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def start(self) -> int:
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _ImapHandler)
+        server.daemon_threads = True
+        server.mailbox = self.mailbox
+        server.connections = set()
+        return self._serve(server)
+
+
+# --- CrossRef -----------------------------------------------------------------
+
+class _CrossRefHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        rows = int(query.get("rows", ["10"])[0])
+        time.sleep(self.server.latency)
+        message = {}
+        doi = urllib.parse.unquote(url.path.partition("/works/")[2]).lower()
+        if doi:
+            # /works/{doi}: the record itself, or 404
+            if doi not in self.server.items_by_doi:
+                self.send_error(404)
+                return
+            self.send_json(self.server.items_by_doi[doi])
+            return
+        if "filter" in query:
+            # filter=doi:A,doi:B with cursor paging: the cursor is the offset into the matches.
+            # Like CrossRef, a part that isn't a doi: filter (a DOI's comma split it) is a 400
+            parts = query["filter"][0].split(",")
+            if not all(part.startswith("doi:") for part in parts):
+                self.send_error(400)
+                return
+            dois = [part[len("doi:"):].lower() for part in parts]
+            matches = [self.server.items_by_doi[doi] for doi in dois if doi in self.server.items_by_doi]
+            cursor = query.get("cursor", ["*"])[0]
+            offset = 0 if cursor == "*" else int(cursor)
+            items = matches[offset:offset + rows]
+            message["next-cursor"] = str(offset + len(items))
+        else:
+            title = normalize_title(query.get("query.title", [""])[0])
+            items = self.server.responses.get(title, [])[:rows]
+        message["items"] = items
+        self.send_json(message)
+
+    def send_json(self, message):
+        body = json.dumps({"status": "ok", "message": message}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CrossRefStub(_Service):
+    """
+    Replays saved CrossRef works responses: responses maps a normalized query title to
+    the items returned for it. Unknown titles get an empty result. filter=doi: queries
+    and /works/{doi} lookups are answered from the DOIs of all those items.
+    """
+
+    def __init__(self, responses: Dict[str, List[Dict]], latency: float = 0.0):
+        self.responses = responses
+        self.latency = latency
+
+    def start(self) -> int:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _CrossRefHandler)
+        server.daemon_threads = True
+        server.responses, server.latency = self.responses, self.latency
+        server.items_by_doi = {
+            item["DOI"].lower(): item for items in self.responses.values() for item in items if item.get("DOI")
+        }
+        return self._serve(server)
+
+
+# --- Chat completions ---------------------------------------------------------
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = request["messages"][-1]["content"]
+        articles = len(re.findall(r"^\*\*Article \d+:\*\*", prompt, flags=re.MULTILINE))
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.calls += 1
+        content = f"Summary of {articles} articles. " + "Lorem ipsum dolor sit amet. " * self.server.reply_sentences
+        if request.get("stream"):
+            self.stream_reply(request, content)
+            return
+        body = json.dumps({
+            "id": "fake", "object": "chat.completion", "created": 0, "model": request["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+    def stream_reply(self, request, content):
+        """Send the reply as server-sent events, a few words per chunk, like a streamed completion."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        words = content.split(" ")
+        for i in range(0, len(words), 4):
+            piece = " ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "")
+            chunk = {"id": "fake", "object": "chat.completion.chunk", "created": 0, "model": request["model"],
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.token_latency)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class FakeChatServer(_Service):
+    """
+    OpenAI-style /v1/chat/completions that answers every request after `latency` seconds.
+    Streamed requests get their reply in chunks, `token_latency` seconds apart.
+    """
+
+    def __init__(self, latency: float = 0.0, reply_sentences: int = 60, token_latency: float = 0.0):
+        self.latency = latency
+        self.reply_sentences = reply_sentences
+        self.token_latency = token_latency
+
+    @property
+    def calls(self) -> int:
+        return self.server.calls if self.server else 0
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def start(self) -> int:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+        server.daemon_threads = True
+        server.latency, server.reply_sentences = self.latency, self.reply_sentences
+        server.token_latency = self.token_latency
+        server.lock, server.calls = threading.Lock(), 0
+        return self._serve(server)
@@ -0,0 +1,146 @@
+# src/benchmarks/fixtures.py
+import glob
+import html
+import json
+import os
+import random
+import urllib.parse
+from typing import Dict, List
+from src.utils.text import normalize_title
+
+SEED_ARTICLES_PATH = os.path.join("data", "articles.json")
+ARTICLES_PER_ALERT = 10
+
+ALERT_ARTICLE_TEMPLATE = """\
+<h3 style="font-weight:normal;margin:0;font-size:17px;line-height:20px;">{marker}<a href="{href}" class="gse_alrt_title" style="font-size:17px;color:#1a0dab;line-height:22px">{title}</a></h3>
+<div style="color:#006621;line-height:18px">{authors_line}</div>
+<div class="gse_alrt_sni" style="line-height:17px">{snippet}</div>
+<div style="width:auto"><table cellpadding="0" cellspacing="0" border="0"><tbody><tr><td style="padding-right:4px"><a href="https://scholar.google.com/scholar_share?hl=en" style="text-decoration:none;display:inline-block;padding:4px 8px 4px 0"><span style="color:#1a0dab;font-size:13px">Save</span></a></td></tr></tbody></table></div>
+<br>
+"""
+
+ALERT_TEMPLATE = """\
+<!doctype html><html><head><meta http-equiv="Content-Type" content="text/html; charset=UTF-8"></head>
+<body><div style="font-family:arial,sans-serif;font-size:13px;line-height:16px;color:#222;width:100%;max-width:600px">
+<h2 style="font-weight:normal;font-size:16px;line-height:20px;margin:0 0 6px 0">[ passive sensing ]</h2>
+<div style="font-size:13px;line-height:16px;color:#777">New results</div>
+{articles}
+<p style="font-size:11px;color:#777">This message was sent by Google Scholar because you're following new results for [ passive sensing ].</p>
+</div></body></html>
+"""
+
+
+def load_seed_articles(path: str = SEED_ARTICLES_PATH) -> List[Dict]:
+    """Articles used as templates for synthetic alerts."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [a for a in json.load(f) if a.get("title") and a.get("link")]
+
+
+def bench_doi(i: int) -> str:
+    return f"10.5555/bench.{i}"
+
+
+def synthetic_articles(count: int, seed: int = 0, distinct: bool = False, doi_links: float = 0.0) -> List[Dict]:
+    """
+    Make `count` distinct articles by varying seed articles. Each one gets a unique
+    title and link so dedup doesn't collapse them. With distinct, a share of each title's
+    words is also swapped for other words from the seed titles, so the near-duplicate
+    index doesn't merge them either. A `doi_links` share of the links carry the DOI that
+    synthetic_crossref_responses gives the article (doi.org or a publisher /doi/ path).
+    """
+    rng = random.Random(seed)
+    seeds = load_seed_articles()
+    vocabulary = sorted({word for a in seeds for word in a["title"].split() if word.isalpha()})
+    articles = []
+    for i in range(count):
+        base = seeds[i % len(seeds)]
+        article = dict(base)
+        title = base["title"]
+        if distinct:
+            title = " ".join(rng.choice(vocabulary) if rng.random() < 0.5 else word for word in title.split())
+        article["title"] = f"{title} (study {i})"
+        article["link"] = f"https://example.org/articles/{i}"
+        if i % 100 < doi_links * 100:
+            article["link"] = (f"https://doi.org/{bench_doi(i)}" if i % 2 else
+                               f"https://publisher.example.org/doi/full/{bench_doi(i)}")
+        article["authors"] = list(base.get("authors") or ["A Author"])[: rng.randint(1, 4)]
+        article.pop("doi", None)
+        article.pop("added_timestamp", None)
+        articles.append(article)
+    return articles
+
+
+def render_alert_html(articles: List[Dict]) -> str:
+    """Render articles as a Google Scholar alert email body."""
+    blocks = []
+    for i, article in enumerate(articles):
+        href = "https://scholar.google.com/scholar_url?" + urllib.parse.urlencode(
+            {"url": article["link"], "hl": "en", "sa": "X", "scisig": "AAGBfm0"}
+        )
+        year = (article.get("publication_date") or "2024")[:4]
+        authors_line = f"{', '.join(article.get('authors') or [])} - {article.get('source', '')}, {year}"
+        blocks.append(ALERT_ARTICLE_TEMPLATE.format(
+            marker='<span style="font-size:11px;font-weight:bold;color:#1a0dab">[PDF]</span> ' if i % 3 == 0 else "",
+            href=html.escape(href),
+            title=html.escape(article["title"]),
+            authors_line=html.escape(authors_line),
+            snippet=html.escape(article.get("snippet", "")),
+        ))
+    return ALERT_TEMPLATE.format(articles="".join(blocks))
+
+
+def synthetic_alert_corpus(num_articles: int, per_alert: int = ARTICLES_PER_ALERT, seed: int = 0,
+                           distinct: bool = False) -> List[str]:
+    """Render num_articles synthetic articles into alert emails of per_alert articles each."""
+    articles = synthetic_articles(num_articles, seed, distinct)
+    return render_alert_corpus(articles, per_alert)
+
+
+def render_alert_corpus(articles: List[Dict], per_alert: int = ARTICLES_PER_ALERT) -> List[str]:
+    return [render_alert_html(articles[i:i + per_alert]) for i in range(0, len(articles), per_alert)]
+
+
+def crossref_item(article: Dict, doi: str) -> Dict:
+    """A CrossRef works item describing the article, as the API would return it."""
+    year = (article.get("publication_date") or "2024")[:4]
+    item = {
+        "DOI": doi,
+        "title": [article["title"]],
+        "author": [{"given": " ".join(a.split()[:-1]), "family": a.split()[-1]}
+                   for a in article.get("authors") or [] if a.split()],
+        "abstract": f"<jats:p>{html.escape(article.get('snippet', ''))}</jats:p>",
+        "container-title": [article.get("source", "")],
+    }
+    if year.isdigit():
+        item["issued"] = {"date-parts": [[int(year)]]}
+    return item
+
+
+def synthetic_crossref_responses(articles: List[Dict], decoys: int = 4, seed: int = 0) -> Dict[str, List[Dict]]:
+    """
+    CrossRef results per normalized title: the article's own record followed by `decoys`
+    records of other articles, the way a title query returns near misses too.
+    """
+    rng = random.Random(seed)
+    items = [crossref_item(article, bench_doi(i)) for i, article in enumerate(articles)]
+    responses = {}
+    for i, article in enumerate(articles):
+        others = [items[rng.randrange(len(items))] for _ in range(decoys)] if len(items) > 1 else []
+        responses[normalize_title(article["title"])] = [items[i]] + [o for o in others if o is not items[i]]
+    return responses
+
+
+def load_crossref_responses(path: str) -> Dict[str, List[Dict]]:
+    """Saved CrossRef responses in the matching_bench format, keyed by normalized article title."""
+    with open(path, "r", encoding="utf-8") as f:
+        cases = json.load(f)
+    return {normalize_title(case["article"].get("title", "")): case["items"] for case in cases}
+
+
+def load_alert_corpus(directory: str) -> List[str]:
+    """Load saved alert HTML bodies (*.html) from a directory, sorted by filename."""
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            bodies.append(f.read())
+    return bodies
@@ -0,0 +1,74 @@
+# src/benchmarks/import_bench.py
+"""
+Startup benchmark for the command-line entry points.
+
+    python -m src.benchmarks.import_bench [--modules src.main,src.cli] [--repeat 5] [--top 15]
+
+For each module, `python -X importtime -c "import <module>"` runs in a fresh interpreter
+and the self/cumulative import times it prints are summed; the slowest top-level imports
+are listed. Wall-clock startup is also measured for `python -m src.cli --help` and
+`python -m src.cli stats`, the commands cron jobs and quick queries pay for on every call.
+Times are medians over --repeat runs.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+COMMANDS = [["-m", "src.cli", "--help"], ["-m", "src.cli", "stats"]]
+# e.g. "import time:       412 |       1830 |   src.config"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(module: str):
+    """Return (total microseconds, {top-level module: cumulative microseconds}) for one import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    total, top_level = 0, {}
+    for match in IMPORTTIME_LINE.finditer(result.stderr):
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        total += self_us
+        # importtime indents nested imports by two spaces per level
+        if len(indent) == 1:
+            top_level[name] = cumulative_us
+    return total, top_level
+
+
+def wall_time(args) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", default="src.main,src.cli", help="comma-separated modules to import")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to list")
+    args = parser.parse_args(argv)
+
+    for module in args.modules.split(","):
+        runs = [import_times(module) for _ in range(args.repeat)]
+        totals = [total for total, _ in runs]
+        print(f"\n== import {module}: {statistics.median(totals) / 1000:.1f} ms "
+              f"(min {min(totals) / 1000:.1f} ms over {args.repeat} runs) ==")
+        _, top_level = runs[totals.index(sorted(totals)[len(totals) // 2])]
+        for name, cumulative_us in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {name:<40}{cumulative_us / 1000:>10.1f} ms")
+
+    print("\n== wall-clock startup ==")
+    for command in COMMANDS:
+        seconds = statistics.median(wall_time(command) for _ in range(args.repeat))
+        print(f"  python {' '.join(command):<34}{seconds * 1000:>10.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# src/benchmarks/matching_bench.py
+"""
+Precision and throughput of CrossRef candidate matching on a labelled set.
+
+    python -m src.benchmarks.matching_bench [labelled.json] [--threshold T] [--repeat N]
+    python -m src.benchmarks.matching_bench --record labelled.json [--limit N]
+
+labelled.json is a list of {"article": alert article, "items": saved CrossRef items,
+"doi": DOI of the correct item or null if none of the items is the article}.
+--record queries CrossRef for stored articles and saves such a file, with "doi" set to
+the current best match for hand-checking. Without a file, a synthetic set built from
+data/articles.json is used: Scholar-style truncated titles against the true record plus
+the most similar other records as decoys, with the true record left out of every fifth case.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from src.config import CROSSREF_MATCH_THRESHOLD
+from src.benchmarks.fixtures import load_seed_articles
+from src.enrichment.matching import match_articles
+from src.ranking.text_vectors import tokenize
+
+DECOYS_PER_CASE = 9
+
+
+def word_overlap_match(items, original_title):
+    """The previous matcher: share of the alert title's words found in the candidate title, >= 0.2."""
+    original_words = set(original_title.lower().split())
+    best_item, best_score = None, 0.0
+    for item in items:
+        item_words = set((item.get("title") or [""])[0].lower().split())
+        if not item_words or not original_words:
+            continue
+        overlap = len(original_words & item_words) / len(original_words)
+        if overlap > best_score:
+            best_item, best_score = item, overlap
+    return best_item if best_score >= 0.2 else None
+
+
+def _crossref_item(article):
+    year = (article.get("publication_date") or "")[:4]
+    item = {
+        "DOI": article["doi"],
+        "title": [article["title"]],
+        "author": [{"given": " ".join(a.split()[:-1]), "family": a.split()[-1]} for a in article.get("authors", []) if a.split()],
+    }
+    if year.isdigit():
+        item["issued"] = {"date-parts": [[int(year)]]}
+    return item
+
+
+def _alert_view(article):
+    """The article as a Scholar alert shows it: truncated title, initials, year only."""
+    title = article["title"]
+    if len(title) > 70:
+        title = title[:70].rsplit(" ", 1)[0] + "…"
+    authors = [f"{a.split()[0][0]} {a.split()[-1]}" for a in article.get("authors", [])[:3] if a.split()]
+    return {"title": title, "authors": authors, "year": (article.get("publication_date") or "")[:4]}
+
+
+def synthetic_cases(seed: int = 0):
+    seeds = [a for a in load_seed_articles() if a.get("doi") and a.get("title")]
+    words = [set(tokenize(a["title"])) for a in seeds]
+    rng = random.Random(seed)
+    cases = []
+    for i, article in enumerate(seeds):
+        # Decoys: the records sharing the most title words with this one
+        ranked = sorted(
+            (j for j in range(len(seeds)) if j != i and seeds[j]["doi"] != article["doi"]),
+            key=lambda j: len(words[i] & words[j]), reverse=True,
+        )
+        items = [_crossref_item(seeds[j]) for j in ranked[:DECOYS_PER_CASE]]
+        expected = None
+        if i % 5:
+            items.insert(rng.randrange(len(items) + 1), _crossref_item(article))
+            expected = article["doi"]
+        cases.append({"article": _alert_view(article), "items": items, "doi": expected})
+    return cases
+
+
+def record_cases(path: str, limit: int):
+    from src.data_store.db_handler import load_articles
+    from src.enrichment.crossref import clean_title, query_crossref_by_title
+
+    cases = []
+    for article in load_articles()[:limit]:
+        items = query_crossref_by_title(clean_title(article.get("title", ""))) or []
+        best_item, score = match_articles([article], [items])[0]
+        doi = best_item.get("DOI") if best_item and score >= CROSSREF_MATCH_THRESHOLD else None
+        cases.append({"article": article, "items": items, "doi": doi})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cases, f, ensure_ascii=False, indent=2)
+    print(f"Saved {len(cases)} cases to {path}; check the 'doi' labels by hand before benchmarking.")
+
+
+def report(name, chosen, cases, seconds):
+    accepted = [(item, case) for item, case in zip(chosen, cases) if item is not None]
+    correct = sum(1 for item, case in accepted if item.get("DOI", "").lower() == (case["doi"] or "").lower())
+    matchable = sum(1 for case in cases if case["doi"])
+    print(
+        f"{name:<28} precision {correct / len(accepted) if accepted else 0:.1%}  "
+        f"recall {correct / matchable if matchable else 0:.1%}  "
+        f"accepted {len(accepted)}/{len(cases)}  {len(cases) / seconds:,.0f} articles/sec"
+    )
+
+
+def timed(func, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("labelled", nargs="?", help="JSON list of labelled cases (default: synthetic)")
+    parser.add_argument("--threshold", type=float, default=CROSSREF_MATCH_THRESHOLD)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--record", metavar="PATH", help="save CrossRef responses for stored articles to PATH")
+    parser.add_argument("--limit", type=int, default=200, help="articles to record")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_cases(args.record, args.limit)
+        return 0
+
+    if args.labelled:
+        with open(args.labelled, "r", encoding="utf-8") as f:
+            cases = json.load(f)
+    else:
+        cases = synthetic_cases()
+    articles = [case["article"] for case in cases]
+    candidate_lists = [case["items"] for case in cases]
+    print(f"Cases: {len(cases)} ({sum(1 for c in cases if c['doi'])} with a correct candidate)")
+
+    matches, seconds = timed(lambda: match_articles(articles, candidate_lists), args.repeat)
+    chosen = [item if score >= args.threshold else None for item, score in matches]
+    report("n-gram + authors + year", chosen, cases, seconds)
+
+    chosen, seconds = timed(
+        lambda: [word_overlap_match(items, a["title"]) for a, items in zip(articles, candidate_lists)],
+        args.repeat,
+    )
+    report("word overlap (previous)", chosen, cases, seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# src/benchmarks/parser_bench.py
+"""
+Golden check and micro-benchmark for the Scholar alert parsers.
+
+    python -m src.benchmarks.parser_bench [directory of saved alert *.html files] [--emails N] [--workers 1,2,4]
+
+Without a directory, a synthetic corpus rendered from data/articles.json is used.
+Exits non-zero if the fast parser disagrees with the reference parser on any email.
+With --workers, also reports batch throughput of parse_scholar_alerts at each pool size.
+"""
+import argparse
+import sys
+import time
+from src.benchmarks.fixtures import ARTICLES_PER_ALERT, load_alert_corpus, synthetic_alert_corpus
+from src.email_client.email_parser import (
+    FAST_HTML_PARSER, parse_scholar_alert_fast, parse_scholar_alert_reference, parse_scholar_alerts,
+    shutdown_parse_pool,
+)
+
+
+def check_golden(bodies):
+    """Return the indexes of emails where the fast parser's output differs from the reference."""
+    return [i for i, body in enumerate(bodies)
+            if parse_scholar_alert_fast(body) != parse_scholar_alert_reference(body)]
+
+
+def emails_per_second(parse, bodies, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            parse(body)
+        best = min(best, time.perf_counter() - start)
+    return len(bodies) / best if best else float("inf")
+
+
+def pool_emails_per_second(bodies, workers: int) -> float:
+    parse_scholar_alerts(bodies[:workers * 8], workers=workers)  # warm the pool up
+    start = time.perf_counter()
+    parse_scholar_alerts(bodies, workers=workers)
+    return len(bodies) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", help="directory of saved alert *.html files")
+    parser.add_argument("--emails", type=int, default=100, help="synthetic corpus size in emails")
+    parser.add_argument("--workers", default="", help="comma-separated process pool sizes to benchmark")
+    args = parser.parse_args(argv)
+
+    if args.directory:
+        bodies = load_alert_corpus(args.directory)
+    else:
+        bodies = synthetic_alert_corpus(args.emails * ARTICLES_PER_ALERT)
+    if not bodies:
+        print("No alert emails to benchmark.")
+        return 1
+
+    mismatches = check_golden(bodies)
+    reference_rate = emails_per_second(parse_scholar_alert_reference, bodies)
+    fast_rate = emails_per_second(parse_scholar_alert_fast, bodies)
+
+    print(f"Corpus: {len(bodies)} emails")
+    print(f"{'reference (html.parser, tree walk)':<40}{reference_rate:8.1f} emails/sec")
+    print(f"{f'fast ({FAST_HTML_PARSER}, linear pass)':<40}{fast_rate:8.1f} emails/sec")
+    print(f"speedup: {fast_rate / reference_rate:.2f}x")
+    for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+        rate = pool_emails_per_second(bodies, workers)
+        print(f"{f'parse_scholar_alerts, {workers} workers':<40}{rate:8.1f} emails/sec")
+    shutdown_parse_pool()
+
+    if mismatches:
+        print(f"GOLDEN MISMATCH in {len(mismatches)} emails, e.g. #{mismatches[0]}")
+        return 1
+    print("golden: fast parser output matches the reference on every email")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+# src/benchmarks/relevance_bench.py
+"""
+Recall and token savings of the relevance filter on a labelled sample.
+
+    python -m src.benchmarks.relevance_bench labelled.json [--top-k K] [--threshold T]
+
+labelled.json is a list of article dicts, each with a boolean "relevant" field.
+"""
+import argparse
+import json
+import sys
+from src.ranking.relevance import select_relevant
+from src.summarizer.batching import article_tokens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("labelled", help="JSON list of articles with a boolean 'relevant' field")
+    parser.add_argument("--top-k", type=int, default=0)
+    parser.add_argument("--threshold", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    with open(args.labelled, "r", encoding="utf-8") as f:
+        articles = json.load(f)
+    kept, excluded = select_relevant(articles, top_k=args.top_k, threshold=args.threshold)
+
+    relevant = sum(1 for a in articles if a.get("relevant"))
+    kept_relevant = sum(1 for a in kept if a.get("relevant"))
+    tokens_all = sum(article_tokens(a) for a in articles)
+    tokens_kept = sum(article_tokens(a) for a in kept)
+
+    print(f"Articles: {len(articles)} ({relevant} labelled relevant)")
+    print(f"Kept: {len(kept)}, excluded: {len(excluded)}")
+    print(f"Recall: {kept_relevant / relevant:.1%}" if relevant else "Recall: n/a")
+    print(f"Precision: {kept_relevant / len(kept):.1%}" if kept else "Precision: n/a")
+    print(f"Article tokens: {tokens_kept} of {tokens_all} ({1 - tokens_kept / max(tokens_all, 1):.1%} saved)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# src/benchmarks/search_bench.py
+"""
+Query latency of the full-text article index on a large synthetic archive.
+
+    python -m src.benchmarks.search_bench [--articles 100000] [--repeat 20] [--keep PATH]
+
+Builds an article store of --articles synthetic records (stored dates spread over the
+past year) in a temporary database, then times search_articles for a set of queries,
+with and without date and source filters. For comparison it also times the old way of
+answering the same question: load_articles() and a substring scan in Python.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from src.benchmarks.fixtures import synthetic_articles
+from src.data_store import db_handler
+
+QUERIES = [
+    ("sleep", {}),
+    ("actigraphy relapse", {}),
+    ('"digital biomarkers"', {}),
+    ("depress* OR anxiety", {}),
+    ("title:smartphone", {}),
+    ("sleep", {"since": "{quarter_start}", "until": "{today}"}),
+    ("sensing", {"source": "ieee"}),
+    ("COVID-19 sleep/wake", {}),
+]
+
+
+def build_store(count: int) -> float:
+    """Insert count synthetic articles straight into the articles table; returns seconds taken."""
+    rng = random.Random(0)
+    now = datetime.now()
+    articles = synthetic_articles(count, distinct=True)
+    for article in articles:
+        added = now - timedelta(seconds=rng.randrange(365 * 24 * 60 * 60))
+        article["added_timestamp"] = added.strftime("%Y-%m-%d %H:%M:%S")
+    start = time.perf_counter()
+    conn = db_handler.get_connection()
+    # Straight inserts (no dedup or near-duplicate indexing), so only the search triggers are measured
+    for i in range(0, len(articles), db_handler.INSERT_BATCH_SIZE):
+        conn.executemany(
+            "INSERT INTO articles (link, doi, title, title_norm, added_timestamp, data) VALUES (?, ?, ?, ?, ?, ?)",
+            [db_handler._article_row(a) for a in articles[i:i + db_handler.INSERT_BATCH_SIZE]],
+        )
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def time_query(query: str, filters: dict, repeat: int):
+    timings, results = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = db_handler.search_articles(query, **filters)
+        timings.append(time.perf_counter() - start)
+    return timings, len(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", help="build the store at this path and keep it")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="scholar-search-")
+    db_handler.DB_FILE_PATH = args.keep or os.path.join(directory, "articles.db")
+    db_handler.DATA_FILE_PATH = os.path.join(directory, "no-legacy-import.json")
+    seconds = build_store(args.articles)
+    size_mb = os.path.getsize(db_handler.DB_FILE_PATH) / 1e6
+    print(f"Stored and indexed {args.articles} articles in {seconds:.1f}s ({args.articles / seconds:,.0f}/s); "
+          f"database {size_mb:.0f} MB")
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    quarter_start = (datetime.now() - timedelta(days=91)).strftime("%Y-%m-%d")
+    print(f"\n{'query':<34}{'filters':<38}{'hits':>6}{'p50 ms':>10}{'p95 ms':>10}")
+    for query, filters in QUERIES:
+        filters = {key: value.format(today=today, quarter_start=quarter_start) for key, value in filters.items()}
+        timings, hits = time_query(query, filters, args.repeat)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        described = ", ".join(f"{key}={value}" for key, value in filters.items())
+        print(f"{query:<34}{described:<38}{hits:>6}{statistics.median(timings) * 1000:>10.2f}{p95 * 1000:>10.2f}")
+
+    start = time.perf_counter()
+    matches = [a for a in db_handler.load_articles() if "sleep" in (a.get("title", "") + a.get("snippet", "")).lower()]
+    print(f"\nload_articles() + substring scan for 'sleep': {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(matches)} matches, unranked)")
+    db_handler.close_connection()
+    shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
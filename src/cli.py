@@ -0,0 +1,251 @@
+# src/cli.py
+"""
+Command-line interface: python -m src.cli <command> [options]
+
+    run        fetch new alerts, then summarize and report (same as python -m src.main)
+    fetch      fetch, parse, enrich and store new alerts without summarizing
+    enrich     look stored articles without a confident CrossRef match up again
+    summarize  summarize stored articles and write a report
+    report     rewrite the report of a finished run (or the rolling digest) without the LLM
+    search     ranked full-text search over the stored articles
+    watch      stay connected, ingest new alerts as they arrive and summarize periodically
+    stats      show article counts, the incremental watermark and recent runs
+
+Each command imports only the stages it uses, so quick commands such as `stats` and
+`report` never load the IMAP, CrossRef or OpenAI clients.
+"""
+import argparse
+import signal
+import sys
+from src.utils.logger import logger
+
+
+def _add_run_options(parser) -> None:
+    parser.add_argument("--incremental", action="store_true",
+                        help="only articles stored since the previous incremental report")
+    parser.add_argument("--rolling", action="store_true", help="also fold the summary into the rolling digest")
+    parser.add_argument("--recluster", action="store_true", help="refit the cached topic clusters")
+    parser.add_argument("--resume", action="store_true", help="continue the last interrupted run")
+    parser.add_argument("--cprofile", action="store_true", help="also save a cProfile of the run")
+    _add_profile_option(parser)
+
+
+def _add_profile_option(parser) -> None:
+    parser.add_argument("--for", dest="profiles", action="append", metavar="NAME",
+                        help="only this digest profile from the profiles file (repeatable; default: all)")
+
+
+def _profiles_ok(args) -> bool:
+    """Check the profiles file and the --for names before any work starts."""
+    from src.profiles import load_profiles
+
+    try:
+        load_profiles(args.profiles)
+    except ValueError as e:
+        logger.error(str(e))
+        return False
+    return True
+
+
+def _run(args, summarize_only: bool) -> int:
+    from src.main import run_pipeline
+
+    if not _profiles_ok(args):
+        return 2
+
+    options = {
+        "summarize_only": summarize_only,
+        "recluster": args.recluster,
+        "rolling": args.rolling,
+        "incremental": args.incremental or args.rolling,
+        "profiles": args.profiles,
+    }
+    run_pipeline(options, resume=args.resume, cprofile=args.cprofile)
+    return 0
+
+
+def cmd_run(args) -> int:
+    return _run(args, summarize_only=False)
+
+
+def cmd_summarize(args) -> int:
+    return _run(args, summarize_only=True)
+
+
+def cmd_fetch(args) -> int:
+    from src.pipeline import ingest_new_articles
+
+    new_articles = ingest_new_articles()
+    logger.info(f"Stored {len(new_articles)} new articles.")
+    return 0
+
+
+def cmd_enrich(args) -> int:
+    from src.config import CROSSREF_MATCH_THRESHOLD
+    from src.data_store.db_handler import load_articles, update_articles
+    from src.enrichment.crossref import enrich_articles
+
+    articles = [
+        article for article in load_articles()
+        if args.all or not article.get("doi") or article.get("match_confidence", 0.0) < CROSSREF_MATCH_THRESHOLD
+    ]
+    if args.limit:
+        articles = articles[:args.limit]
+    if not articles:
+        logger.info("No stored articles need enrichment.")
+        return 0
+    logger.info(f"Re-enriching {len(articles)} stored articles...")
+    # enrich_articles updates the articles in place, so note their DOIs first
+    old_dois = [article.get("doi") for article in articles]
+    enriched = enrich_articles(articles)
+    changed = [new for old_doi, new in zip(old_dois, enriched) if new.get("doi") and new.get("doi") != old_doi]
+    updated = update_articles(enriched)
+    logger.info(f"Updated {updated} articles; {len(changed)} gained or changed a DOI.")
+    return 0
+
+
+def cmd_report(args) -> int:
+    from src.profiles import get_profile
+
+    profile = get_profile(args.profile_name)
+    if args.digest:
+        from src.data_store.db_handler import get_meta
+        from src.main import DIGEST_KEY
+        from src.renderer.report_generator import generate_digest_report
+
+        digest = get_meta(profile.meta_key(DIGEST_KEY))
+        if not digest:
+            logger.info("No rolling digest yet. Run with --rolling first.")
+            return 1
+        logger.info(f"Rolling digest written to: {generate_digest_report(digest, output_dir=profile.output_dir)}")
+        return 0
+
+    from src.main import rebuild_report, profile_option
+
+    report_path = rebuild_report(args.run, profile_option(profile))
+    if report_path is None:
+        logger.info("No saved summary for that run. Only finished runs can be reported again.")
+        return 1
+    logger.info(f"Summary report generated at: {report_path}")
+    return 0
+
+
+def cmd_search(args) -> int:
+    from src.data_store.db_handler import search_articles
+
+    results = search_articles(" ".join(args.query), since=args.since, until=args.until, source=args.source,
+                              limit=args.limit)
+    if not results:
+        print("No matching articles.")
+        return 1
+    for rank, article in enumerate(results, start=1):
+        added = article.get("added_timestamp", "")[:10]
+        print(f"{rank:>3}. [{article['score']:.2f}] {article.get('title', '')}")
+        print(f"     {added}  {article.get('source', '')}  {article.get('doi') or article.get('link', '')}")
+        if article.get("match"):
+            print(f"     {article['match']}")
+    return 0
+
+
+def cmd_watch(args) -> int:
+    from src.watcher import Watcher
+
+    if not _profiles_ok(args):
+        return 2
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Service managers stop the watcher with SIGTERM; shut down as cleanly as on Ctrl-C
+    signal.signal(signal.SIGTERM, stop)
+    options = {"summarize_only": True, "recluster": args.recluster, "rolling": args.rolling, "incremental": True,
+               "profiles": args.profiles}
+    Watcher(options, batch_seconds=args.window, threshold=args.threshold, summary_hours=args.every,
+            summary_at=args.at).run()
+    return 0
+
+
+def cmd_stats(args) -> int:
+    from src.data_store.db_handler import count_articles, get_meta, max_article_id, load_clusters
+    from src.data_store.run_journal import RunJournal
+    from src.main import WATERMARK_KEY
+    from src.profiles import DEFAULT_PROFILE, load_profiles
+
+    latest = max_article_id()
+    clusters, _ = load_clusters()
+    print(f"Articles stored:      {count_articles()}")
+    for profile in load_profiles():
+        watermark = int(get_meta(profile.meta_key(WATERMARK_KEY), "0"))
+        label = "" if profile.name == DEFAULT_PROFILE else f" [{profile.name}]"
+        print(f"Awaiting incremental{label}: {max(latest - watermark, 0)} (watermark #{watermark})")
+    print(f"Topic clusters:       {len(clusters)}")
+    runs = RunJournal.recent_runs(args.runs)
+    if runs:
+        print("Recent runs:")
+    for run in runs:
+        error = f"  {run['error']}" if run["error"] else ""
+        profile = f"  [{run['profile']}]" if run["profile"] else ""
+        print(f"  #{run['id']:<5} {run['started']}  {run['status']:<9}{profile}{error}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Summarize Google Scholar alerts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="fetch new alerts, then summarize and report")
+    _add_run_options(run)
+    run.set_defaults(func=cmd_run)
+
+    fetch = commands.add_parser("fetch", help="fetch, parse, enrich and store new alerts")
+    fetch.set_defaults(func=cmd_fetch)
+
+    enrich = commands.add_parser("enrich", help="look up stored articles without a confident CrossRef match")
+    enrich.add_argument("--all", action="store_true", help="re-enrich every stored article")
+    enrich.add_argument("--limit", type=int, default=0, help="at most this many articles")
+    enrich.set_defaults(func=cmd_enrich)
+
+    summarize = commands.add_parser("summarize", help="summarize stored articles and write a report")
+    _add_run_options(summarize)
+    summarize.set_defaults(func=cmd_summarize)
+
+    report = commands.add_parser("report", help="rewrite a finished run's report without the LLM")
+    report.add_argument("--run", type=int, help="run id (default: the latest finished run)")
+    report.add_argument("--digest", action="store_true", help="rewrite the rolling digest instead")
+    report.add_argument("--for", dest="profile_name", metavar="NAME", help="digest profile (default: the default profile)")
+    report.set_defaults(func=cmd_report)
+
+    search = commands.add_parser("search", help="ranked full-text search over the stored articles")
+    search.add_argument("query", nargs="+", help='FTS5 query, e.g. actigraphy relapse, "sleep apnea", title:wearable')
+    search.add_argument("--since", help="stored on or after this date (YYYY-MM-DD)")
+    search.add_argument("--until", help="stored on or before this date (YYYY-MM-DD)")
+    search.add_argument("--source", help="journal or venue contains this text")
+    search.add_argument("--limit", type=int, default=20)
+    search.set_defaults(func=cmd_search)
+
+    watch = commands.add_parser("watch", help="ingest alerts as they arrive (IMAP IDLE) and summarize periodically")
+    watch.add_argument("--window", type=float, help="seconds to gather arriving alerts into one batch "
+                                                    "(default WATCH_BATCH_SECONDS)")
+    watch.add_argument("--threshold", type=int, help="summarize once this many articles are waiting, 0 never "
+                                                     "(default WATCH_SUMMARY_THRESHOLD)")
+    watch.add_argument("--every", type=float, help="summarize every this many hours, 0 never "
+                                                   "(default WATCH_SUMMARY_HOURS)")
+    watch.add_argument("--at", help="summarize daily at this local time, HH:MM (default WATCH_SUMMARY_AT)")
+    watch.add_argument("--rolling", action="store_true", help="also fold each summary into the rolling digest")
+    watch.add_argument("--recluster", action="store_true", help="refit the cached topic clusters")
+    _add_profile_option(watch)
+    watch.set_defaults(func=cmd_watch)
+
+    stats = commands.add_parser("stats", help="show article counts and recent runs")
+    stats.add_argument("--runs", type=int, default=5, help="number of recent runs to list")
+    stats.set_defaults(func=cmd_stats)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
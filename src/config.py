@@ -1,12 +1,98 @@
 # src/config.py
 import os
-from dotenv import load_dotenv
 
 # Specify the custom .env filename here
-load_dotenv('avery.env')
+ENV_FILE = 'avery.env'
+# python-dotenv is only imported when there is an env file to read
+if os.path.isfile(ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+OPENAI_API_BASE = os.environ.get("OPENAI_API_BASE", "")  # e.g. a local chat-completion stand-in
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4")
 EMAIL_USERNAME = os.environ.get("EMAIL_USERNAME", "")
 EMAIL_PASSWORD = os.environ.get("EMAIL_PASSWORD", "")
 EMAIL_SERVER = os.environ.get("EMAIL_SERVER", "imap.gmail.com")
-EMAIL_FOLDER = os.environ.get("EMAIL_FOLDER", "scholar_alerts")
\ No newline at end of file
+# Plain IMAP (EMAIL_USE_SSL=0) is only meant for local stand-ins such as the benchmark server
+EMAIL_USE_SSL = os.environ.get("EMAIL_USE_SSL", "1") == "1"
+EMAIL_IMAP_PORT = int(os.environ.get("EMAIL_IMAP_PORT", "993" if EMAIL_USE_SSL else "143"))
+EMAIL_FOLDER = os.environ.get("EMAIL_FOLDER", "scholar_alerts")
+# "fast" parses alerts in one linear pass; "reference" uses the original tree walk
+PARSER_MODE = os.environ.get("PARSER_MODE", "fast")
+# Number of messages requested per bulk UID FETCH
+EMAIL_FETCH_BATCH_SIZE = int(os.environ.get("EMAIL_FETCH_BATCH_SIZE", "50"))
+
+CROSSREF_API_URL = os.environ.get("CROSSREF_API_URL", "https://api.crossref.org/works")
+# CrossRef polite pool: identify ourselves with a contact address
+CROSSREF_MAILTO = os.environ.get("CROSSREF_MAILTO", EMAIL_USERNAME)
+CROSSREF_MAX_WORKERS = int(os.environ.get("CROSSREF_MAX_WORKERS", "8"))
+CROSSREF_RATE_LIMIT = float(os.environ.get("CROSSREF_RATE_LIMIT", "10"))  # requests per second
+CROSSREF_ROWS = int(os.environ.get("CROSSREF_ROWS", "10"))  # candidates fetched per title query
+CROSSREF_DOI_BATCH = int(os.environ.get("CROSSREF_DOI_BATCH", "50"))  # DOIs fetched per filter=doi: request
+# Matches scoring below this confidence are recorded but never overwrite article fields
+CROSSREF_MATCH_THRESHOLD = float(os.environ.get("CROSSREF_MATCH_THRESHOLD", "0.75"))
+
+# Persistent cache of CrossRef lookups (positive and no-match results)
+CROSSREF_CACHE_PATH = os.environ.get("CROSSREF_CACHE_PATH", os.path.join("data", "crossref_cache.db"))
+CROSSREF_CACHE_TTL_DAYS = float(os.environ.get("CROSSREF_CACHE_TTL_DAYS", "90"))
+CROSSREF_CACHE_NEGATIVE_TTL_DAYS = float(os.environ.get("CROSSREF_CACHE_NEGATIVE_TTL_DAYS", "7"))
+CROSSREF_CACHE_MAX_ENTRIES = int(os.environ.get("CROSSREF_CACHE_MAX_ENTRIES", "100000"))
+
+# Summarization: concurrent batch calls and the context window the reduce tree must fit into
+SUMMARY_MAX_CONCURRENCY = int(os.environ.get("SUMMARY_MAX_CONCURRENCY", "4"))
+SUMMARY_CONTEXT_TOKENS = int(os.environ.get("SUMMARY_CONTEXT_TOKENS", "8192"))
+SUMMARY_MAX_TOKENS = int(os.environ.get("SUMMARY_MAX_TOKENS", "2000"))
+# Each article needs room in the completion for its own short summary
+SUMMARY_OUTPUT_TOKENS_PER_ARTICLE = int(os.environ.get("SUMMARY_OUTPUT_TOKENS_PER_ARTICLE", "50"))
+# Stream completions into the report as tokens arrive (0 waits for whole completions)
+SUMMARY_STREAM = os.environ.get("SUMMARY_STREAM", "1") != "0"
+
+# Persistent cache of LLM responses, keyed by a hash of the full request
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join("data", "llm_cache.db"))
+LLM_CACHE_TTL_DAYS = float(os.environ.get("LLM_CACHE_TTL_DAYS", "0"))  # 0 keeps entries until evicted
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+# How many fetched-but-unprocessed emails may be buffered between the IMAP fetch and parsing
+PIPELINE_DEPTH = int(os.environ.get("PIPELINE_DEPTH", "64"))
+# Parse in a process pool once a batch has at least PARSE_POOL_MIN_EMAILS emails
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", str(os.cpu_count() or 1)))
+PARSE_POOL_MIN_EMAILS = int(os.environ.get("PARSE_POOL_MIN_EMAILS", "32"))
+
+# Local relevance pre-ranking before summarization (0 disables the rule)
+TOPIC_PROFILE = os.environ.get(
+    "TOPIC_PROFILE",
+    "passive sensing wearables smartphone actigraphy digital phenotyping behavioral physiological monitoring "
+    "sleep heart rate variability activity mobility machine learning deep learning prediction model "
+    "mental health depression anxiety bipolar schizophrenia psychosis suicide psychiatric "
+    "neurological disease progression parkinson alzheimer dementia epilepsy multiple sclerosis "
+    "treatment response relapse",
+)
+RELEVANCE_TOP_K = int(os.environ.get("RELEVANCE_TOP_K", "0"))
+RELEVANCE_THRESHOLD = float(os.environ.get("RELEVANCE_THRESHOLD", "0"))
+
+# Named digest profiles (see src/profiles.py); without the file there is a single default profile
+PROFILES_PATH = os.environ.get("PROFILES_PATH", "profiles.json")
+# Profiles summarized at the same time after the shared ingest
+PROFILE_MAX_CONCURRENCY = int(os.environ.get("PROFILE_MAX_CONCURRENCY", "4"))
+
+# Local topic clustering so each LLM call sees a coherent group of articles
+CLUSTER_ARTICLES = os.environ.get("CLUSTER_ARTICLES", "1") == "1"
+CLUSTER_TARGET_SIZE = int(os.environ.get("CLUSTER_TARGET_SIZE", "25"))  # articles per cluster when fitting
+CLUSTER_MAX_COUNT = int(os.environ.get("CLUSTER_MAX_COUNT", "30"))
+
+# One JSON timing/counter profile per run (and a cProfile dump with --cprofile) is written here
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join("data", "profiles"))
+
+# Watch mode (python -m src.cli watch): one IMAP connection waits in IDLE for new alerts
+# Alerts arriving within this many seconds of the first are processed together
+WATCH_BATCH_SECONDS = float(os.environ.get("WATCH_BATCH_SECONDS", "60"))
+# IDLE is re-issued at least this often; RFC 2177 servers may drop idle clients after 30 minutes
+WATCH_IDLE_SECONDS = float(os.environ.get("WATCH_IDLE_SECONDS", "600"))
+# Summarize once this many articles are waiting (0 disables the threshold)
+WATCH_SUMMARY_THRESHOLD = int(os.environ.get("WATCH_SUMMARY_THRESHOLD", "100"))
+# ... or every this many hours (0 disables the schedule), or daily at WATCH_SUMMARY_AT (HH:MM, local time)
+WATCH_SUMMARY_HOURS = float(os.environ.get("WATCH_SUMMARY_HOURS", "24"))
+WATCH_SUMMARY_AT = os.environ.get("WATCH_SUMMARY_AT", "")
+# Reconnect backoff after a dropped connection doubles up to this many seconds
+WATCH_RECONNECT_MAX_SECONDS = float(os.environ.get("WATCH_RECONNECT_MAX_SECONDS", "300"))
@@ -2,56 +2,702 @@
 
 import json
 import os
-from typing import List, Dict
+import re
+import sqlite3
+import threading
+from typing import List, Dict, Optional
 from datetime import datetime
+from src.data_store.near_dup import (
+    NEAR_DUP_THRESHOLD, minhash_signature, band_keys, estimate_similarity, pack_signature, unpack_signature,
+    same_paper,
+)
+from src.utils.logger import logger
+from src.utils.metrics import timed
+from src.utils.text import normalize_title
 
 DATA_DIR = "data"
 DATA_FILE_PATH = os.path.join(DATA_DIR, "articles.json")
+DB_FILE_PATH = os.path.join(DATA_DIR, "articles.db")
+
+# Rows are inserted in chunks so a huge import doesn't hold one giant transaction
+INSERT_BATCH_SIZE = 500
+
+# Very short titles ("Editorial", "Erratum") are too generic to match on
+MIN_TITLE_KEY_LENGTH = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    link TEXT NOT NULL,
+    doi TEXT,
+    title TEXT NOT NULL DEFAULT '',
+    title_norm TEXT NOT NULL DEFAULT '',
+    added_timestamp TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_link ON articles(link);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_doi ON articles(doi) WHERE doi IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_articles_added ON articles(added_timestamp);
+CREATE TABLE IF NOT EXISTS article_links (
+    link TEXT PRIMARY KEY,
+    article_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_minhash (
+    article_id INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS minhash_bands (
+    band_key INTEGER NOT NULL,
+    article_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_minhash_bands_key ON minhash_bands(band_key);
+CREATE TABLE IF NOT EXISTS clusters (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    centroid TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_clusters (
+    link TEXT PRIMARY KEY,
+    cluster_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started TEXT NOT NULL,
+    finished TEXT,
+    status TEXT NOT NULL,
+    options TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS run_steps (
+    run_id INTEGER NOT NULL,
+    step TEXT NOT NULL,
+    detail TEXT,
+    recorded TEXT NOT NULL,
+    PRIMARY KEY (run_id, step)
+);
+CREATE TABLE IF NOT EXISTS run_articles (
+    run_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    link TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE TABLE IF NOT EXISTS run_results (
+    run_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (run_id, key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns added after the first release of the SQLite store, applied to older databases on open
+MIGRATIONS = [
+    ("title_norm", "ALTER TABLE articles ADD COLUMN title_norm TEXT NOT NULL DEFAULT ''"),
+]
+POST_MIGRATION_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_articles_title_norm ON articles(title_norm);
+"""
+
+# Full-text index over title, authors, source and abstract (the alert snippet, or the
+# CrossRef abstract once enriched), kept in step with the articles table by triggers.
+# rowid is the article id.
+SEARCH_INDEX_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, authors, source, abstract, tokenize = 'porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, authors, source, abstract) SELECT {fields};
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, data ON articles BEGIN
+    DELETE FROM articles_fts WHERE rowid = old.id;
+    INSERT INTO articles_fts (rowid, title, authors, source, abstract) SELECT {fields};
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    DELETE FROM articles_fts WHERE rowid = old.id;
+END;
+"""
+SEARCH_INDEX_FIELDS = (
+    "{row}.id, {row}.title, "
+    "(SELECT group_concat(value, ', ') FROM json_each({row}.data, '$.authors')), "
+    "json_extract({row}.data, '$.source'), json_extract({row}.data, '$.snippet')"
+)
+# bm25 weights per column: title, authors, source, abstract
+SEARCH_WEIGHTS = (10.0, 3.0, 1.0, 1.0)
+SEARCH_SNIPPET_TOKENS = 12
+
+_connection: Optional[sqlite3.Connection] = None
+_connection_path: Optional[str] = None
+_lock = threading.RLock()
+# False when this SQLite build lacks FTS5; search_articles then scans titles instead
+_search_index = True
+
+
+def connection_lock() -> threading.RLock:
+    """
+    The reentrant lock serializing use of the shared connection. Hold it around statements
+    (and the commit) that must not interleave with other threads' use of the connection.
+    """
+    return _lock
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Return the shared SQLite connection, opening it (and creating the schema) on first use.
+    The connection runs in WAL mode so readers never block the writer.
+    """
+    global _connection, _connection_path
+    with connection_lock():
+        if _connection is not None and _connection_path == DB_FILE_PATH:
+            return _connection
+        if _connection is not None:
+            _connection.close()
+
+        os.makedirs(os.path.dirname(DB_FILE_PATH) or ".", exist_ok=True)
+        is_new = not os.path.isfile(DB_FILE_PATH)
+        conn = sqlite3.connect(DB_FILE_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+        conn.executescript(POST_MIGRATION_SCHEMA)
+        _create_search_index(conn)
+        conn.commit()
+        _connection = conn
+        _connection_path = DB_FILE_PATH
+
+    # Carry the legacy JSON store over the first time the database is created
+    if is_new and os.path.isfile(DATA_FILE_PATH):
+        import_json_articles(DATA_FILE_PATH)
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+    for column, statement in MIGRATIONS:
+        if column in columns:
+            continue
+        conn.execute(statement)
+        if column == "title_norm":
+            rows = conn.execute("SELECT id, title FROM articles").fetchall()
+            conn.executemany(
+                "UPDATE articles SET title_norm = ? WHERE id = ?",
+                [(normalize_title(title), row_id) for row_id, title in rows],
+            )
+
+    # Stores created before the near-duplicate index get their links and signatures backfilled
+    has_links = conn.execute("SELECT 1 FROM article_links LIMIT 1").fetchone()
+    if not has_links:
+        for row_id, link, title_norm in conn.execute("SELECT id, link, title_norm FROM articles").fetchall():
+            _index_article(conn, row_id, link, title_norm)
+
+
+def _create_search_index(conn: sqlite3.Connection) -> None:
+    """Create the full-text index and its triggers; stores that predate it are indexed once here."""
+    global _search_index
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'").fetchone()
+    try:
+        conn.executescript(SEARCH_INDEX_SCHEMA.format(fields=SEARCH_INDEX_FIELDS.format(row="new")))
+    except sqlite3.OperationalError as e:
+        logger.warning(f"SQLite full-text search is unavailable ({e}); search falls back to a title scan.")
+        _search_index = False
+        return
+    _search_index = True
+    if not exists:
+        conn.execute(
+            "INSERT INTO articles_fts (rowid, title, authors, source, abstract) "
+            f"SELECT {SEARCH_INDEX_FIELDS.format(row='articles')} FROM articles"
+        )
+
+
+def close_connection() -> None:
+    """Close the shared SQLite connection if it is open."""
+    global _connection, _connection_path
+    with connection_lock():
+        if _connection is not None:
+            _connection.close()
+        _connection = None
+        _connection_path = None
+
+
+def normalize_doi(doi: str) -> Optional[str]:
+    """DOIs are case-insensitive; store them lowercased without a resolver prefix."""
+    if not doi:
+        return None
+    doi = re.sub(r"^(https?://(dx\.)?doi\.org/|doi:)", "", doi.strip(), flags=re.IGNORECASE)
+    return doi.lower() or None
+
+
+def _article_row(article: Dict):
+    return (
+        article["link"],
+        normalize_doi(article.get("doi", "")),
+        article.get("title", ""),
+        normalize_title(article.get("title", "")),
+        article["added_timestamp"],
+        json.dumps(article, ensure_ascii=False),
+    )
+
+
+def _index_article(conn: sqlite3.Connection, article_id: int, link: str, title_norm: str, signature=None) -> None:
+    """Register an article's link and, for matchable titles, its MinHash signature and LSH buckets."""
+    conn.execute("INSERT OR IGNORE INTO article_links (link, article_id) VALUES (?, ?)", (link, article_id))
+    if len(title_norm) < MIN_TITLE_KEY_LENGTH:
+        return
+    signature = signature or minhash_signature(title_norm)
+    conn.execute(
+        "INSERT OR REPLACE INTO article_minhash (article_id, signature) VALUES (?, ?)",
+        (article_id, pack_signature(signature)),
+    )
+    conn.executemany(
+        "INSERT INTO minhash_bands (band_key, article_id) VALUES (?, ?)",
+        [(key, article_id) for key in band_keys(signature)],
+    )
+
+
+def _find_near_duplicate(conn: sqlite3.Connection, article: Dict, title_norm: str, signature=None) -> Optional[int]:
+    """
+    Return the id of a stored version of article: a record whose title is a near-duplicate
+    of title_norm and that near_dup.same_paper accepts (same first author and year, no
+    differing numbers or populations in the titles).
+    Only articles sharing an LSH bucket are compared, so the cost doesn't grow with the archive.
+    """
+    if len(title_norm) < MIN_TITLE_KEY_LENGTH:
+        return None
+    signature = signature or minhash_signature(title_norm)
+    keys = band_keys(signature)
+    placeholders = ",".join("?" * len(keys))
+    candidates = conn.execute(
+        f"SELECT DISTINCT m.article_id, m.signature FROM minhash_bands b "
+        f"JOIN article_minhash m ON m.article_id = b.article_id WHERE b.band_key IN ({placeholders})",
+        keys,
+    ).fetchall()
+
+    scored = [(estimate_similarity(signature, unpack_signature(blob)), article_id) for article_id, blob in candidates]
+    for score, article_id in sorted(scored, reverse=True):
+        if score < NEAR_DUP_THRESHOLD:
+            break
+        row = conn.execute("SELECT data FROM articles WHERE id = ?", (article_id,)).fetchone()
+        if row and same_paper(article, json.loads(row[0])):
+            return article_id
+    return None
+
+
+def _find_existing(conn: sqlite3.Connection, article: Dict, title_norm: str, signature=None):
+    """
+    Return (article id, exact) for the stored record this article duplicates, or (None, False).
+    exact is True for a known link; DOI and near-duplicate title matches are variants to merge.
+    """
+    row = conn.execute("SELECT article_id FROM article_links WHERE link = ?", (article["link"],)).fetchone()
+    if row:
+        return row[0], True
+    doi = normalize_doi(article.get("doi", ""))
+    if doi:
+        row = conn.execute("SELECT id FROM articles WHERE doi = ?", (doi,)).fetchone()
+        if row:
+            return row[0], False
+    near_id = _find_near_duplicate(conn, article, title_norm, signature)
+    return near_id, False
+
+
+def _attach_variant(conn: sqlite3.Connection, article_id: int, variant: Dict) -> None:
+    """Merge a variant (preprint, publisher or PubMed copy) into the canonical record."""
+    row = conn.execute("SELECT data, doi FROM articles WHERE id = ?", (article_id,)).fetchone()
+    if not row:
+        return
+    canonical = json.loads(row[0])
+    alternate_links = canonical.setdefault("alternate_links", [])
+    if variant["link"] != canonical.get("link") and variant["link"] not in alternate_links:
+        alternate_links.append(variant["link"])
+
+    doi = row[1]
+    variant_doi = normalize_doi(variant.get("doi", ""))
+    if not doi and variant_doi:
+        # e.g. the published version's DOI for a record first seen as a preprint
+        taken = conn.execute("SELECT 1 FROM articles WHERE doi = ?", (variant_doi,)).fetchone()
+        if not taken:
+            doi = variant_doi
+            canonical["doi"] = variant["doi"]
+
+    conn.execute(
+        "UPDATE articles SET data = ?, doi = ? WHERE id = ?",
+        (json.dumps(canonical, ensure_ascii=False), doi, article_id),
+    )
+    conn.execute("INSERT OR IGNORE INTO article_links (link, article_id) VALUES (?, ?)", (variant["link"], article_id))
+
+
+def _insert_articles(conn: sqlite3.Connection, articles: List[Dict], unmatched: List[Dict] = None) -> List[Dict]:
+    """
+    Insert articles in batches. Exact duplicates (known link) are skipped; variants of a stored
+    paper (same DOI, or near-duplicate title) are merged into that record as alternate links.
+    Returns the articles that were actually inserted. With unmatched, a list, articles that
+    match no stored record are appended to it instead of being inserted.
+    """
+    inserted = []
+    merged = 0
+    for start in range(0, len(articles), INSERT_BATCH_SIZE):
+        chunk = articles[start:start + INSERT_BATCH_SIZE]
+        for article in chunk:
+            title_norm = normalize_title(article.get("title", ""))
+            signature = minhash_signature(title_norm) if len(title_norm) >= MIN_TITLE_KEY_LENGTH else None
+            existing_id, exact = _find_existing(conn, article, title_norm, signature)
+            if existing_id is not None:
+                if not exact:
+                    _attach_variant(conn, existing_id, article)
+                    merged += 1
+                continue
+            if unmatched is not None:
+                unmatched.append(article)
+                continue
+
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO articles (link, doi, title, title_norm, added_timestamp, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                _article_row(article),
+            )
+            if cur.rowcount:
+                _index_article(conn, cur.lastrowid, article["link"], title_norm, signature)
+                inserted.append(article)
+        conn.commit()
+    if merged:
+        logger.info(f"Merged {merged} near-duplicate variants into existing articles.")
+    return inserted
+
 
 def load_articles() -> List[Dict]:
-    """Load existing articles from the JSON file. If the file does not exist, return an empty list."""
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR, exist_ok=True)
-    if not os.path.isfile(DATA_FILE_PATH):
-        return []
-    with open(DATA_FILE_PATH, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-            if isinstance(data, list):
-                return data
-            else:
-                return []
-        except json.JSONDecodeError:
-            return []
+    """Load all stored articles in insertion order. If the store is empty, return an empty list."""
+    conn = get_connection()
+    with connection_lock():
+        rows = conn.execute("SELECT data FROM articles ORDER BY id").fetchall()
+    return [json.loads(row[0]) for row in rows]
+
 
 def save_articles(articles: List[Dict]) -> None:
-    """Save the list of articles to the single JSON file."""
-    with open(DATA_FILE_PATH, "w", encoding="utf-8") as f:
-        json.dump(articles, f, ensure_ascii=False, indent=2)
+    """Replace the stored articles with the given list."""
+    conn = get_connection()
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with connection_lock():
+        for table in ("articles", "article_links", "article_minhash", "minhash_bands", "article_clusters"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.commit()
+        rows = [a for a in articles if a.get("link")]
+        for article in rows:
+            article.setdefault("added_timestamp", now_str)
+        _insert_articles(conn, rows)
+
 
+@timed("store_articles")
 def store_articles(new_articles: List[Dict]) -> List[Dict]:
     """
-    Store articles in the JSON file, skipping duplicates by link.
+    Store articles, skipping duplicates by link and merging variants of stored papers
+    (same DOI or near-duplicate title) into the existing record.
     Returns the list of newly added articles.
     """
-    existing_articles = load_articles()
-    existing_links = {article["link"] for article in existing_articles if "link" in article}
-
-    # Filter out duplicates
-    articles_to_add = [a for a in new_articles if a.get("link") and a["link"] not in existing_links]
+    candidates = [a for a in new_articles if a.get("link")]
+    if not candidates:
+        return []
 
     # Add a timestamp field to each newly added article
     # Format: "YYYY-MM-DD HH:MM:SS"
     now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    for article in articles_to_add:
+    for article in candidates:
         article["added_timestamp"] = now_str
 
-    if articles_to_add:
-        updated_articles = existing_articles + articles_to_add
-        save_articles(updated_articles)
+    conn = get_connection()
+    with connection_lock():
+        articles_added = _insert_articles(conn, candidates)
+
+    # Articles that lost to an existing record shouldn't carry a fresh timestamp
+    added_ids = {id(a) for a in articles_added}
+    for article in candidates:
+        if id(article) not in added_ids:
+            article.pop("added_timestamp", None)
+
+    return articles_added
+
+
+def merge_variants(variants: List[Dict]) -> List[Dict]:
+    """
+    Merge articles that are versions of stored papers (a preprint's published copy, the same
+    DOI under another link) into those records as alternate links, without storing them as
+    new articles. Returns the ones no stored record matches after all, e.g. a near-duplicate
+    title by other authors, for the caller to enrich and store.
+    """
+    candidates = [a for a in variants if a.get("link")]
+    unmatched = []
+    if candidates:
+        conn = get_connection()
+        with connection_lock():
+            _insert_articles(conn, candidates, unmatched)
+    return unmatched
+
+
+def update_articles(articles: List[Dict]) -> int:
+    """
+    Write changed fields of stored articles back, matched by link (e.g. after re-enrichment).
+    An article whose new DOI already belongs to another stored article keeps its old DOI.
+    Returns the number of articles updated.
+    """
+    conn = get_connection()
+    updated = 0
+    with connection_lock():
+        for article in articles:
+            if not article.get("link"):
+                continue
+            link, doi, title, title_norm, _, data = _article_row(dict(article, added_timestamp=""))
+            try:
+                cursor = conn.execute(
+                    "UPDATE articles SET doi = ?, title = ?, title_norm = ?, data = ? WHERE link = ?",
+                    (doi, title, title_norm, data, link),
+                )
+            except sqlite3.IntegrityError:
+                logger.warning(f"DOI {doi} of '{title}' already belongs to another stored article; keeping the old DOI.")
+                cursor = conn.execute(
+                    "UPDATE articles SET title = ?, title_norm = ?, data = ? WHERE link = ?", (title, title_norm, data, link)
+                )
+            updated += cursor.rowcount
+        conn.commit()
+    return updated
+
+
+def get_articles_since(last_id: int = 0):
+    """
+    Return (articles, max_id) for every article stored after the row id last_id, in insertion order.
+    max_id is the new high-water mark (last_id if nothing was added).
+    """
+    conn = get_connection()
+    with connection_lock():
+        rows = conn.execute("SELECT id, data FROM articles WHERE id > ? ORDER BY id", (last_id,)).fetchall()
+    max_id = rows[-1][0] if rows else last_id
+    return [json.loads(data) for _, data in rows], max_id
+
+
+def get_articles_by_links(links: List[str]) -> List[Dict]:
+    """
+    Return the stored articles for the given links (primary or merged-variant links), in the
+    order given. Links that resolve to the same article return it once; unknown links are skipped.
+    """
+    conn = get_connection()
+    by_link = {}
+    with connection_lock():
+        for start in range(0, len(links), INSERT_BATCH_SIZE):
+            chunk = links[start:start + INSERT_BATCH_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT l.link, a.id, a.data FROM article_links l JOIN articles a ON a.id = l.article_id "
+                f"WHERE l.link IN ({placeholders})", chunk
+            ).fetchall()
+            by_link.update((link, (row_id, data)) for link, row_id, data in rows)
+    articles, seen = [], set()
+    for link in links:
+        if link in by_link and by_link[link][0] not in seen:
+            seen.add(by_link[link][0])
+            articles.append(json.loads(by_link[link][1]))
+    return articles
+
+
+def _fts_query(query: str) -> str:
+    """Quote each word so punctuation in user input (COVID-19, 'sleep/wake') isn't read as FTS5 syntax."""
+    words = re.findall(r"[^\s\"]+", query)
+    return " ".join(f'"{word}"' for word in words)
+
+
+def search_articles(query: str, since: str = None, until: str = None, source: str = None,
+                    limit: int = 20) -> List[Dict]:
+    """
+    Ranked full-text search over title, authors, source and abstract (BM25, title matches
+    weighted highest). query is FTS5 syntax (AND/OR/NOT, "phrases", prefix*, title: ...);
+    if it doesn't parse, its words are searched as plain terms. since/until ("YYYY-MM-DD")
+    bound the date the article was stored, and source is a case-insensitive substring of
+    the journal or venue. Returns up to limit articles, best first, each with "score" and
+    "match" (a highlighted excerpt) added.
+    """
+    if not query.strip():
+        return []
+    filters, params = [], []
+    if since:
+        filters.append("a.added_timestamp >= ?")
+        params.append(since)
+    if until:
+        # Dates without a time cover the whole day
+        filters.append("a.added_timestamp <= ?")
+        params.append(until if len(until) > 10 else until + " 23:59:59")
+    if source:
+        filters.append("json_extract(a.data, '$.source') LIKE ?")
+        params.append(f"%{source}%")
+    where = "".join(f" AND {condition}" for condition in filters)
+
+    conn = get_connection()
+    with connection_lock():
+        if not _search_index:
+            rows = conn.execute(
+                f"SELECT a.data, 0.0, a.title FROM articles a WHERE a.title_norm LIKE ?{where} "
+                "ORDER BY a.id DESC LIMIT ?", (f"%{normalize_title(query)}%", *params, limit)
+            ).fetchall()
+        else:
+            sql = (
+                f"SELECT a.data, bm25(articles_fts, {', '.join(map(str, SEARCH_WEIGHTS))}) AS rank, "
+                f"snippet(articles_fts, -1, '[', ']', '…', {SEARCH_SNIPPET_TOKENS}) "
+                f"FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+                f"WHERE articles_fts MATCH ?{where} ORDER BY rank LIMIT ?"
+            )
+            try:
+                rows = conn.execute(sql, (query, *params, limit)).fetchall()
+            except sqlite3.OperationalError:
+                rows = conn.execute(sql, (_fts_query(query), *params, limit)).fetchall()
+    results = []
+    for data, score, excerpt in rows:
+        article = json.loads(data)
+        # bm25() is negative, lower is better; report it as a positive relevance score
+        article["score"] = round(-score, 3)
+        article["match"] = excerpt
+        results.append(article)
+    return results
+
+
+def max_article_id() -> int:
+    conn = get_connection()
+    with connection_lock():
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM articles").fetchone()[0]
+
+
+def get_meta(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a value from the store's key/value metadata table."""
+    conn = get_connection()
+    with connection_lock():
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def set_meta(key: str, value: str) -> None:
+    conn = get_connection()
+    with connection_lock():
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        conn.commit()
+
+
+def save_clusters(clusters: List[Dict], idf: Dict[str, float], assignments: Dict[str, int]) -> None:
+    """
+    Replace the stored topic clusters. clusters are {"id", "label", "centroid"} dicts,
+    idf is the vocabulary weighting they were fitted with, assignments map link -> cluster id.
+    """
+    conn = get_connection()
+    with connection_lock():
+        conn.execute("DELETE FROM clusters")
+        conn.execute("DELETE FROM article_clusters")
+        conn.executemany(
+            "INSERT INTO clusters (id, label, centroid) VALUES (?, ?, ?)",
+            [(c["id"], c["label"], json.dumps(c["centroid"])) for c in clusters],
+        )
+        conn.executemany(
+            "INSERT INTO article_clusters (link, cluster_id) VALUES (?, ?)", list(assignments.items())
+        )
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('cluster_idf', ?)", (json.dumps(idf),))
+        conn.commit()
+
+
+def load_clusters():
+    """Return (clusters, idf) as saved by save_clusters, or ([], {}) if nothing has been clustered yet."""
+    conn = get_connection()
+    with connection_lock():
+        rows = conn.execute("SELECT id, label, centroid FROM clusters ORDER BY id").fetchall()
+        idf_row = conn.execute("SELECT value FROM meta WHERE key = 'cluster_idf'").fetchone()
+    clusters = [{"id": row_id, "label": label, "centroid": json.loads(centroid)} for row_id, label, centroid in rows]
+    return clusters, json.loads(idf_row[0]) if idf_row else {}
+
+
+def get_article_clusters(links: List[str]) -> Dict[str, int]:
+    """Return {link: cluster id} for the given links that already have a cluster."""
+    conn = get_connection()
+    assignments = {}
+    with connection_lock():
+        for start in range(0, len(links), INSERT_BATCH_SIZE):
+            chunk = links[start:start + INSERT_BATCH_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            assignments.update(conn.execute(
+                f"SELECT link, cluster_id FROM article_clusters WHERE link IN ({placeholders})", chunk
+            ).fetchall())
+    return assignments
+
+
+def set_article_clusters(assignments: Dict[str, int]) -> None:
+    conn = get_connection()
+    with connection_lock():
+        conn.executemany(
+            "INSERT OR REPLACE INTO article_clusters (link, cluster_id) VALUES (?, ?)", list(assignments.items())
+        )
+        conn.commit()
 
-    return articles_to_add
 
 def get_all_articles() -> List[Dict]:
     """Return all currently stored articles."""
-    return load_articles()
\ No newline at end of file
+    return load_articles()
+
+
+def count_articles() -> int:
+    """Return the number of stored articles without loading them."""
+    conn = get_connection()
+    with connection_lock():
+        return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+def load_known_keys():
+    """
+    Return the sets of stored links (including merged variants' links), DOIs and normalized
+    titles, read from the indexed columns only (no article bodies are decoded).
+    """
+    conn = get_connection()
+    links, dois, titles = set(), set(), set()
+    with connection_lock():
+        links.update(row[0] for row in conn.execute("SELECT link FROM article_links"))
+        for link, doi, title_norm in conn.execute("SELECT link, doi, title_norm FROM articles"):
+            links.add(link)
+            if doi:
+                dois.add(doi)
+            if title_norm:
+                titles.add(title_norm)
+    return links, dois, titles
+
+
+def find_near_duplicate_id(article: Dict) -> Optional[int]:
+    """Return the id of a stored version of this article found by its title, if any."""
+    conn = get_connection()
+    with connection_lock():
+        return _find_near_duplicate(conn, article, normalize_title(article.get("title", "")))
+
+
+def import_json_articles(json_path: str = DATA_FILE_PATH) -> int:
+    """
+    One-shot import of a legacy articles.json file into the SQLite store.
+    Existing records win; original added_timestamp values are preserved.
+    Returns the number of articles imported.
+    """
+    if not os.path.isfile(json_path):
+        return 0
+    with open(json_path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            return 0
+    if not isinstance(data, list):
+        return 0
+
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    articles = [a for a in data if isinstance(a, dict) and a.get("link")]
+    for article in articles:
+        article.setdefault("added_timestamp", now_str)
+
+    conn = get_connection()
+    with connection_lock():
+        return len(_insert_articles(conn, articles))
+
+
+if __name__ == "__main__":
+    import sys
+
+    paths = sys.argv[1:] or [DATA_FILE_PATH]
+    for path in paths:
+        imported = import_json_articles(path)
+        print(f"Imported {imported} articles from {path} into {DB_FILE_PATH}.")
@@ -0,0 +1,74 @@
+# src/data_store/dedup.py
+
+from typing import Dict, List, Tuple
+from src.data_store.db_handler import MIN_TITLE_KEY_LENGTH, load_known_keys, normalize_doi, find_near_duplicate_id
+from src.utils.text import normalize_title
+
+
+class KnownArticleIndex:
+    """
+    In-memory index of the links, DOIs and normalized titles we already have.
+    Loaded once per run so duplicates can be dropped, and variants of known papers set
+    apart, before any CrossRef work.
+    With check_near_duplicates, titles that aren't exact matches are also looked up
+    in the store's MinHash/LSH index (preprint vs. published versions).
+    """
+
+    def __init__(self, links=None, dois=None, titles=None, check_near_duplicates=False):
+        self.links = set(links or ())
+        self.dois = set(dois or ())
+        self.titles = set(titles or ())
+        self.check_near_duplicates = check_near_duplicates
+
+    @classmethod
+    def load(cls) -> "KnownArticleIndex":
+        links, dois, titles = load_known_keys()
+        return cls(links, dois, titles, check_near_duplicates=True)
+
+    @staticmethod
+    def _title_key(article: Dict) -> str:
+        title_key = normalize_title(article.get("title", ""))
+        return title_key if len(title_key) >= MIN_TITLE_KEY_LENGTH else ""
+
+    def is_known(self, article: Dict) -> bool:
+        """Whether the article's link is already stored (or seen in this batch)."""
+        return article.get("link") in self.links
+
+    def is_variant(self, article: Dict) -> bool:
+        """Whether the article is another version (same DOI or title) of a stored or already seen paper."""
+        doi = normalize_doi(article.get("doi", ""))
+        if doi and doi in self.dois:
+            return True
+        title_key = self._title_key(article)
+        if not title_key:
+            return False
+        if title_key in self.titles:
+            return True
+        return self.check_near_duplicates and find_near_duplicate_id(article) is not None
+
+    def add(self, article: Dict) -> None:
+        if article.get("link"):
+            self.links.add(article["link"])
+        doi = normalize_doi(article.get("doi", ""))
+        if doi:
+            self.dois.add(doi)
+        title_key = self._title_key(article)
+        if title_key:
+            self.titles.add(title_key)
+
+
+def filter_new_articles(articles: List[Dict], index: KnownArticleIndex) -> Tuple[List[Dict], List[Dict], int]:
+    """
+    Drop articles already in the store, and collapse duplicates within the batch itself.
+    Versions of known papers under a new link (same DOI or title) are set apart as variants:
+    they need no CrossRef lookup, only merging into the stored record (merge_variants).
+    The index is updated with every article kept, so it can be reused across emails.
+    Returns (articles to process, variants, number of articles skipped).
+    """
+    fresh, variants = [], []
+    for article in articles:
+        if not article.get("link") or index.is_known(article):
+            continue
+        (variants if index.is_variant(article) else fresh).append(article)
+        index.add(article)
+    return fresh, variants, len(articles) - len(fresh) - len(variants)
@@ -0,0 +1,96 @@
+# src/data_store/near_dup.py
+
+import hashlib
+import struct
+from typing import Dict, List
+from src.enrichment.matching import article_year, surname
+from src.utils.text import normalize_title
+
+# 64 hash functions split into 16 bands of 4 rows: titles with Jaccard similarity
+# around 0.8 share at least one band with near certainty, unrelated titles rarely do
+NUM_PERM = 64
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERM // NUM_BANDS
+SHINGLE_SIZE = 4
+
+# Estimated Jaccard similarity of title shingles above which two records may be the same paper
+NEAR_DUP_THRESHOLD = 0.8
+# A preprint and its published version can be dated a year apart
+MAX_YEAR_GAP = 1
+# Words that tell apart papers with otherwise identical titles: sequels ("Part 2") and
+# studies of another population ("in adolescents" vs "in adults")
+ROMAN_NUMERALS = frozenset("i ii iii iv v vi vii viii ix x".split())
+POPULATION_WORDS = frozenset(
+    "adult adults adolescent adolescents child children childhood infant infants neonates preterm toddlers youth "
+    "young older elderly aged men women male female boys girls mothers fathers parents students veterans "
+    "pediatric paediatric geriatric patients outpatients inpatients mice mouse rats rat animals humans".split()
+)
+
+# NUM_PERM little-endian 32-bit hashes: one shingle's hashes, or a packed signature
+_SIGNATURE_FORMAT = f"<{NUM_PERM}I"
+
+
+def shingles(title_norm: str) -> set:
+    """Character shingles of a normalized title (spaces included, so word boundaries count)."""
+    text = f" {title_norm} "
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _shingle_hashes(shingle: str):
+    # One extendable-output digest gives all NUM_PERM independent 32-bit hashes of a shingle at once
+    return struct.unpack(_SIGNATURE_FORMAT, hashlib.shake_128(shingle.encode("utf-8")).digest(NUM_PERM * 4))
+
+
+def minhash_signature(title_norm: str) -> List[int]:
+    """Per hash function, the minimum hash over the title's shingles."""
+    rows = [_shingle_hashes(s) for s in shingles(title_norm)]
+    return list(map(min, zip(*rows)))
+
+
+def band_keys(signature: List[int]) -> List[int]:
+    """One LSH bucket key per band, as a signed 64-bit integer (SQLite INTEGER)."""
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f"<I{ROWS_PER_BAND}I", band, *rows), digest_size=8).digest()
+        keys.append(struct.unpack("<q", digest)[0])
+    return keys
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Fraction of agreeing MinHash positions, an unbiased estimate of Jaccard similarity."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def pack_signature(signature: List[int]) -> bytes:
+    return struct.pack(_SIGNATURE_FORMAT, *signature)
+
+
+def unpack_signature(blob: bytes) -> List[int]:
+    return list(struct.unpack(_SIGNATURE_FORMAT, blob))
+
+
+def titles_conflict(title_norm_a: str, title_norm_b: str) -> bool:
+    """Whether the words the two normalized titles don't share include a number or a population."""
+    differing = set(title_norm_a.split()) ^ set(title_norm_b.split())
+    return any(word.isdigit() or word in ROMAN_NUMERALS or word in POPULATION_WORDS for word in differing)
+
+
+def same_paper(article: Dict, stored: Dict) -> bool:
+    """
+    Whether an article whose title is a near-duplicate of a stored record's is a version of
+    that paper rather than a different paper with a similar title. The titles must not differ
+    in a number or population word, the first authors' surnames must agree and, when both
+    are known, the years must be at most MAX_YEAR_GAP apart. (Matching DOIs are caught
+    before titles are compared.)
+    """
+    if titles_conflict(normalize_title(article.get("title", "")), normalize_title(stored.get("title", ""))):
+        return False
+    first_authors = [surname(authors[0]) if authors else ""
+                     for authors in (article.get("authors"), stored.get("authors"))]
+    if not all(first_authors) or first_authors[0] != first_authors[1]:
+        return False
+    years = [article_year(article), article_year(stored)]
+    return None in years or abs(years[0] - years[1]) <= MAX_YEAR_GAP
@@ -0,0 +1,201 @@
+# src/data_store/run_journal.py
+
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+from src.data_store.db_handler import get_connection, get_articles_by_links, connection_lock
+
+RUNNING, FAILED, FINISHED, ABANDONED = "running", "failed", "finished", "abandoned"
+# Results kept after a run finishes so its report can be rebuilt without the LLM;
+# everything else (saved LLM calls) is dropped
+KEPT_RESULTS = ("summary", "digest", "report_articles", "report_sections", "report_excluded")
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class RunJournal:
+    """
+    Per-run progress kept in the article store, so an interrupted run can be resumed.
+    Records completed steps ("ingested", "selected", "summarized", "report written", ...),
+    the run's article set, and the text of every LLM call that has completed, keyed by
+    its response cache key. Everything is committed as it is recorded.
+    """
+
+    def __init__(self, run_id: int, options: Dict):
+        self.run_id = run_id
+        self.options = options
+        self.resumed_results = 0
+
+    @staticmethod
+    def _unfinished_runs(conn, profile: str = None) -> List:
+        """(id, options) of running or failed runs of a digest profile, newest first."""
+        rows = conn.execute(
+            "SELECT id, options FROM runs WHERE status IN (?, ?) ORDER BY id DESC", (RUNNING, FAILED)
+        ).fetchall()
+        # Runs from before profiles existed belong to the default profile
+        return [(run_id, json.loads(options)) for run_id, options in rows
+                if json.loads(options).get("profile") == profile]
+
+    @classmethod
+    def start(cls, options: Dict) -> "RunJournal":
+        """
+        Begin a new run. Unfinished earlier runs of the same profile (options["profile"])
+        can no longer be resumed; other profiles' runs are left alone.
+        """
+        conn = get_connection()
+        with connection_lock():
+            unfinished = cls._unfinished_runs(conn, options.get("profile"))
+            conn.executemany("UPDATE runs SET status = ? WHERE id = ?", [(ABANDONED, run_id) for run_id, _ in unfinished])
+            conn.execute(
+                f"DELETE FROM run_results WHERE key NOT IN ({','.join('?' * len(KEPT_RESULTS))}) "
+                f"AND run_id NOT IN (SELECT id FROM runs WHERE status = ?)", (*KEPT_RESULTS, RUNNING),
+            )
+            cursor = conn.execute(
+                "INSERT INTO runs (started, status, options) VALUES (?, ?, ?)", (_now(), RUNNING, json.dumps(options))
+            )
+            conn.commit()
+        return cls(cursor.lastrowid, options)
+
+    @classmethod
+    def resume_latest(cls, profile: str = None) -> Optional["RunJournal"]:
+        """Return the profile's most recent run that crashed or failed, marked running again, or None."""
+        conn = get_connection()
+        with connection_lock():
+            unfinished = cls._unfinished_runs(conn, profile)
+            if not unfinished:
+                return None
+            run_id, options = unfinished[0]
+            conn.execute("UPDATE runs SET status = ?, error = NULL WHERE id = ?", (RUNNING, run_id))
+            conn.commit()
+        return cls(run_id, options)
+
+    @classmethod
+    def load(cls, run_id: int = None, profile: str = None) -> Optional["RunJournal"]:
+        """
+        The run with the given id, or the profile's most recent finished run, without
+        changing its status.
+        """
+        conn = get_connection()
+        with connection_lock():
+            if run_id is None:
+                rows = conn.execute(
+                    "SELECT id, options FROM runs WHERE status = ? ORDER BY id DESC", (FINISHED,)
+                ).fetchall()
+                rows = [row for row in rows if json.loads(row[1]).get("profile") == profile][:1]
+            else:
+                rows = conn.execute("SELECT id, options FROM runs WHERE id = ?", (run_id,)).fetchall()
+        return cls(rows[0][0], json.loads(rows[0][1])) if rows else None
+
+    @staticmethod
+    def recent_runs(limit: int = 10) -> List[Dict]:
+        """The latest runs, newest first, as dicts of id, started, finished, status, error and profile."""
+        conn = get_connection()
+        with connection_lock():
+            rows = conn.execute(
+                "SELECT id, started, finished, status, error, options FROM runs ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(zip(("id", "started", "finished", "status", "error"), row[:5]),
+                     profile=json.loads(row[5]).get("profile")) for row in rows]
+
+    def record_step(self, step: str, detail: str = "") -> None:
+        conn = get_connection()
+        with connection_lock():
+            conn.execute(
+                "INSERT OR REPLACE INTO run_steps (run_id, step, detail, recorded) VALUES (?, ?, ?, ?)",
+                (self.run_id, step, detail, _now()),
+            )
+            conn.commit()
+
+    def step_detail(self, step: str) -> Optional[str]:
+        """The detail recorded with a completed step, or None if the step hasn't completed."""
+        conn = get_connection()
+        with connection_lock():
+            row = conn.execute(
+                "SELECT detail FROM run_steps WHERE run_id = ? AND step = ?", (self.run_id, step)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_done(self, step: str) -> bool:
+        return self.step_detail(step) is not None
+
+    def completed_steps(self) -> List[str]:
+        conn = get_connection()
+        with connection_lock():
+            rows = conn.execute(
+                "SELECT step FROM run_steps WHERE run_id = ? ORDER BY recorded, rowid", (self.run_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def add_articles(self, articles: List[Dict]) -> None:
+        """Append articles to the run's article set (by link, keeping order)."""
+        links = [a["link"] for a in articles if a.get("link")]
+        if not links:
+            return
+        conn = get_connection()
+        with connection_lock():
+            start = conn.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM run_articles WHERE run_id = ?", (self.run_id,)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO run_articles (run_id, position, link) VALUES (?, ?, ?)",
+                [(self.run_id, start + i, link) for i, link in enumerate(links)],
+            )
+            conn.commit()
+
+    def load_articles(self) -> List[Dict]:
+        """The run's article set as currently stored."""
+        conn = get_connection()
+        with connection_lock():
+            links = [row[0] for row in conn.execute(
+                "SELECT link FROM run_articles WHERE run_id = ? ORDER BY position", (self.run_id,)
+            )]
+        return get_articles_by_links(links)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Result saved under key by an earlier attempt at this run, or None."""
+        conn = get_connection()
+        with connection_lock():
+            row = conn.execute(
+                "SELECT content FROM run_results WHERE run_id = ? AND key = ?", (self.run_id, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def reuse_llm_result(self, key: str) -> Optional[str]:
+        """Like lookup, for an LLM call; a hit is a call the resumed run skips, counted in resumed_results."""
+        content = self.lookup(key)
+        if content is not None:
+            with connection_lock():
+                self.resumed_results += 1
+        return content
+
+    def record(self, key: str, content: str) -> None:
+        conn = get_connection()
+        with connection_lock():
+            conn.execute(
+                "INSERT OR REPLACE INTO run_results (run_id, key, content) VALUES (?, ?, ?)",
+                (self.run_id, key, content),
+            )
+            conn.commit()
+
+    def _set_status(self, status: str, error: str = None) -> None:
+        conn = get_connection()
+        with connection_lock():
+            conn.execute(
+                "UPDATE runs SET status = ?, finished = ?, error = ? WHERE id = ?",
+                (status, _now(), error, self.run_id),
+            )
+            if status == FINISHED:
+                # The report is written; saved LLM results are no longer needed
+                conn.execute(
+                    f"DELETE FROM run_results WHERE run_id = ? AND key NOT IN ({','.join('?' * len(KEPT_RESULTS))})",
+                    (self.run_id, *KEPT_RESULTS),
+                )
+            conn.commit()
+
+    def finish(self) -> None:
+        self._set_status(FINISHED)
+
+    def fail(self, error: str) -> None:
+        self._set_status(FAILED, error)
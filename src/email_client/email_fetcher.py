@@ -1,69 +1,243 @@
 # src/email_client/email_fetcher.py
 import imaplib
-import email
+import re
+import select
+import time
 from email.header import decode_header
-from typing import List
-from src.config import EMAIL_USERNAME, EMAIL_PASSWORD, EMAIL_SERVER, EMAIL_FOLDER
+from typing import Iterator, List, Optional, Tuple
+from src.config import (
+    EMAIL_USERNAME, EMAIL_PASSWORD, EMAIL_SERVER, EMAIL_IMAP_PORT, EMAIL_USE_SSL, EMAIL_FOLDER, EMAIL_FETCH_BATCH_SIZE,
+)
+from src.email_client.imap_utils import compress_uid_set, parse_fetch_response, find_html_part, decode_part
 from src.utils.logger import logger
+from src.utils.metrics import metrics
+
+SCHOLAR_SEARCH_CRITERIA = '(UNSEEN FROM "scholaralerts-noreply@google.com")'
+# Untagged responses that mean new mail arrived in the selected mailbox
+NEW_MAIL_PATTERN = re.compile(rb"^\* \d+ (EXISTS|RECENT)\b", re.IGNORECASE)
+# How long the server may take to answer IDLE or DONE before the connection counts as dead
+IDLE_RESPONSE_TIMEOUT = 30
 
 def connect_to_email():
     # Connect to the IMAP server and log in
-    mail = imaplib.IMAP4_SSL(EMAIL_SERVER)
+    if EMAIL_USE_SSL:
+        mail = imaplib.IMAP4_SSL(EMAIL_SERVER, EMAIL_IMAP_PORT)
+    else:
+        mail = imaplib.IMAP4(EMAIL_SERVER, EMAIL_IMAP_PORT)
     mail.login(EMAIL_USERNAME, EMAIL_PASSWORD)
     return mail
 
-def fetch_unread_scholar_emails() -> List[str]:
+def open_scholar_mailbox():
+    """Connect and select the alert folder (read-only=False so we can mark messages as read)."""
+    mail = connect_to_email()
+    mail.select(EMAIL_FOLDER, readonly=False)
+    return mail
+
+def close_mailbox(mail) -> None:
+    mail.close()
+    mail.logout()
+
+def supports_idle(mail) -> bool:
+    return "IDLE" in mail.capabilities
+
+class _SocketLines:
     """
-    Fetch unread Google Scholar alert emails from the inbox.
-    Returns a list of raw HTML email bodies.
+    CRLF-terminated lines read straight from the connection's socket, with a deadline.
+    imaplib's buffered reader can't be given a timeout without breaking it for later
+    commands, so IDLE reads the socket itself. Between commands nothing is buffered.
     """
 
-    mail = connect_to_email()
-    # Select the mailbox (read-only=False so we can mark as read if we want)
-    mail.select(EMAIL_FOLDER, readonly=False)
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b""
 
-    # Search for unread messages
-    status, messages = mail.search(None, '(UNSEEN FROM "scholaralerts-noreply@google.com")')
+    def readline(self, deadline: float) -> Optional[bytes]:
+        """The next line, or None if none arrived before deadline (time.monotonic())."""
+        while b"\r\n" not in self.buffer:
+            # Decrypted TLS data may already be waiting even though the socket isn't readable
+            pending = self.sock.pending() if hasattr(self.sock, "pending") else 0
+            if not pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([self.sock], [], [], remaining)[0]:
+                    return None
+            data = self.sock.recv(4096)
+            if not data:
+                raise imaplib.IMAP4.abort("connection closed by the server")
+            self.buffer += data
+        line, _, self.buffer = self.buffer.partition(b"\r\n")
+        return line
+
+def idle_wait(mail, timeout: float) -> bool:
+    """
+    Wait in IMAP IDLE (RFC 2177) until the server reports new mail or timeout seconds pass.
+    Returns True if new mail arrived. Raises imaplib.IMAP4.abort if the connection is
+    gone, so the caller can reconnect. Servers without IDLE are polled instead: this
+    sleeps for timeout and returns True so the caller searches again.
+    imaplib (before Python 3.14) has no IDLE command, so it is driven by hand here.
+    """
+    if not supports_idle(mail):
+        time.sleep(timeout)
+        return True
+    tag = mail._new_tag()
+    mail.send(tag + b" IDLE\r\n")
+    lines = _SocketLines(mail.sock)
+    line = lines.readline(time.monotonic() + IDLE_RESPONSE_TIMEOUT)
+    if line is None or not line.startswith(b"+"):
+        raise imaplib.IMAP4.abort(f"IDLE refused: {line!r}")
+
+    changed = False
+    deadline = time.monotonic() + timeout
+    while not changed:
+        line = lines.readline(deadline)
+        if line is None:
+            break
+        # Other untagged updates ("* OK still here", EXPUNGE, FLAGS) don't need a search
+        changed = bool(NEW_MAIL_PATTERN.match(line))
+
+    mail.send(b"DONE\r\n")
+    while True:
+        line = lines.readline(time.monotonic() + IDLE_RESPONSE_TIMEOUT)
+        if line is None:
+            raise imaplib.IMAP4.abort("no response to DONE")
+        if line.startswith(tag + b" "):
+            if not line[len(tag) + 1:].upper().startswith(b"OK"):
+                raise imaplib.IMAP4.abort(f"IDLE failed: {line!r}")
+            break
+        changed = changed or bool(NEW_MAIL_PATTERN.match(line))
+    metrics.count("imap.idle_waits")
+    return changed
+
+class FetchStats:
+    """Round-trips and payload bytes spent talking to the IMAP server."""
+
+    def __init__(self):
+        self.round_trips = 0
+        self.bytes = 0
+        self.messages = 0
+
+    def record(self, data) -> None:
+        received = 0
+        for item in data or []:
+            if isinstance(item, tuple):
+                received += sum(len(part) for part in item if part)
+            elif item:
+                received += len(item)
+        self.round_trips += 1
+        self.bytes += received
+        metrics.count("imap.round_trips")
+        metrics.count("imap.bytes", received)
+
+fetch_stats = FetchStats()
+
+def search_unread_scholar_ids(mail) -> List[bytes]:
+    """Return the UIDs of unread Google Scholar alert messages in the selected mailbox."""
+    with metrics.timer("imap.search"):
+        status, messages = mail.uid('SEARCH', None, SCHOLAR_SEARCH_CRITERIA)
+    fetch_stats.record(messages)
     if status != 'OK':
         logger.error("Could not search mailbox.")
         return []
+    return messages[0].split()
 
-    email_ids = messages[0].split()
-    html_bodies = []
+def fetch_html_sections(mail, uids: List[bytes]):
+    """
+    Find where the text/html part lives in each message with one bulk BODYSTRUCTURE fetch.
+    Returns {uid: (section, transfer encoding, charset)} for messages that have an HTML part.
+    """
+    with metrics.timer("imap.fetch_structure"):
+        status, data = mail.uid('FETCH', compress_uid_set(uids), '(UID BODYSTRUCTURE)')
+    fetch_stats.record(data)
+    if status != 'OK':
+        logger.warning(f"Failed to fetch BODYSTRUCTURE for UIDs {compress_uid_set(uids)}")
+        return {}
+
+    sections = {}
+    for message in parse_fetch_response(data):
+        uid = message.get(b'UID')
+        if uid is None:
+            continue
+        html_part = find_html_part(message.get(b'BODYSTRUCTURE'))
+        if html_part:
+            sections[uid] = html_part
+        else:
+            logger.warning(f"No HTML part found in email with UID {uid.decode()}")
+    return sections
 
-    for eid in email_ids:
-        # Fetch the email by ID
-        status, data = mail.fetch(eid, '(RFC822)')
+def fetch_html_bodies(mail, sections) -> dict:
+    """
+    Download only the HTML part of each message, with BODY.PEEK so nothing is marked read.
+    Messages whose HTML lives in the same section are fetched in a single UID FETCH.
+    Returns {uid: decoded HTML}.
+    """
+    by_section = {}
+    for uid, (section, _, _) in sections.items():
+        by_section.setdefault(section, []).append(uid)
+
+    bodies = {}
+    for section, uids in by_section.items():
+        with metrics.timer("imap.fetch_body"):
+            status, data = mail.uid('FETCH', compress_uid_set(uids), f'(UID BODY.PEEK[{section}])')
+        fetch_stats.record(data)
         if status != 'OK':
-            logger.warning(f"Failed to fetch email with ID {eid.decode()}")
+            logger.warning(f"Failed to fetch section {section} for UIDs {compress_uid_set(uids)}")
             continue
+        body_key = f"BODY[{section}]".encode()
+        for message in parse_fetch_response(data):
+            uid = message.get(b'UID')
+            payload = message.get(body_key)
+            if uid not in sections or payload is None:
+                continue
+            _, encoding, charset = sections[uid]
+            bodies[uid] = decode_part(payload, encoding, charset)
+    return bodies
 
-        raw_email = data[0][1]
-        msg = email.message_from_bytes(raw_email)
-        
-        # The email might be multipart. We need to find the HTML part.
-        html_content = None
-        if msg.is_multipart():
-            for part in msg.walk():
-                ctype = part.get_content_type()
-                if ctype == 'text/html':
-                    charset = part.get_content_charset() or 'utf-8'
-                    html_content = part.get_payload(decode=True).decode(charset, errors='replace')
-                    break
-        else:
-            # If not multipart, check if it's HTML directly
-            if msg.get_content_type() == 'text/html':
-                charset = msg.get_content_charset() or 'utf-8'
-                html_content = msg.get_payload(decode=True).decode(charset, errors='replace')
-
-        if html_content:
-            html_bodies.append(html_content)
-            # Mark the email as seen (read)
-            mail.store(eid, '+FLAGS', '\\Seen')
-        else:
-            logger.warning(f"No HTML part found in email with ID {eid.decode()}")
+def iter_unread_scholar_emails(mail, batch_size: int = None) -> Iterator[Tuple[bytes, str]]:
+    """
+    Yield (UID, HTML body) for each unread Scholar alert as it is downloaded.
+    UIDs are fetched in batches: one BODYSTRUCTURE fetch per batch, then one
+    BODY.PEEK fetch per distinct HTML section, so messages stay unread until
+    mark_emails_seen is called.
+    """
+    batch_size = batch_size or EMAIL_FETCH_BATCH_SIZE
+    uids = search_unread_scholar_ids(mail)
+    for start in range(0, len(uids), batch_size):
+        batch = uids[start:start + batch_size]
+        sections = fetch_html_sections(mail, batch)
+        if not sections:
+            continue
+        bodies = fetch_html_bodies(mail, sections)
+        for uid in batch:
+            if uid in bodies:
+                fetch_stats.messages += 1
+                metrics.count("imap.messages")
+                yield uid, bodies[uid]
+            elif uid in sections:
+                logger.warning(f"Failed to fetch email with UID {uid.decode()}")
 
-    mail.close()
-    mail.logout()
+def mark_emails_seen(mail, email_uids: List[bytes]) -> None:
+    """Flag the given messages as \\Seen with a single UID STORE."""
+    if not email_uids:
+        return
+    with metrics.timer("imap.store"):
+        status, data = mail.uid('STORE', compress_uid_set(email_uids), '+FLAGS', '(\\Seen)')
+    fetch_stats.record(data)
+    if status != 'OK':
+        logger.warning(f"Failed to mark {len(email_uids)} emails as read.")
+
+def fetch_unread_scholar_emails() -> List[str]:
+    """
+    Fetch unread Google Scholar alert emails from the inbox and mark them as read.
+    Returns a list of raw HTML email bodies. Kept for callers of the old all-at-once API;
+    the pipeline streams through iter_unread_scholar_emails and mark_emails_seen, and
+    fetch time is recorded by their imap.* timers.
+    """
+    mail = open_scholar_mailbox()
+    html_bodies = []
+    fetched_ids = []
+    for eid, html_content in iter_unread_scholar_emails(mail):
+        html_bodies.append(html_content)
+        fetched_ids.append(eid)
+    mark_emails_seen(mail, fetched_ids)
+    close_mailbox(mail)
 
-    return html_bodies
\ No newline at end of file
+    return html_bodies
@@ -1,8 +1,36 @@
 # src/email_client/email_parser.py
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import atexit
+import multiprocessing
 import re
+import threading
 import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from src.config import PARSER_MODE, PARSE_WORKERS, PARSE_POOL_MIN_EMAILS
+from src.utils.metrics import metrics, timed
+
+try:
+    import lxml  # noqa: F401  (only needed to pick the faster tree builder)
+    FAST_HTML_PARSER = "lxml"
+except ImportError:
+    FAST_HTML_PARSER = "html.parser"
+
+AUTHORS_STYLE_PATTERN = re.compile("color:#006621")
+
+def _is_alert_element(name, attrs):
+    """Keep only article headings and the author/snippet divs, not layout wrappers."""
+    if name == "h3":
+        return True
+    if name != "div" or not attrs:
+        return False
+    css_class = attrs.get("class") or ""
+    if not isinstance(css_class, str):
+        css_class = " ".join(css_class)
+    return "gse_alrt_sni" in css_class.split() or bool(AUTHORS_STYLE_PATTERN.search(attrs.get("style") or ""))
+
+# The fast path only builds a tree for the article headings and the divs that follow them
+ALERT_STRAINER = SoupStrainer(_is_alert_element)
 
 def clean_title_line(title_line: str) -> str:
     # Remove leading [PDF], [HTML], etc.
@@ -20,10 +48,59 @@ def extract_actual_link(redirect_url: str) -> str:
         return qs['url'][0]
     return redirect_url
 
-def parse_scholar_alert(raw_email_html: str):
+def parse_authors_line(authors_line: str):
+    """Split a Scholar 'A Author, B Author - Source, 2024' line into (authors, source)."""
+    authors = []
+    source = ""
+    if '- ' in authors_line:
+        authors_part, source_part = authors_line.split('- ', 1)
+        # authors separated by commas
+        authors = [a.strip() for a in authors_part.split(',') if a.strip()]
+
+        # Remove trailing ", year" if present
+        source_part = re.sub(r',\s*\d{4}$', '', source_part).strip()
+        source = source_part
+    else:
+        # If no ' - ', treat the entire line as source
+        source = authors_line.strip()
+    return authors, source
+
+def parse_year(authors_line: str) -> str:
+    """Publication year from the source part of a Scholar author line, or '' if it has none."""
+    _, _, source_part = authors_line.partition('- ')
+    match = re.search(r',\s*((?:19|20)\d{2})\b', source_part)
+    return match.group(1) if match else ""
+
+def build_article(title_a, authors_line: str, snippet: str):
+    # Extract title
+    raw_title = title_a.get_text(strip=True)
+    title = clean_title_line(raw_title)
+
+    # Extract link (Scholar redirect)
+    redirect_url = title_a.get("href", "")
+    link = extract_actual_link(redirect_url)
+
+    # Parse authors and source
+    authors, source = parse_authors_line(authors_line)
+
+    return {
+        "title": title,
+        "link": link,
+        "snippet": snippet,
+        "source": source,
+        "authors": authors,
+        "year": parse_year(authors_line),
+        "publication_date": ""
+    }
+
+@timed("parse_scholar_alert")
+def parse_scholar_alert(raw_email_html: str, mode: str = None):
     """
     Parse a Google Scholar alert HTML to extract articles.
 
+    mode selects the implementation: "fast" (one linear pass, the default via PARSER_MODE)
+    or "reference" (the original tree walk). Both produce the same article dicts.
+
     Returns:
         List of article dicts:
         {
@@ -32,9 +109,63 @@ def parse_scholar_alert(raw_email_html: str):
           "snippet": str,
           "source": str,
           "authors": list[str],
+          "year": str,  # from the author line, '' if absent
           "publication_date": ""
         }
     """
+    if (mode or PARSER_MODE) == "reference":
+        return parse_scholar_alert_reference(raw_email_html)
+    return parse_scholar_alert_fast(raw_email_html)
+
+def parse_scholar_alert_fast(raw_email_html: str):
+    """
+    Parse an alert in a single document-order pass over the <h3>/<div> elements.
+    Each article's author and snippet divs are only looked for between its own <h3>
+    and the next one, so a missing div never pulls in the next article's data.
+    """
+    soup = BeautifulSoup(raw_email_html, FAST_HTML_PARSER, parse_only=ALERT_STRAINER)
+    articles = []
+
+    title_a = None
+    authors_line = None
+    snippet = None
+
+    def flush():
+        if title_a is not None:
+            articles.append(build_article(title_a, authors_line or "", snippet or ""))
+
+    for element in soup.find_all(["h3", "div"]):
+        if element.name == "h3":
+            link = element.find("a", class_="gse_alrt_title")
+            if link is None:
+                continue  # Not an article title block
+            flush()
+            title_a, authors_line, snippet = link, None, None
+        elif title_a is None:
+            continue
+        elif authors_line is None and snippet is None and AUTHORS_STYLE_PATTERN.search(element.get("style", "")):
+            authors_line = element.get_text(strip=True)
+        elif snippet is None and "gse_alrt_sni" in (element.get("class") or []):
+            snippet = element.get_text(" ", strip=True)
+
+    flush()
+    return articles
+
+def _article_divs(h3):
+    """The <div>s after an article's <h3>, up to the next article heading."""
+    for element in h3.next_elements:
+        if getattr(element, "name", None) == "h3" and element.find("a", class_="gse_alrt_title"):
+            return
+        if getattr(element, "name", None) == "div":
+            yield element
+
+def parse_scholar_alert_reference(raw_email_html: str):
+    """
+    The original parser: builds the full tree and searches forward from every <h3>.
+    Kept as the reference the fast path is checked against. The search stops at the
+    next article heading, so an article missing its author or snippet div is left
+    without one instead of taking the next article's.
+    """
     soup = BeautifulSoup(raw_email_html, "html.parser")
     articles = []
     
@@ -45,49 +176,77 @@ def parse_scholar_alert(raw_email_html: str):
         title_a = h3.find("a", class_="gse_alrt_title")
         if not title_a:
             continue  # Not an article title block
-        
-        # Extract title
-        raw_title = title_a.get_text(strip=True)
-        title = clean_title_line(raw_title)
-
-        # Extract link (Scholar redirect)
-        redirect_url = title_a.get("href", "")
-        link = extract_actual_link(redirect_url)
-
-        # The next element(s) after h3:
-        # - The authors/source div is right after the h3 (possibly with a <br> or newline)
-        authors_source_div = h3.find_next("div", style=re.compile("color:#006621"))
+
+        # The authors/source div is right after the h3 (possibly with a <br> or newline),
+        # then the snippet div; either may be missing
+        authors_source_div = snippet_div = None
+        for div in _article_divs(h3):
+            is_authors_div = AUTHORS_STYLE_PATTERN.search(div.get("style", ""))
+            if authors_source_div is None and snippet_div is None and is_authors_div:
+                authors_source_div = div
+            elif snippet_div is None and "gse_alrt_sni" in (div.get("class") or []):
+                snippet_div = div
+                break
         authors_line = authors_source_div.get_text(strip=True) if authors_source_div else ""
+        snippet = snippet_div.get_text(" ", strip=True) if snippet_div else ""
 
-        # Parse authors and source
-        authors = []
-        source = ""
+        articles.append(build_article(title_a, authors_line, snippet))
 
-        if '- ' in authors_line:
-            authors_part, source_part = authors_line.split('- ', 1)
-            # authors separated by commas
-            authors = [a.strip() for a in authors_part.split(',') if a.strip()]
+    return articles
 
-            # Remove trailing ", year" if present
-            source_part = re.sub(r',\s*\d{4}$', '', source_part).strip()
-            source = source_part
-        else:
-            # If no ' - ', treat the entire line as source
-            source = authors_line.strip()
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
 
-        # Next, the snippet line:
-        snippet_div = authors_source_div.find_next("div", class_="gse_alrt_sni") if authors_source_div else None
-        snippet = snippet_div.get_text(" ", strip=True) if snippet_div else ""
+def _pool_context():
+    """
+    Start workers without fork: the pool is created from the ingest worker thread while
+    other threads may hold locks (logging, SQLite, HTTP pools), and a forked child would
+    inherit them locked. forkserver forks workers from a clean single-threaded server
+    that has already imported the parser; spawn is the fallback where it is unavailable.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
 
-        article = {
-            "title": title,
-            "link": link,
-            "snippet": snippet,
-            "source": source,
-            "authors": authors,
-            "publication_date": ""
-        }
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Return a process pool that lives for the rest of the run, so batches don't pay pool startup."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            else:
+                atexit.register(shutdown_parse_pool)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+            _pool_workers = workers
+        return _pool
+
+def shutdown_parse_pool() -> None:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _pool_workers = 0
 
-        articles.append(article)
+@timed("parse_scholar_alerts")
+def parse_scholar_alerts(html_bodies, workers: int = None, mode: str = None):
+    """
+    Parse many alert emails, returning one article list per email in input order.
+    Large batches are fanned out over a process pool in chunks (parsing is CPU-bound
+    and holds the GIL); batches smaller than PARSE_POOL_MIN_EMAILS are parsed in-process.
+    """
+    workers = PARSE_WORKERS if workers is None else workers
+    html_bodies = list(html_bodies)
+    metrics.count("parse.emails", len(html_bodies))
+    metrics.count("parse.html_chars", sum(len(body) for body in html_bodies))
+    if workers <= 1 or len(html_bodies) < PARSE_POOL_MIN_EMAILS:
+        return [parse_scholar_alert(body, mode) for body in html_bodies]
 
-    return articles
\ No newline at end of file
+    # A few chunks per worker keeps workers busy without paying IPC per email
+    chunksize = max(1, len(html_bodies) // (workers * 4))
+    modes = [mode] * len(html_bodies)
+    return list(_get_pool(workers).map(parse_scholar_alert, html_bodies, modes, chunksize=chunksize))
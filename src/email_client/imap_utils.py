@@ -0,0 +1,163 @@
+# src/email_client/imap_utils.py
+import base64
+import quopri
+import re
+from typing import Dict, List, Optional, Tuple
+
+_LITERAL_MARKER = re.compile(rb"\{(\d+)\}$")
+_ATOM_DELIMITERS = b" ()\"\r\n"
+
+
+class _Literal(bytes):
+    """A literal string taken verbatim from an imaplib (header, literal) tuple."""
+
+
+def compress_uid_set(uids) -> str:
+    """Collapse UIDs into an IMAP message set, e.g. [1, 2, 3, 7, 9, 10] -> '1:3,7,9:10'."""
+    numbers = sorted({int(uid) for uid in uids})
+    ranges = []
+    for number in numbers:
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+    return ",".join(str(lo) if lo == hi else f"{lo}:{hi}" for lo, hi in ranges)
+
+
+def _segments(data) -> List[bytes]:
+    """
+    Flatten an imaplib FETCH response into text segments and literals.
+    imaplib returns a literal as a (header ending in {n}, literal bytes) tuple.
+    """
+    segments = []
+    for item in data:
+        if item is None:
+            continue
+        if isinstance(item, tuple):
+            header, literal = item
+            segments.append(_LITERAL_MARKER.sub(b"", header))
+            segments.append(_Literal(literal))
+        else:
+            segments.append(item)
+    return segments
+
+
+def _tokenize(data):
+    for segment in _segments(data):
+        if isinstance(segment, _Literal):
+            yield segment
+            continue
+        i, length = 0, len(segment)
+        while i < length:
+            ch = segment[i:i + 1]
+            if ch in (b" ", b"\r", b"\n"):
+                i += 1
+            elif ch in (b"(", b")"):
+                yield ch.decode()
+                i += 1
+            elif ch == b'"':
+                i += 1
+                value = bytearray()
+                while i < length and segment[i:i + 1] != b'"':
+                    if segment[i:i + 1] == b"\\":
+                        i += 1
+                    value += segment[i:i + 1]
+                    i += 1
+                i += 1
+                yield _Literal(bytes(value))
+            else:
+                start = i
+                depth = 0
+                # Section specs like BODY[1.2] may contain spaces/parens inside the brackets
+                while i < length and (depth or segment[i] not in _ATOM_DELIMITERS):
+                    if segment[i:i + 1] == b"[":
+                        depth += 1
+                    elif segment[i:i + 1] == b"]":
+                        depth -= 1
+                    i += 1
+                yield segment[start:i]
+
+
+def _parse(tokens):
+    """Parse one value: a parenthesized list, a string/literal, NIL, or an atom."""
+    token = next(tokens)
+    if token == "(":
+        items = []
+        while True:
+            value = _parse(tokens)
+            if value == ")":
+                return items
+            items.append(value)
+    if token == ")":
+        return ")"
+    if isinstance(token, _Literal):
+        return bytes(token)
+    if token.upper() == b"NIL":
+        return None
+    return token
+
+
+def parse_fetch_response(data) -> List[Dict[bytes, object]]:
+    """
+    Parse an imaplib FETCH/UID FETCH response into one dict per message, mapping
+    item names (b'UID', b'BODYSTRUCTURE', b'BODY[1.2]', ...) to their parsed values.
+    """
+    tokens = _tokenize(data)
+    messages = []
+    while True:
+        try:
+            _sequence_number = next(tokens)
+            items = _parse(tokens)
+        except StopIteration:
+            return messages
+        if not isinstance(items, list):
+            continue
+        message = {}
+        for name, value in zip(items[0::2], items[1::2]):
+            message[name.upper()] = value
+        messages.append(message)
+
+
+def find_html_part(structure, path: str = "") -> Optional[Tuple[str, str, str]]:
+    """
+    Walk a parsed BODYSTRUCTURE and return (section, transfer encoding, charset)
+    for the first text/html part, or None if the message has no HTML part.
+    """
+    if not isinstance(structure, list) or not structure:
+        return None
+
+    if isinstance(structure[0], list):
+        # Multipart: child bodies first, then the multipart subtype
+        for index, child in enumerate(structure, start=1):
+            if not isinstance(child, list):
+                break
+            found = find_html_part(child, f"{path}.{index}" if path else str(index))
+            if found:
+                return found
+        return None
+
+    media_type = (structure[0] or b"").decode(errors="replace").lower()
+    subtype = (structure[1] or b"").decode(errors="replace").lower() if len(structure) > 1 else ""
+    if media_type != "text" or subtype != "html":
+        return None
+
+    params = structure[2] if len(structure) > 2 and isinstance(structure[2], list) else []
+    charset = "utf-8"
+    for key, value in zip(params[0::2], params[1::2]):
+        if key and key.lower() == b"charset" and value:
+            charset = value.decode(errors="replace")
+    encoding = structure[5].decode(errors="replace").lower() if len(structure) > 5 and structure[5] else "7bit"
+    # A single-part message's body is section 1
+    return path or "1", encoding, charset
+
+
+def decode_part(payload: bytes, encoding: str, charset: str) -> str:
+    """Undo the part's Content-Transfer-Encoding and decode it to text."""
+    if encoding == "base64":
+        payload = base64.b64decode(payload)
+    elif encoding == "quoted-printable":
+        payload = quopri.decodestring(payload)
+    try:
+        return payload.decode(charset, errors="replace")
+    except LookupError:
+        return payload.decode("utf-8", errors="replace")
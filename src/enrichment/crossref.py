@@ -1,8 +1,90 @@
 import requests
 import re
 import html
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from src.config import (
+    CROSSREF_API_URL, CROSSREF_MAILTO, CROSSREF_MAX_WORKERS, CROSSREF_RATE_LIMIT, CROSSREF_ROWS, CROSSREF_MATCH_THRESHOLD,
+    CROSSREF_DOI_BATCH, CROSSREF_CACHE_PATH, CROSSREF_CACHE_TTL_DAYS, CROSSREF_CACHE_NEGATIVE_TTL_DAYS,
+    CROSSREF_CACHE_MAX_ENTRIES,
+)
+from src.data_store.db_handler import normalize_doi
+from src.enrichment.doi import assign_link_dois, is_crossref_doi
+from src.enrichment.matching import match_articles
+from src.utils.cache import PersistentCache, MISSING
+from src.utils.http import build_session, HostRateLimiter
+from src.utils.logger import logger
+from src.utils.metrics import metrics, timed
+from src.utils.text import normalize_title
 
-CROSSREF_API_URL = "https://api.crossref.org/works"
+DAY_SECONDS = 24 * 60 * 60
+
+# Only the fields enrichment actually uses are cached, to keep entries small
+CACHED_ITEM_FIELDS = ("DOI", "title", "abstract", "author", "issued", "published-online", "published-print", "container-title")
+
+_session = None
+_session_lock = threading.Lock()
+_rate_limiter = HostRateLimiter(CROSSREF_RATE_LIMIT)
+_cache = None
+
+def get_session() -> requests.Session:
+    """Return the pooled CrossRef session shared by all enrichment workers."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            user_agent = "scholar-summarizer/0.1"
+            if CROSSREF_MAILTO:
+                user_agent += f" (mailto:{CROSSREF_MAILTO})"
+            _session = build_session(pool_size=max(CROSSREF_MAX_WORKERS, 1), user_agent=user_agent)
+        return _session
+
+def _update_rate_limit(response) -> None:
+    """
+    CrossRef advertises its current limit in X-Rate-Limit-Limit / X-Rate-Limit-Interval.
+    Never go faster than it allows, even if CROSSREF_RATE_LIMIT is set higher.
+    """
+    limit = response.headers.get("X-Rate-Limit-Limit")
+    interval = response.headers.get("X-Rate-Limit-Interval", "1s")
+    try:
+        allowed = float(limit) / float(interval.rstrip("s"))
+    except (TypeError, ValueError, ZeroDivisionError):
+        return
+    if allowed > 0 and (not _rate_limiter.rate or allowed < _rate_limiter.rate):
+        _rate_limiter.set_rate(allowed)
+
+def get_enrichment_cache() -> PersistentCache:
+    """Return the on-disk CrossRef lookup cache, keyed by normalized title and by DOI."""
+    global _cache
+    with _session_lock:
+        if _cache is None:
+            _cache = PersistentCache(
+                CROSSREF_CACHE_PATH,
+                ttl_seconds=CROSSREF_CACHE_TTL_DAYS * DAY_SECONDS,
+                max_entries=CROSSREF_CACHE_MAX_ENTRIES,
+                name="crossref",
+            )
+        return _cache
+
+def crossref_get(params: dict, path: str = ""):
+    """
+    GET the CrossRef works endpoint (or path below it) through the shared session and
+    rate limiter. Retries and backoff on 429/5xx are handled by the session's adapter.
+    """
+    if CROSSREF_MAILTO:
+        params = dict(params, mailto=CROSSREF_MAILTO)
+    url = f"{CROSSREF_API_URL}/{path}" if path else CROSSREF_API_URL
+    with metrics.timer("crossref.rate_limit_wait"):
+        _rate_limiter.wait(CROSSREF_API_URL)
+    with metrics.timer("crossref.http"):
+        response = get_session().get(url, params=params, timeout=10)
+    metrics.count("crossref.http_calls")
+    metrics.count("crossref.bytes", len(response.content))
+    retries = getattr(response.raw, "retries", None)
+    if retries is not None and retries.history:
+        metrics.count("crossref.retries", len(retries.history))
+    _update_rate_limit(response)
+    return response
 
 def clean_title(title: str) -> str:
     """
@@ -14,52 +96,69 @@ def clean_title(title: str) -> str:
     cleaned = re.sub(r"^\[.*?\]\s*", "", title, flags=re.IGNORECASE).strip()
     return cleaned
 
-def query_crossref_by_title(title: str, max_results=5):
+def query_crossref_by_title(title: str, max_results=None):
     """
-    Query the CrossRef API by title. Return up to max_results items.
+    Query the CrossRef API by title. Return up to max_results items,
+    or None if the request failed (as opposed to returning no matches).
     """
     params = {
         "query.title": title,
-        "rows": max_results
+        "rows": max_results or CROSSREF_ROWS
     }
-    response = requests.get(CROSSREF_API_URL, params=params, timeout=10)
+    response = crossref_get(params)
     if response.status_code == 200:
         return response.json().get("message", {}).get("items", [])
-    return []
-
-def best_match_article(items, original_title):
-    """
-    Given a list of CrossRef items, pick the best match by comparing the title.
-    We'll do a simple case-insensitive substring check or similarity check.
-    """
-    original_lower = original_title.lower()
-    best_item = None
-    best_score = 0.0
-
-    for item in items:
-        item_title = ""
-        # CrossRef titles are often a list, take the first if available
-        if "title" in item and isinstance(item["title"], list) and len(item["title"]) > 0:
-            item_title = item["title"][0].lower()
-        # Simple scoring: count how many words overlap, or length of substring match
-        # For now, let's do a basic similarity measure: proportion of matching words
-        original_words = set(original_lower.split())
-        item_words = set(item_title.split())
-        if not item_words:
-            continue
-        overlap = len(original_words.intersection(item_words)) / len(original_words)
-        
-        # Choose the item with the highest overlap
-        if overlap > best_score:
-            best_score = overlap
-            best_item = item
-
-    # We can also add a threshold if needed. For now, if best_score is too low (say < 0.2), 
-    # we consider it no match.
-    if best_score < 0.2:
+    return None
+
+def query_crossref_by_dois(dois):
+    """
+    Fetch the CrossRef records of up to CROSSREF_DOI_BATCH DOIs in one request using the
+    filter=doi:... form, following next-cursor pages until every DOI is accounted for.
+    Returns {lowercased DOI: item} for the DOIs CrossRef knows, or None if a request failed.
+    """
+    params = {
+        "filter": ",".join(f"doi:{doi}" for doi in dois),
+        "rows": len(dois),
+        "select": ",".join(CACHED_ITEM_FIELDS),
+        "cursor": "*",
+    }
+    found = {}
+    while True:
+        response = crossref_get(params)
+        if response.status_code != 200:
+            return None
+        message = response.json().get("message", {})
+        items = message.get("items", [])
+        for item in items:
+            if item.get("DOI"):
+                found[item["DOI"].lower()] = item
+        next_cursor = message.get("next-cursor")
+        if not items or len(found) >= len(dois) or not next_cursor or next_cursor == params["cursor"]:
+            return found
+        params["cursor"] = next_cursor
+
+def query_crossref_by_doi(doi):
+    """
+    Fetch one DOI's CrossRef record from /works/{doi}, for DOIs the filter=doi:... form
+    can't carry. Returns {lowercased DOI: item}, empty if CrossRef doesn't know the DOI,
+    or None if the request failed.
+    """
+    response = crossref_get({}, path=urllib.parse.quote(doi))
+    if response.status_code == 404:
+        return {}
+    if response.status_code != 200:
         return None
+    item = response.json().get("message", {})
+    return {item["DOI"].lower(): item} if item.get("DOI") else {}
 
-    return best_item
+def best_match_article(items, original_title, article=None):
+    """
+    Given a list of CrossRef items, pick the best match for the article (or for a bare title).
+    Returns None unless the match confidence reaches CROSSREF_MATCH_THRESHOLD.
+    """
+    article = article or {"title": original_title}
+    best_item, score = match_articles([article], [items])[0]
+    return best_item if score >= CROSSREF_MATCH_THRESHOLD else None
 
 def strip_html_tags(text: str) -> str:
     """Remove any HTML or JATS tags from the abstract."""
@@ -102,45 +201,98 @@ def extract_publication_date(item):
             return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
     return ""
 
-def enrich_article_data(article):
-    """
-    Enrich the article data by querying CrossRef with its title.
-    If a match is found, add DOI, full abstract, authors, and a standardized publication date.
-    
-    article: {
-      "title": "...",
-      "link": "...",
-      "snippet": "...",
-      "source": "...",
-      "authors": [...],
-      "publication_date": "..."
-    }
+def slim_item(item):
+    """Keep only the CrossRef fields used for enrichment."""
+    return {field: item[field] for field in CACHED_ITEM_FIELDS if field in item}
 
-    Returns the enriched article (possibly updated) or the original if no match found.
+def lookup_candidates(cleaned_title: str, doi: str = ""):
     """
-    cleaned_title = clean_title(article.get("title", ""))
-    if not cleaned_title:
-        return article
+    Return the CrossRef candidates for a title, going through the persistent cache.
+    An article whose DOI was matched before gets just that item back. Empty results
+    are cached with a shorter TTL; failed requests return None and are not cached,
+    so they get retried on the next run.
+    """
+    cache = get_enrichment_cache()
+    if doi:
+        cached = cache.lookup(f"doi:{doi.lower()}")
+        if cached is not MISSING and cached:
+            return [cached]
+
+    title_key = f"candidates:{normalize_title(cleaned_title)}"
+    cached = cache.lookup(title_key)
+    if cached is not MISSING:
+        return cached
 
     items = query_crossref_by_title(cleaned_title)
-    if not items:
-        # No results found
-        return article
+    if items is None:
+        return None
+
+    items = [slim_item(item) for item in items]
+    if items:
+        cache.set(title_key, items)
+    else:
+        cache.set(title_key, [], ttl_seconds=CROSSREF_CACHE_NEGATIVE_TTL_DAYS * DAY_SECONDS)
+    return items
+
+def lookup_dois(dois):
+    """
+    Return {DOI: CrossRef item} for the given lowercased DOIs, going through the persistent
+    cache and fetching the rest in batches of CROSSREF_DOI_BATCH. DOIs containing a comma
+    would split the batch filter, so they are fetched one at a time. DOIs CrossRef doesn't
+    know are cached as misses with the shorter TTL; DOIs whose request failed are left
+    out, so both fall back to title search.
+    """
+    cache = get_enrichment_cache()
+    records, to_fetch = {}, []
+    for doi in dict.fromkeys(dois):
+        cached = cache.lookup(f"doi:{doi}")
+        if cached is MISSING:
+            to_fetch.append(doi)
+        elif cached:
+            records[doi] = cached
 
-    best_item = best_match_article(items, cleaned_title)
-    if not best_item:
+    batchable = [doi for doi in to_fetch if "," not in doi]
+    batches = [batchable[start:start + CROSSREF_DOI_BATCH] for start in range(0, len(batchable), CROSSREF_DOI_BATCH)]
+    batches += [[doi] for doi in to_fetch if "," in doi]
+    for batch in batches:
+        try:
+            found = query_crossref_by_doi(batch[0]) if "," in batch[0] else query_crossref_by_dois(batch)
+        except requests.RequestException as e:
+            logger.warning(f"CrossRef DOI lookup failed for {len(batch)} DOIs: {e}")
+            continue
+        if found is None:
+            continue
+        for doi in batch:
+            item = found.get(doi)
+            if item:
+                records[doi] = slim_item(item)
+                cache.set(f"doi:{doi}", records[doi])
+            else:
+                cache.set(f"doi:{doi}", {}, ttl_seconds=CROSSREF_CACHE_NEGATIVE_TTL_DAYS * DAY_SECONDS)
+    return records
+
+def apply_match(article, best_item, confidence):
+    """
+    Record the match confidence on the article and, if it reaches CROSSREF_MATCH_THRESHOLD,
+    fill in DOI, full abstract, authors, a standardized publication date and the journal.
+    Low-confidence matches leave the alert's own fields untouched.
+    """
+    if best_item is None:
+        return article
+    article["match_confidence"] = round(confidence, 3)
+    if confidence < CROSSREF_MATCH_THRESHOLD:
         return article
 
     # If we have a best match, update fields
     if "DOI" in best_item:
         article["doi"] = best_item["DOI"]
+        get_enrichment_cache().set(f"doi:{best_item['DOI'].lower()}", best_item)
 
     # Abstract
     if "abstract" in best_item and isinstance(best_item["abstract"], str):
         article["snippet"] = strip_html_tags(best_item["abstract"])
 
     # Authors
-    # If we have authors, we might overwrite or just update if empty
     new_authors = extract_authors(best_item)
     if new_authors:
         article["authors"] = new_authors
@@ -155,4 +307,72 @@ def enrich_article_data(article):
     if "container-title" in best_item and len(best_item["container-title"]) > 0:
         article["source"] = best_item["container-title"][0]
 
-    return article
\ No newline at end of file
+    return article
+
+def fetch_candidates(article):
+    """CrossRef candidates for one article, or None if it has no title or the lookup failed."""
+    cleaned_title = clean_title(article.get("title", ""))
+    if not cleaned_title:
+        return None
+    try:
+        return lookup_candidates(cleaned_title, article.get("doi", ""))
+    except requests.RequestException as e:
+        logger.warning(f"CrossRef lookup failed for '{article.get('title', '')}': {e}")
+        return None
+
+def enrich_article_data(article):
+    """
+    Enrich the article data by querying CrossRef with its title.
+    If a confident match is found, add DOI, full abstract, authors, and a standardized publication date.
+    
+    article: {
+      "title": "...",
+      "link": "...",
+      "snippet": "...",
+      "source": "...",
+      "authors": [...],
+      "publication_date": "..."
+    }
+
+    Returns the enriched article (possibly updated) or the original if no match found.
+    """
+    return enrich_articles([article], max_workers=1)[0]
+
+@timed("enrich_articles")
+def enrich_articles(articles, max_workers=None):
+    """
+    Enrich a batch of articles. Articles whose link carries a DOI get their CrossRef record
+    by DOI, many per request, and take it as an exact match. The rest fall back to title
+    search: candidates are looked up concurrently over a bounded worker pool, then scored
+    for the whole batch in one pass.
+    Lookups share one pooled session and the per-host rate limiter, so raising
+    max_workers only overlaps network waits; it never exceeds CrossRef's rate limit.
+    Results are returned in input order. A failed lookup leaves its article unchanged.
+    """
+    if max_workers is None:
+        max_workers = CROSSREF_MAX_WORKERS
+    if not articles:
+        return []
+    assign_link_dois(articles)
+    dois = [normalize_doi(article.get("doi")) for article in articles]
+    records = lookup_dois([doi for doi in dois if is_crossref_doi(doi)])
+    by_title = [article for article, doi in zip(articles, dois) if doi not in records]
+    metrics.count("crossref.doi_resolved", len(articles) - len(by_title))
+
+    if max_workers <= 1 or len(by_title) <= 1:
+        candidate_lists = [fetch_candidates(article) for article in by_title]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(by_title))) as executor:
+            candidate_lists = list(executor.map(fetch_candidates, by_title))
+
+    with metrics.timer("crossref.match"):
+        title_matches = iter(match_articles(by_title, candidate_lists))
+    metrics.count("crossref.articles", len(articles))
+    metrics.count("crossref.title_searches", len(by_title))
+    enriched = []
+    for article, doi in zip(articles, dois):
+        if doi in records:
+            enriched.append(apply_match(article, records[doi], 1.0))
+        else:
+            enriched.append(apply_match(article, *next(title_matches)))
+    return enriched
@@ -0,0 +1,89 @@
+# src/enrichment/doi.py
+import re
+import urllib.parse
+from typing import Dict, List, Optional
+from src.utils.metrics import metrics, timed
+
+# Registrant prefixes whose DOIs are registered with DataCite rather than CrossRef;
+# CrossRef's works endpoint doesn't know them, so these articles go through title search
+NON_CROSSREF_PREFIXES = ("10.48550",)
+
+# A DOI inside a URL path: "10." + registrant code + "/" + suffix up to the next query/fragment
+DOI_PATTERN = re.compile(r"\b(10\.\d{4,9}/[^\s?#]+)")
+DOI_HOST_PATTERN = re.compile(r"(^|\.)doi\.org$")
+ARXIV_PATTERN = re.compile(r"^/(?:abs|pdf|html)/((?:\d{4}\.\d{4,5})|(?:[a-z\-]+(?:\.[A-Z]{2})?/\d{7}))(?:v\d+)?(?:\.pdf)?/?$")
+RXIV_PATTERN = re.compile(r"^/content/(10\.1101/[\d.]+)(?:v\d+)?")
+RXIV_HOSTS = ("biorxiv.org", "medrxiv.org")
+# Springer keeps the DOI right after the content type: /article/10.1007/..., /chapter/10.1007/...
+SPRINGER_PATTERN = re.compile(r"^/(?:article|chapter|content/pdf)/(10\.\d{4,9}/.+)$")
+# Query parameters some publishers put the DOI in (PLOS ?id=, others ?doi=)
+DOI_QUERY_PARAMS = ("doi", "id")
+# Trailing pieces publishers append to the DOI in article URLs
+DOI_SUFFIX_PATTERN = re.compile(r"(/(full|abstract|pdf|epdf|fulltext|html|meta)|\.pdf|[.,;/])+$", re.IGNORECASE)
+
+
+def _clean_doi(doi: str) -> Optional[str]:
+    doi = DOI_SUFFIX_PATTERN.sub("", urllib.parse.unquote(doi)).strip()
+    return doi.lower() if DOI_PATTERN.fullmatch(doi) else None
+
+
+def extract_doi(link: str) -> Optional[str]:
+    """
+    The DOI an article link points at, lowercased, or None:
+      https://doi.org/10.1038/s41586-024-0001-2           -> 10.1038/s41586-024-0001-2
+      https://onlinelibrary.wiley.com/doi/full/10.1002/x   -> 10.1002/x
+      https://arxiv.org/abs/2401.01234v2                   -> 10.48550/arxiv.2401.01234
+      https://www.biorxiv.org/content/10.1101/2024.01.02.573v1.full -> 10.1101/2024.01.02.573
+      https://journals.plos.org/plosone/article?id=10.1371/journal.pone.0300000 -> 10.1371/journal.pone.0300000
+    """
+    if not link:
+        return None
+    parsed = urllib.parse.urlsplit(link)
+    host = parsed.netloc.lower().split(":")[0]
+    path = urllib.parse.unquote(parsed.path)
+
+    if DOI_HOST_PATTERN.search(host):
+        return _clean_doi(path.lstrip("/"))
+    if host.endswith("arxiv.org"):
+        match = ARXIV_PATTERN.match(path)
+        return f"10.48550/arxiv.{match.group(1).lower()}" if match else None
+    if host.endswith(RXIV_HOSTS):
+        # bioRxiv/medRxiv paths carry a version (v1, v2, ...) and a view (.full, .abstract)
+        match = RXIV_PATTERN.match(path)
+        return _clean_doi(match.group(1).rstrip(".")) if match else None
+    if "/doi/" in path:
+        # Publisher landing pages: /doi/10.x/y, /doi/abs/10.x/y, /doi/full/10.x/y, /doi/pdf/10.x/y
+        match = DOI_PATTERN.search(path.split("/doi/", 1)[1])
+        return _clean_doi(match.group(1)) if match else None
+    if host.endswith("springer.com"):
+        match = SPRINGER_PATTERN.match(path)
+        return _clean_doi(match.group(1)) if match else None
+    query = urllib.parse.parse_qs(parsed.query)
+    for param in DOI_QUERY_PARAMS:
+        for value in query.get(param, []):
+            doi = _clean_doi(value)
+            if doi:
+                return doi
+    return None
+
+
+def is_crossref_doi(doi: str) -> bool:
+    return bool(doi) and not doi.startswith(NON_CROSSREF_PREFIXES)
+
+
+@timed("extract_link_dois")
+def assign_link_dois(articles: List[Dict]) -> int:
+    """
+    Set "doi" on articles that don't have one yet from their link, before dedup and
+    enrichment see them. Returns the number of articles that got a DOI.
+    """
+    found = 0
+    for article in articles:
+        if article.get("doi"):
+            continue
+        doi = extract_doi(article.get("link", ""))
+        if doi:
+            article["doi"] = doi
+            found += 1
+    metrics.count("doi.from_links", found)
+    return found
@@ -0,0 +1,126 @@
+# src/enrichment/matching.py
+import re
+from typing import Dict, List, Optional, Tuple
+from src.utils.text import normalize_title
+
+# How much each signal counts towards the confidence. Signals that cannot be
+# compared (no authors or no year on one side) are left out and the rest rescaled.
+TITLE_WEIGHT = 0.7
+AUTHOR_WEIGHT = 0.2
+YEAR_WEIGHT = 0.1
+# Surnames compared per article; Scholar lists the first few authors only
+MAX_AUTHORS_COMPARED = 3
+
+TRUNCATION_PATTERN = re.compile(r"(…|\.\.\.)\s*$")
+YEAR_PATTERN = re.compile(r"\b(19|20)\d{2}\b")
+
+
+def char_ngrams(text: str, n: int = 3) -> frozenset:
+    padded = f" {text} "
+    return frozenset(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+def dice(set_a, set_b) -> float:
+    if not set_a or not set_b:
+        return 0.0
+    return 2.0 * len(set_a & set_b) / (len(set_a) + len(set_b))
+
+
+def surname(name: str) -> str:
+    """Last word of a name, normalized: 'J Smith' -> 'smith', 'María García-López' -> 'garcia lopez'."""
+    words = normalize_title(TRUNCATION_PATTERN.sub("", name)).split()
+    return words[-1] if words else ""
+
+
+def item_year(item: Dict) -> Optional[int]:
+    for field in ("issued", "published-online", "published-print"):
+        parts = (item.get(field) or {}).get("date-parts") or [[]]
+        if parts and parts[0] and parts[0][0]:
+            return int(parts[0][0])
+    return None
+
+
+def article_year(article: Dict) -> Optional[int]:
+    year = article.get("year") or ""
+    match = YEAR_PATTERN.search(str(year) or article.get("publication_date", ""))
+    return int(match.group(0)) if match else None
+
+
+class ArticleFeatures:
+    """Normalized title, n-grams, surnames and year of an alert article, computed once."""
+
+    def __init__(self, article: Dict):
+        title = article.get("title", "")
+        # Scholar cuts long titles off with an ellipsis; only compare the part we have
+        self.truncated = bool(TRUNCATION_PATTERN.search(title))
+        self.title = normalize_title(TRUNCATION_PATTERN.sub("", title))
+        self.tokens = frozenset(self.title.split())
+        self.trigrams = char_ngrams(self.title)
+        self.surnames = [s for s in (surname(a) for a in article.get("authors", [])[:MAX_AUTHORS_COMPARED]) if s]
+        self.year = article_year(article)
+
+
+class ItemFeatures:
+    """Normalized title, n-grams, surnames and year of a CrossRef item, computed once."""
+
+    def __init__(self, item: Dict):
+        titles = item.get("title") or [""]
+        self.title = normalize_title(titles[0] if isinstance(titles, list) else titles)
+        self.tokens = frozenset(self.title.split())
+        self.trigrams = char_ngrams(self.title)
+        self.surnames = frozenset(
+            s for s in (surname(a.get("family", "")) for a in item.get("author", []) if isinstance(a, dict)) if s
+        )
+        self.year = item_year(item)
+        self._prefixes = {}
+
+    def prefix(self, length: int) -> Tuple[frozenset, frozenset]:
+        """Tokens and n-grams of the first `length` characters of the title, for truncated alert titles."""
+        if length not in self._prefixes:
+            cut = self.title[:length].rsplit(" ", 1)[0] if len(self.title) > length else self.title
+            self._prefixes[length] = (frozenset(cut.split()), char_ngrams(cut))
+        return self._prefixes[length]
+
+
+def title_similarity(article: ArticleFeatures, item: ItemFeatures) -> float:
+    tokens, trigrams = item.tokens, item.trigrams
+    if article.truncated:
+        tokens, trigrams = item.prefix(len(article.title) + 1)
+    return 0.5 * dice(article.tokens, tokens) + 0.5 * dice(article.trigrams, trigrams)
+
+
+def match_score(article: ArticleFeatures, item: ItemFeatures) -> float:
+    """Confidence in [0, 1] that the CrossRef item is the alert article."""
+    total, weight = TITLE_WEIGHT * title_similarity(article, item), TITLE_WEIGHT
+    if article.surnames and item.surnames:
+        found = sum(1 for s in article.surnames if s in item.surnames)
+        total += AUTHOR_WEIGHT * found / len(article.surnames)
+        weight += AUTHOR_WEIGHT
+    if article.year and item.year:
+        # Preprints and online-first versions are often dated a year before print
+        gap = abs(article.year - item.year)
+        total += YEAR_WEIGHT * (1.0 if gap == 0 else 0.5 if gap == 1 else 0.0)
+        weight += YEAR_WEIGHT
+    return total / weight
+
+
+def match_articles(articles: List[Dict], candidate_lists: List[Optional[List[Dict]]]) -> List[Tuple[Optional[Dict], float]]:
+    """
+    Score every candidate for a whole batch of articles and return (best item, confidence)
+    per article, in input order. Candidates shared between articles (the same DOI returned
+    for several queries) have their features computed only once.
+    """
+    item_features = {}
+    results = []
+    for article, candidates in zip(articles, candidate_lists):
+        features = ArticleFeatures(article)
+        best_item, best_score = None, 0.0
+        for item in candidates or []:
+            key = item.get("DOI") or id(item)
+            if key not in item_features:
+                item_features[key] = ItemFeatures(item)
+            score = match_score(features, item_features[key])
+            if score > best_score:
+                best_item, best_score = item, score
+        results.append((best_item, best_score))
+    return results
@@ -1,91 +1,304 @@
+import json
+import os
 import sys
-from math import ceil
 from src.utils.logger import logger
-from src.email_client.email_fetcher import fetch_unread_scholar_emails
-from src.email_client.email_parser import parse_scholar_alert
-from src.data_store.db_handler import store_articles, get_all_articles, load_articles
-from src.summarizer.summarizer import summarize_articles
-from src.renderer.report_generator import generate_summary_report
-from src.enrichment.crossref import enrich_article_data
+from src.data_store.db_handler import load_articles, get_articles_since, get_articles_by_links, get_meta, set_meta
+from src.data_store.run_journal import RunJournal
+from src.config import CLUSTER_ARTICLES, PROFILE_DIR, PROFILE_MAX_CONCURRENCY
+from src.profiles import DEFAULT_PROFILE, get_profile, load_profiles
+from src.utils.cache import cache_stats
+from src.utils.metrics import metrics, write_profile
 
-MAX_ARTICLES_PER_SET = 30
+# Stage modules (IMAP/BeautifulSoup, CrossRef/requests, the OpenAI client) are imported
+# inside the steps that use them, so runs and commands that skip a stage don't load it.
+
+WATERMARK_KEY = "last_report_article_id"
+DIGEST_KEY = "rolling_digest"
+
+def parse_options(argv):
+    return {
+        "summarize_only": '--summarize-only' in argv,
+        # --recluster rebuilds the cached topic clusters from the whole article store
+        "recluster": '--recluster' in argv,
+        # --rolling folds each report into a persistent digest; it implies --incremental
+        "rolling": '--rolling' in argv,
+        "incremental": '--incremental' in argv or '--rolling' in argv,
+    }
 
 def main():
+    run_pipeline(parse_options(sys.argv), resume='--resume' in sys.argv, cprofile='--cprofile' in sys.argv)
+
+def run_pipeline(options, resume=False, cprofile=False, reset_metrics=True):
+    """
+    Run fetch -> summarize -> report once with the given options (see parse_options).
+    Alerts are fetched, enriched and stored once; then every digest profile (src/profiles.py)
+    is summarized from the store, several at a time. options["profiles"] limits the run
+    to the named profiles. resume continues the profiles' last interrupted runs instead;
+    cprofile adds a cProfile dump. reset_metrics=False keeps what the caller has recorded
+    so far (watch mode's micro-batches) in this run's profile.
+    """
     logger.info("Starting Scholar Summarizer...")
+    if reset_metrics:
+        metrics.reset()
+    profiles = load_profiles(options.get("profiles"))
+    journals = open_journals(options, profiles, resume)
+
+    # --cprofile also records a cProfile of the whole run next to the JSON profile
+    profiler = None
+    if cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    status = "failed"
+    try:
+        try:
+            ingest(journals)
+        except BaseException as e:
+            for _, journal in journals:
+                journal.fail(f"{type(e).__name__}: {e}")
+            logger.error("Fetching did not complete. Re-run with --resume to continue where it stopped.")
+            raise
+        if CLUSTER_ARTICLES and any(j.options["recluster"] and not j.is_done("summarized") for _, j in journals):
+            from src.ranking.clustering import refit_clusters
+
+            # Refit once up front, so every profile groups its articles by the same clusters
+            refit_clusters()
+        summarize_profiles(journals)
+        status = "finished"
+    finally:
+        if profiler:
+            profiler.disable()
+        write_run_profile([journal for _, journal in journals], status, profiler)
+
+def open_journals(options, profiles, resume=False):
+    """
+    A (profile, RunJournal) pair per profile. With resume, only the profiles whose last
+    run was interrupted, continuing those runs; otherwise (or if none was) new runs.
+    """
+    journals = []
+    if resume:
+        for profile in profiles:
+            journal = RunJournal.resume_latest(profile_option(profile))
+            if journal is not None:
+                done = ", ".join(journal.completed_steps()) or "nothing"
+                logger.info(f"{log_prefix(profile)}Resuming run #{journal.run_id} (completed: {done}).")
+                journals.append((profile, journal))
+        if journals:
+            return journals
+        logger.info("No interrupted run to resume. Starting a new run.")
+    run_options = {key: value for key, value in options.items() if key != "profiles"}
+    return [(profile, RunJournal.start(dict(run_options, profile=profile_option(profile)))) for profile in profiles]
+
+def profile_option(profile):
+    """How a run's options name its profile: None for the default profile, as runs from before profiles do."""
+    return None if profile.name == DEFAULT_PROFILE else profile.name
+
+def log_prefix(profile):
+    return "" if profile.name == DEFAULT_PROFILE else f"[{profile.name}] "
+
+def write_run_profile(journals, status, profiler=None):
+    """Write the run's timers and counters (and cache statistics) as JSON under PROFILE_DIR."""
+    path = write_profile(PROFILE_DIR, {"run_id": journals[0].run_id, "run_ids": [j.run_id for j in journals],
+                                       "status": status, "options": journals[0].options,
+                                       "profiles": [j.options.get("profile") or DEFAULT_PROFILE for j in journals],
+                                       "caches": cache_stats()})
+    logger.info(f"Run profile written to {path}")
+    if profiler:
+        import pstats
+        stats_path = os.path.splitext(path)[0] + ".prof"
+        profiler.dump_stats(stats_path)
+        with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+            pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+        logger.info(f"cProfile output written to {stats_path}")
+
+def ingest(journals):
+    """Fetch, parse, enrich and store new alerts once, for every profile's run."""
+    pending = [journal for _, journal in journals
+               if not journal.options["summarize_only"] and not journal.is_done("ingested")]
+    if not pending:
+        return
+    from src.pipeline import ingest_new_articles
+
+    # Runs that summarize what this run stores journal each stored micro-batch,
+    # so a crash after storing loses nothing
+    collecting = [journal for journal in pending if not journal.options["incremental"]]
+
+    def on_stored(stored):
+        for journal in collecting:
+            journal.add_articles(stored)
+
+    new_articles = ingest_new_articles(on_stored=on_stored if collecting else None)
+    for journal in pending:
+        journal.record_step("ingested", str(len(new_articles)))
 
-    summarize_only = '--summarize-only' in sys.argv
+def summarize_profiles(journals):
+    """Summarize each profile's run, up to PROFILE_MAX_CONCURRENCY at a time; re-raises the first failure."""
+    if len(journals) == 1:
+        run_profile(*journals[0])
+        return
+    from concurrent.futures import ThreadPoolExecutor
+
+    logger.info(f"Summarizing {len(journals)} profiles: {', '.join(p.name for p, _ in journals)}.")
+    with ThreadPoolExecutor(max_workers=min(PROFILE_MAX_CONCURRENCY, len(journals))) as executor:
+        futures = [executor.submit(run_profile, profile, journal) for profile, journal in journals]
+    # Every profile gets its chance before a failure is reported
+    errors = [future.exception() for future in futures if future.exception() is not None]
+    if errors:
+        raise errors[0]
+
+def run_profile(profile, journal):
+    try:
+        run(journal, profile)
+    except BaseException as e:
+        journal.fail(f"{type(e).__name__}: {e}")
+        logger.error(f"{log_prefix(profile)}Run #{journal.run_id} did not complete. "
+                     f"Re-run with --resume to continue where it stopped.")
+        raise
+    finally:
+        summarizer = sys.modules.get("src.summarizer.summarizer")
+        if summarizer is not None:
+            summarizer.set_checkpoint(None)
+    journal.finish()
+
+def run(journal, profile=None):
+    """Select, filter, summarize and report one profile's articles, recording progress in journal."""
+    profile = profile or get_profile(journal.options.get("profile"))
+    summarize_only = journal.options["summarize_only"]
+    incremental = journal.options["incremental"]
+    rolling = journal.options["rolling"]
+    prefix = log_prefix(profile)
+    watermark_key = profile.meta_key(WATERMARK_KEY)
+    digest_key = profile.meta_key(DIGEST_KEY)
 
-    if summarize_only:
-        # Summarize-only mode: no fetching, just load and summarize existing articles
-        logger.info("Running in summarize-only mode. Loading articles from articles.json...")
-        all_articles = load_articles()
-        if not all_articles:
-            logger.info("No articles found in articles.json. Nothing to summarize.")
-            return
-        articles_to_summarize = all_articles
+    high_water_mark = journal.step_detail("selected")
+    if high_water_mark is not None:
+        articles_to_summarize = journal.load_articles()
+        high_water_mark = int(high_water_mark)
     else:
-        # Normal mode: Fetch and parse emails, then summarize new articles if any
-        html_bodies = fetch_unread_scholar_emails()
-        total_emails = len(html_bodies)
-        if total_emails == 0:
-            logger.info("No unread scholar alert emails found. Exiting.")
-            return
-
-        logger.info(f"Found {total_emails} unread scholar alert emails. Beginning processing...")
-        all_new_articles = []
-
-        for i, html_body in enumerate(html_bodies, start=1):
-            logger.info(f"Processing email {i}/{total_emails}...")
-            parsed_articles = parse_scholar_alert(html_body)
-            num_parsed = len(parsed_articles)
-            logger.info(f"Email {i}/{total_emails}: Parsed {num_parsed} articles.")
-
-            enriched_articles = [enrich_article_data(article) for article in parsed_articles]
-
-            new_articles = store_articles(enriched_articles)
-            num_new = len(new_articles)
-            num_skipped = num_parsed - num_new
-
-            logger.info(
-                f"Email {i}/{total_emails}: Added {num_new} new articles, "
-                f"skipped {num_skipped} duplicates."
-            )
-            all_new_articles.extend(new_articles)
-
-        if len(all_new_articles) == 0:
-            logger.info("No new articles added. Exiting.")
-            return
+        high_water_mark = 0
+        if incremental:
+            # Summarize everything stored since the last incremental report, including
+            # articles left over from runs that stored but never reported
+            last_id = int(get_meta(watermark_key, "0"))
+            logger.info(f"{prefix}Running in incremental mode. Loading articles added after #{last_id}...")
+            articles_to_summarize, high_water_mark = get_articles_since(last_id)
+            journal.add_articles(articles_to_summarize)
+        elif summarize_only:
+            # Summarize-only mode: no fetching, just load and summarize existing articles
+            logger.info(f"{prefix}Running in summarize-only mode. Loading articles from the article store...")
+            articles_to_summarize = load_articles()
+            if not articles_to_summarize:
+                logger.info("No articles found in the article store. Nothing to summarize.")
+                return
+            journal.add_articles(articles_to_summarize)
         else:
-            articles_to_summarize = all_new_articles
+            # Everything this run stored, including micro-batches committed before a crash
+            articles_to_summarize = journal.load_articles()
+            if not articles_to_summarize:
+                logger.info(f"{prefix}No new articles added. Exiting.")
+                return
+        journal.record_step("selected", str(high_water_mark))
 
-    # At this point, we have articles_to_summarize ready in both modes
+    # At this point, we have articles_to_summarize ready in all modes
     total_articles = len(articles_to_summarize)
     if total_articles == 0:
-        logger.info("No articles to summarize. Exiting.")
+        logger.info(f"{prefix}No articles to summarize. Exiting.")
         return
 
-    logger.info(f"Preparing to summarize {total_articles} articles in sets of {MAX_ARTICLES_PER_SET}.")
+    from src.ranking.relevance import select_relevant
+    from src.summarizer.summarizer import summarize_articles, update_digest, set_checkpoint
+    from src.renderer.report_generator import StreamingReport, generate_digest_report
 
-    # Split into sets of MAX_ARTICLES_PER_SET
-    num_sets = ceil(total_articles / MAX_ARTICLES_PER_SET)
-    if num_sets == 1 and total_articles <= MAX_ARTICLES_PER_SET:
-        # If only one set needed, just summarize directly
-        summary = summarize_articles(articles_to_summarize)
-        report_path = generate_summary_report(summary, articles_to_summarize)
-        logger.info(f"Summary report generated at: {report_path}")
-    else:
-        # Multiple sets
-        logger.info(f"Splitting into {num_sets} sets of up to {MAX_ARTICLES_PER_SET} articles each.")
-        for i in range(num_sets):
-            start = i * MAX_ARTICLES_PER_SET
-            end = start + MAX_ARTICLES_PER_SET
-            subset = articles_to_summarize[start:end]
-            logger.info(f"Summarizing set {i+1}/{num_sets} with {len(subset)} articles.")
-            subset_summary = summarize_articles(subset)
-
-            chunk_report_path = f"output_summary_chunk_{i+1}.md"
-            chunk_report_path = generate_summary_report(subset_summary, subset, filename_prefix=f"chunk_{i+1}")
-            logger.info(f"Report for set {i+1}/{num_sets} generated at: {chunk_report_path}")
+    # Drop off-topic articles locally before paying for LLM tokens
+    articles_to_summarize, excluded = select_relevant(
+        articles_to_summarize, top_k=profile.relevance_top_k, threshold=profile.relevance_threshold,
+        profile=profile.topic_profile,
+    )
+    if excluded:
+        logger.info(
+            f"{prefix}Relevance filter kept {len(articles_to_summarize)} of {total_articles} articles; "
+            f"excluded {len(excluded)} off-topic articles."
+        )
+
+    groups = None
+    if CLUSTER_ARTICLES and articles_to_summarize:
+        from src.ranking.clustering import group_by_cluster
+
+        # Keep related papers together in the same request; the report lists them in the same order
+        groups = group_by_cluster(articles_to_summarize)
+        articles_to_summarize = [article for _, members in groups for article in members]
+        logger.info(f"{prefix}Grouped {len(articles_to_summarize)} articles into {len(groups)} topic clusters.")
+
+    set_checkpoint(journal)
+    summary = journal.lookup("summary")
+    if summary is None:
+        logger.info(f"{prefix}Preparing to summarize {len(articles_to_summarize)} articles.")
+        # The report fills in as summaries stream in; a failed run leaves what arrived
+        report = StreamingReport(profile.output_dir)
+        logger.info(f"{prefix}Writing the summary report to: {report.path}")
+        try:
+            summary = summarize_articles(articles_to_summarize, groups=groups, report=report,
+                                         profile_instructions=profile.instructions)
+        except BaseException as e:
+            report.abort(f"{type(e).__name__}: {e}")
+            raise
+        # Kept after the run so the report can be rebuilt without the LLM
+        journal.record("report_articles", json.dumps([a["link"] for a in report.articles]))
+        journal.record("report_sections", json.dumps(list(zip(report.titles, report.sections))))
+        journal.record("report_excluded", json.dumps([[a["link"], score] for a, score in excluded]))
+        journal.record("summary", summary)
+        journal.record_step("summarized")
+        report_path = report.finish(excluded)
+        journal.record_step("report written", report_path)
+        logger.info(f"{prefix}Summary report generated at: {report_path}")
+    if journal.resumed_results:
+        logger.info(f"{prefix}Reused {journal.resumed_results} completed LLM results from the interrupted run.")
+
+    if not journal.is_done("report written"):
+        report_path = write_journaled_report(journal)
+        journal.record_step("report written", report_path)
+        logger.info(f"{prefix}Summary report generated at: {report_path}")
+
+    if rolling and not journal.is_done("digest updated"):
+        # Keep the folded digest in the journal first, so a resumed run never folds the summary in twice
+        digest = journal.lookup("digest")
+        if digest is None:
+            digest = update_digest(get_meta(digest_key, ""), summary, profile_instructions=profile.instructions)
+            journal.record("digest", digest)
+        set_meta(digest_key, digest)
+        digest_path = generate_digest_report(digest, output_dir=profile.output_dir)
+        journal.record_step("digest updated", digest_path)
+        logger.info(f"{prefix}Rolling digest updated at: {digest_path}")
+
+    if incremental:
+        # Only advance the high-water mark once the report is safely written
+        set_meta(watermark_key, str(high_water_mark))
+
+def write_journaled_report(journal):
+    """Write a report from the summary, sections and article lists saved in the journal."""
+    from src.renderer.report_generator import generate_summary_report
+
+    summary = journal.lookup("summary")
+    articles = get_articles_by_links(json.loads(journal.lookup("report_articles") or "[]"))
+    sections = json.loads(journal.lookup("report_sections") or "[]")
+    excluded_scores = json.loads(journal.lookup("report_excluded") or "[]")
+    scores = {link: score for link, score in excluded_scores}
+    excluded = [(article, scores.get(article["link"], 0.0))
+                for article in get_articles_by_links([link for link, _ in excluded_scores])]
+    output_dir = get_profile(journal.options.get("profile")).output_dir
+    return generate_summary_report(summary, articles, output_dir=output_dir, excluded_articles=excluded,
+                                   sections=sections)
+
+def rebuild_report(run_id=None, profile_name=None):
+    """
+    Write the report of a finished run again from its journaled summary, without calling
+    the LLM. Without run_id, the latest finished run of the named profile (None: the
+    default profile) is used. Returns the report path, or None if the run has no saved summary.
+    """
+    journal = RunJournal.load(run_id, profile=profile_name)
+    if journal is None or journal.lookup("summary") is None:
+        return None
+    return write_journaled_report(journal)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,166 @@
+# src/pipeline.py
+import queue
+import threading
+from src.config import PIPELINE_DEPTH
+from src.utils.logger import logger
+from src.utils.metrics import timed
+from src.email_client.email_fetcher import (
+    open_scholar_mailbox, close_mailbox, iter_unread_scholar_emails, mark_emails_seen, fetch_stats,
+)
+from src.email_client.email_parser import parse_scholar_alerts
+from src.data_store.db_handler import store_articles, merge_variants
+from src.data_store.dedup import KnownArticleIndex, filter_new_articles
+from src.enrichment.crossref import enrich_articles, get_enrichment_cache
+from src.enrichment.doi import assign_link_dois
+
+_DONE = object()
+
+
+class IngestStats:
+    def __init__(self):
+        self.emails = 0
+        self.failed_emails = 0
+        self.parsed = 0
+        self.enriched = 0
+        self.stored = 0
+
+
+def process_emails(html_bodies, known_index, stats):
+    """
+    Parse a micro-batch of alerts, drop known articles, enrich the rest together and store them.
+    Returns the stored articles. stats only counts the batch once it has been stored, so a
+    failed batch is counted in failed_emails alone.
+    """
+    parsed_per_email = parse_scholar_alerts(html_bodies)
+    articles_to_enrich = []
+    variants = []
+    parsed = 0
+    for number, parsed_articles in enumerate(parsed_per_email, start=stats.emails + 1):
+        # DOIs in the links let dedup catch known articles under a different link
+        assign_link_dois(parsed_articles)
+        fresh_articles, known_variants, num_skipped = filter_new_articles(parsed_articles, known_index)
+        parsed += len(parsed_articles)
+        logger.info(
+            f"Email {number}: Parsed {len(parsed_articles)} articles, {len(fresh_articles)} new, "
+            f"{len(known_variants)} new versions of known papers, skipped {num_skipped} known."
+        )
+        articles_to_enrich.extend(fresh_articles)
+        variants.extend(known_variants)
+
+    enriched_articles = enrich_articles(articles_to_enrich)
+    new_articles = store_articles(enriched_articles)
+    # Variants are merged after this batch's new articles are stored, since they may be versions of those
+    unmatched = merge_variants(variants)
+    if unmatched:
+        articles_to_enrich.extend(unmatched)
+        new_articles.extend(store_articles(enrich_articles(unmatched)))
+    stats.emails += len(parsed_per_email)
+    stats.parsed += parsed
+    stats.enriched += len(articles_to_enrich)
+    stats.stored += len(new_articles)
+    return new_articles
+
+
+@timed("ingest_new_articles")
+def ingest_new_articles(depth=None, on_stored=None, mail=None, known_index=None, stats=None):
+    """
+    Fetch unread alerts and run parse -> dedup -> enrich -> store on them in micro-batches
+    while the IMAP download continues. At most `depth` downloaded emails wait in memory at a time.
+    Messages are flagged \\Seen only after their articles have been committed to the store,
+    so a crash mid-run leaves the unprocessed alerts unread for the next run.
+    on_stored, if given, is called with each micro-batch's newly stored articles as soon as
+    they are committed (from the worker thread), e.g. to journal them.
+    A long-running caller can pass an open mailbox (left open afterwards), a warm
+    KnownArticleIndex and an IngestStats to read the batch's counts from.
+    Returns the newly stored articles.
+    """
+    depth = depth or PIPELINE_DEPTH
+    bodies = queue.Queue(maxsize=depth)
+    committed = queue.Queue()
+    if stats is None:
+        stats = IngestStats()
+    new_articles = []
+
+    # Drop articles we already have (and repeats across this batch of emails)
+    # before paying for any CrossRef lookups
+    if known_index is None:
+        known_index = KnownArticleIndex.load()
+
+    def worker():
+        done = False
+        while not done:
+            # Wait for one email, then take whatever else is already queued as a micro-batch
+            batch = [bodies.get()]
+            while len(batch) < depth:
+                try:
+                    batch.append(bodies.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _DONE:
+                done = True
+                batch.pop()
+            if not batch:
+                continue
+
+            eids = [eid for eid, _ in batch]
+            try:
+                stored = process_emails([body for _, body in batch], known_index, stats)
+                new_articles.extend(stored)
+                if on_stored is not None:
+                    on_stored(stored)
+            except Exception as e:
+                # Leave the messages unread so the next run retries them
+                stats.failed_emails += len(batch)
+                logger.error(f"Failed to process {len(batch)} emails ({b', '.join(eids).decode()}): {e}")
+                continue
+            for eid in eids:
+                committed.put(eid)
+
+    def drain_committed():
+        ids = []
+        while True:
+            try:
+                ids.append(committed.get_nowait())
+            except queue.Empty:
+                break
+        if ids:
+            mark_emails_seen(mail, ids)
+
+    own_mailbox = mail is None
+    if own_mailbox:
+        mail = open_scholar_mailbox()
+    consumer = threading.Thread(target=worker, name="ingest-worker", daemon=True)
+    consumer.start()
+    try:
+        # The IMAP connection is only ever used from this thread
+        for eid, html_body in iter_unread_scholar_emails(mail):
+            bodies.put((eid, html_body))
+            drain_committed()
+    finally:
+        bodies.put(_DONE)
+        while consumer.is_alive():
+            consumer.join(timeout=0.5)
+            drain_committed()
+        drain_committed()
+        if own_mailbox:
+            close_mailbox(mail)
+
+    if stats.emails == 0 and stats.failed_emails == 0:
+        logger.info("No unread scholar alert emails found.")
+        return new_articles
+
+    logger.info(
+        f"Processed {stats.emails} emails ({stats.failed_emails} more failed): parsed {stats.parsed} articles, "
+        f"enriched {stats.enriched}, avoided {stats.parsed - stats.enriched} enrichment calls "
+        f"for known or repeated articles, added {stats.stored} new."
+    )
+    logger.info(
+        f"IMAP: fetched {fetch_stats.messages} messages in {fetch_stats.round_trips} round-trips, "
+        f"{fetch_stats.bytes} bytes."
+    )
+    cache_stats = get_enrichment_cache().stats()
+    logger.info(
+        f"CrossRef cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"(hit rate {cache_stats['hit_rate']:.0%})."
+    )
+    return new_articles
@@ -0,0 +1,98 @@
+# src/profiles.py
+"""
+Named digest profiles: several audiences summarized from one shared fetch/parse/enrich/store pass.
+
+PROFILES_PATH (profiles.json) maps each profile name to its settings. Every field is optional:
+
+    {
+      "sleep-lab": {
+        "instructions": "You are a scholarly assistant for a sleep research lab studying ...",
+        "topic_profile": "sleep insomnia circadian actigraphy apnea",
+        "relevance_threshold": 0.05,
+        "relevance_top_k": 0,
+        "output_dir": "reports/sleep-lab"
+      }
+    }
+
+instructions describe the readers and what matters to them, replacing the built-in company
+context in every prompt. The relevance settings default to TOPIC_PROFILE and RELEVANCE_*,
+and output_dir to reports/<name>. Each profile keeps its own incremental watermark and
+rolling digest. Without the file there is one profile, "default", which behaves exactly as
+the pipeline did before profiles: built-in prompts, reports/, and the original watermark.
+"""
+import json
+import os
+import re
+from typing import Dict, List
+from src.config import PROFILES_PATH, TOPIC_PROFILE, RELEVANCE_TOP_K, RELEVANCE_THRESHOLD
+
+DEFAULT_PROFILE = "default"
+PROFILE_FIELDS = ("instructions", "topic_profile", "relevance_threshold", "relevance_top_k", "output_dir")
+# Names end up in directory names and meta keys
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class Profile:
+    def __init__(self, name: str, instructions: str = None, topic_profile: str = None,
+                 relevance_threshold: float = None, relevance_top_k: int = None, output_dir: str = None):
+        self.name = name
+        self.instructions = instructions or None
+        self.topic_profile = TOPIC_PROFILE if topic_profile is None else topic_profile
+        self.relevance_threshold = RELEVANCE_THRESHOLD if relevance_threshold is None else float(relevance_threshold)
+        self.relevance_top_k = RELEVANCE_TOP_K if relevance_top_k is None else int(relevance_top_k)
+        if output_dir is None:
+            output_dir = "reports" if name == DEFAULT_PROFILE else os.path.join("reports", name)
+        self.output_dir = output_dir
+
+    def meta_key(self, key: str) -> str:
+        """This profile's copy of a stored setting (watermark, digest); the default profile keeps the plain key."""
+        return key if self.name == DEFAULT_PROFILE else f"{key}:{self.name}"
+
+    def __repr__(self) -> str:
+        return f"Profile({self.name!r})"
+
+
+def _parse_profiles(config: Dict, path: str) -> List[Profile]:
+    if not isinstance(config, dict) or not config:
+        raise ValueError(f"{path} must map profile names to their settings")
+    profiles = []
+    for name, settings in config.items():
+        if not NAME_PATTERN.match(name):
+            raise ValueError(f"{path}: invalid profile name {name!r} (use letters, digits, '.', '_' and '-')")
+        if not isinstance(settings, dict):
+            raise ValueError(f"{path}: settings of profile {name!r} must be an object")
+        unknown = set(settings) - set(PROFILE_FIELDS)
+        if unknown:
+            raise ValueError(f"{path}: unknown settings for profile {name!r}: {', '.join(sorted(unknown))}")
+        profiles.append(Profile(name, **settings))
+    return profiles
+
+
+def load_profiles(names: List[str] = None, path: str = None) -> List[Profile]:
+    """
+    The configured profiles, in file order, or just the default profile without a profiles
+    file. names, if given, selects profiles by name. Raises ValueError for an invalid file
+    or unknown names.
+    """
+    path = path or PROFILES_PATH
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            profiles = _parse_profiles(json.load(f), path)
+    else:
+        profiles = [Profile(DEFAULT_PROFILE)]
+    if names:
+        by_name = {profile.name: profile for profile in profiles}
+        unknown = [name for name in names if name not in by_name]
+        if unknown:
+            raise ValueError(f"Unknown profile(s): {', '.join(unknown)}. Configured: {', '.join(by_name)}")
+        profiles = [by_name[name] for name in names]
+    return profiles
+
+
+def get_profile(name: str = None) -> Profile:
+    """The profile called name (None: the default profile), or its default settings if it's no longer configured."""
+    name = name or DEFAULT_PROFILE
+    for profile in load_profiles():
+        if profile.name == name:
+            return profile
+    return Profile(name)
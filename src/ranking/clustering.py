@@ -0,0 +1,162 @@
+# src/ranking/clustering.py
+import math
+import random
+import threading
+from typing import Dict, List, Tuple
+from src.config import CLUSTER_TARGET_SIZE, CLUSTER_MAX_COUNT
+from src.data_store.db_handler import (
+    load_articles, load_clusters, save_clusters, get_article_clusters, set_article_clusters,
+)
+from src.ranking.text_vectors import article_terms, cosine, inverse_document_frequencies, surface_forms, tfidf_vector
+from src.utils.logger import logger
+
+MAX_ITERATIONS = 20
+# Centroids keep only their heaviest terms, which keeps them small to store and fast to compare
+CENTROID_TERMS = 300
+LABEL_TERMS = 3
+
+# Profiles are summarized concurrently; only one of them fits or extends the cached clusters at a time
+_clusters_lock = threading.Lock()
+
+
+def _centroid(vectors: List[Dict[str, float]]) -> Dict[str, float]:
+    total: Dict[str, float] = {}
+    for vector in vectors:
+        for term, weight in vector.items():
+            total[term] = total.get(term, 0.0) + weight
+    top = sorted(total.items(), key=lambda item: item[1], reverse=True)[:CENTROID_TERMS]
+    norm = math.sqrt(sum(w * w for _, w in top))
+    return {term: w / norm for term, w in top} if norm else {}
+
+
+def _nearest(vector: Dict[str, float], centroids: List[Dict[str, float]]) -> int:
+    best, best_score = 0, -1.0
+    for index, centroid in enumerate(centroids):
+        score = cosine(vector, centroid)
+        if score > best_score:
+            best, best_score = index, score
+    return best
+
+
+def _init_centroids(vectors: List[Dict[str, float]], k: int, rng: random.Random) -> List[Dict[str, float]]:
+    """k-means++ seeding with cosine distance."""
+    centroids = [vectors[rng.randrange(len(vectors))]]
+    distances = [1.0 - cosine(v, centroids[0]) for v in vectors]
+    while len(centroids) < k:
+        total = sum(d * d for d in distances)
+        if total <= 0:
+            break
+        pick, threshold = 0, rng.random() * total
+        for pick, d in enumerate(distances):
+            threshold -= d * d
+            if threshold <= 0:
+                break
+        centroids.append(vectors[pick])
+        distances = [min(d, 1.0 - cosine(v, vectors[pick])) for d, v in zip(distances, vectors)]
+    return centroids
+
+
+def _label(members: List[Dict], centroid: Dict[str, float]) -> str:
+    forms = surface_forms(a.get("title", "") + " " + a.get("snippet", "") for a in members)
+    top_terms = sorted(centroid.items(), key=lambda item: item[1], reverse=True)[:LABEL_TERMS]
+    return ", ".join(forms.get(term, term) for term, _ in top_terms) or "Miscellaneous"
+
+
+def fit_clusters(articles: List[Dict], k: int = None, seed: int = 0):
+    """
+    Spherical k-means over TF-IDF vectors of the articles. Returns (clusters, idf, assignments)
+    where clusters are {"id", "label", "centroid"} dicts and assignments map link -> cluster id.
+    """
+    documents = [article_terms(a) for a in articles]
+    idf = inverse_document_frequencies(documents)
+    vectors = [tfidf_vector(doc, idf) for doc in documents]
+    if k is None:
+        k = min(CLUSTER_MAX_COUNT, max(1, round(len(articles) / CLUSTER_TARGET_SIZE)))
+    k = max(1, min(k, len(articles)))
+
+    rng = random.Random(seed)
+    centroids = _init_centroids(vectors, k, rng)
+    labels = [0] * len(vectors)
+    for iteration in range(MAX_ITERATIONS):
+        new_labels = [_nearest(v, centroids) for v in vectors]
+        if iteration and new_labels == labels:
+            break
+        labels = new_labels
+        members = [[] for _ in centroids]
+        for vector, label in zip(vectors, labels):
+            members[label].append(vector)
+        centroids = [_centroid(group) if group else centroid for group, centroid in zip(members, centroids)]
+
+    # Drop empty clusters and number the rest by size, largest first
+    by_cluster: Dict[int, List[int]] = {}
+    for index, label in enumerate(labels):
+        by_cluster.setdefault(label, []).append(index)
+    ordered = sorted(by_cluster.items(), key=lambda item: len(item[1]), reverse=True)
+
+    clusters, assignments = [], {}
+    for cluster_id, (label, indexes) in enumerate(ordered, start=1):
+        members = [articles[i] for i in indexes]
+        clusters.append({"id": cluster_id, "label": _label(members, centroids[label]), "centroid": centroids[label]})
+        for i in indexes:
+            assignments[articles[i]["link"]] = cluster_id
+    return clusters, idf, assignments
+
+
+def assign_clusters(articles: List[Dict], refit: bool = False) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Return (clusters, {link: cluster id}) covering the given articles.
+    The first run (or refit=True) clusters the whole store once and caches the result;
+    after that, articles without a cached cluster are assigned to the nearest existing
+    centroid, so incremental runs never re-cluster the corpus.
+    """
+    with _clusters_lock:
+        return _assign_clusters(articles, refit)
+
+
+def _assign_clusters(articles: List[Dict], refit: bool) -> Tuple[List[Dict], Dict[str, int]]:
+    clusters, idf = ([], {}) if refit else load_clusters()
+    if not clusters:
+        corpus = load_articles()
+        known_links = {a["link"] for a in corpus}
+        corpus.extend(a for a in articles if a.get("link") not in known_links)
+        if not corpus:
+            return [], {}
+        logger.info(f"Clustering {len(corpus)} articles into topic clusters...")
+        clusters, idf, assignments = fit_clusters(corpus)
+        save_clusters(clusters, idf, assignments)
+        return clusters, {a["link"]: assignments[a["link"]] for a in articles}
+
+    links = [a["link"] for a in articles]
+    assignments = get_article_clusters(links)
+    unassigned = [a for a in articles if a["link"] not in assignments]
+    if unassigned:
+        # Terms the fitted vocabulary never saw get the rarest-term weight
+        default_idf = max(idf.values()) if idf else 1.0
+        centroids = [c["centroid"] for c in clusters]
+        new_assignments = {
+            a["link"]: clusters[_nearest(tfidf_vector(article_terms(a), idf, default_idf), centroids)]["id"]
+            for a in unassigned
+        }
+        set_article_clusters(new_assignments)
+        assignments.update(new_assignments)
+    return clusters, assignments
+
+
+def refit_clusters() -> None:
+    """Re-cluster the whole article store and cache the result (--recluster)."""
+    assign_clusters([], refit=True)
+
+
+def group_by_cluster(articles: List[Dict], refit: bool = False) -> List[Tuple[str, List[Dict]]]:
+    """
+    Group articles into (cluster label, articles) pairs, in cluster order. Articles keep
+    their arrival order within a cluster, so unchanged groups produce unchanged prompts.
+    """
+    if not articles:
+        return []
+    clusters, assignments = assign_clusters(articles, refit=refit)
+    labels = {c["id"]: c["label"] for c in clusters}
+    grouped: Dict[int, List[Dict]] = {}
+    for article in articles:
+        grouped.setdefault(assignments[article["link"]], []).append(article)
+    return [(labels[cluster_id], grouped[cluster_id]) for cluster_id in sorted(grouped)]
@@ -0,0 +1,45 @@
+# src/ranking/relevance.py
+from collections import Counter
+from typing import Dict, List, Tuple
+from src.config import TOPIC_PROFILE, RELEVANCE_TOP_K, RELEVANCE_THRESHOLD
+from src.ranking.text_vectors import article_terms, cosine, inverse_document_frequencies, tfidf_vector, tokenize
+
+
+def score_articles(articles: List[Dict], profile: str = None) -> List[float]:
+    """
+    Score each article's title and abstract against the topic profile with TF-IDF cosine
+    similarity (0..1). IDF is computed over the articles being ranked, so terms every
+    article shares carry little weight. Runs locally with no network access.
+    """
+    profile = TOPIC_PROFILE if profile is None else profile
+    documents = [article_terms(article) for article in articles]
+    idf = inverse_document_frequencies(documents)
+    # Profile terms no article uses can't affect the ranking; keep them out of the norm
+    profile_terms = Counter(t for t in tokenize(profile) if t in idf)
+    profile_vector = tfidf_vector(profile_terms, idf)
+    return [cosine(tfidf_vector(doc, idf), profile_vector) for doc in documents]
+
+
+def select_relevant(articles: List[Dict], top_k: int = None, threshold: float = None,
+                    profile: str = None) -> Tuple[List[Dict], List[Tuple[Dict, float]]]:
+    """
+    Split articles into (kept, excluded) using the topic profile. Articles scoring below
+    `threshold` are dropped, then only the best `top_k` are kept. 0 disables either rule.
+    Kept articles stay in their original order; excluded ones are returned with their
+    scores, best first, so the report can list them.
+    """
+    top_k = RELEVANCE_TOP_K if top_k is None else top_k
+    threshold = RELEVANCE_THRESHOLD if threshold is None else threshold
+    if not articles or (not top_k and not threshold):
+        return list(articles), []
+
+    scores = score_articles(articles, profile)
+    ranked = sorted(range(len(articles)), key=lambda i: scores[i], reverse=True)
+    keep = [i for i in ranked if scores[i] >= threshold]
+    if top_k:
+        keep = keep[:top_k]
+    keep_set = set(keep)
+
+    kept = [article for i, article in enumerate(articles) if i in keep_set]
+    excluded = [(articles[i], scores[i]) for i in ranked if i not in keep_set]
+    return kept, excluded
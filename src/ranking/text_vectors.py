@@ -0,0 +1,83 @@
+# src/ranking/text_vectors.py
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9\-]+")
+# Scholar snippets glue highlighted words to their neighbours ("ofSchizophreniausing")
+GLUED_WORDS_PATTERN = re.compile(r"([a-z])([A-Z])")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours yourself yourselves
+study studies using use used based results result method methods paper new among within via however
+""".split())
+
+# Titles say more about the topic than snippet boilerplate, so their terms count double
+TITLE_WEIGHT = 2
+
+
+def stem(token: str) -> str:
+    """A deliberately crude suffix stripper: enough to merge plurals and -ing/-ed forms."""
+    for suffix in ("ations", "ation", "ions", "ion", "ings", "ing", "ies", "ed", "es", "s"):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            if suffix == "ies":
+                return token[:-3] + "y"
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    text = GLUED_WORDS_PATTERN.sub(r"\1 \2", text or "")
+    return [stem(t) for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def surface_forms(texts: Iterable[str]) -> Dict[str, str]:
+    """Map each stem to the word form it most often came from, for human-readable labels."""
+    forms: Dict[str, Counter] = {}
+    for text in texts:
+        text = GLUED_WORDS_PATTERN.sub(r"\1 \2", text or "")
+        for word in TOKEN_PATTERN.findall(text.lower()):
+            if word not in STOPWORDS:
+                forms.setdefault(stem(word), Counter())[word] += 1
+    return {token: counts.most_common(1)[0][0] for token, counts in forms.items()}
+
+
+def article_terms(article: Dict) -> Counter:
+    """Term counts for an article's title (weighted) and abstract/snippet."""
+    counts = Counter()
+    for token in tokenize(article.get("title", "")):
+        counts[token] += TITLE_WEIGHT
+    counts.update(tokenize(article.get("snippet", "")))
+    return counts
+
+
+def inverse_document_frequencies(documents: Iterable[Counter]) -> Dict[str, float]:
+    """Smoothed IDF over the given term-count documents."""
+    doc_freq = Counter()
+    num_docs = 0
+    for terms in documents:
+        num_docs += 1
+        doc_freq.update(terms.keys())
+    return {term: math.log((1 + num_docs) / (1 + df)) + 1.0 for term, df in doc_freq.items()}
+
+
+def tfidf_vector(terms: Counter, idf: Dict[str, float], default_idf: float = 1.0) -> Dict[str, float]:
+    """L2-normalized sparse TF-IDF vector (sublinear tf) as a {term: weight} dict."""
+    vector = {term: (1.0 + math.log(count)) * idf.get(term, default_idf) for term, count in terms.items() if count > 0}
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    if not norm:
+        return {}
+    return {term: w / norm for term, w in vector.items()}
+
+
+def cosine(vec_a: Dict[str, float], vec_b: Dict[str, float]) -> float:
+    """Dot product of two L2-normalized sparse vectors."""
+    if len(vec_a) > len(vec_b):
+        vec_a, vec_b = vec_b, vec_a
+    return sum(w * vec_b.get(term, 0.0) for term, w in vec_a.items())
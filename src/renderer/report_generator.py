@@ -2,38 +2,184 @@
 
 import datetime
 import os
+import shutil
+import threading
+from src.summarizer.prompt_builder import CITATION_PATTERN, renumber_citations
+from src.utils.metrics import timed
 
-def generate_summary_report(summary: str, articles: list, output_dir: str = "reports", filename_prefix: str = None) -> str:
+SYNTHESIS_TITLE = "Synthesis Across Sections"
+# Streamed text this close to the end is held back while a citation in it may still be arriving
+CITATION_HOLD_CHARS = 40
+
+def report_path(output_dir: str = "reports", filename_prefix: str = None) -> str:
     """
-    Generate a Markdown report with the summary and list of articles with citations,
-    saving each report with a unique timestamp in the filename within the specified reports directory.
+    Path of a new, empty report file named with the current timestamp, creating output_dir
+    if needed. Runs that start in the same second (profiles sharing an output_dir) get
+    _2, _3, ... suffixes rather than writing into one file.
+    """
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    stem = f"{filename_prefix}_summary_report_{timestamp}" if filename_prefix else f"summary_report_{timestamp}"
+    os.makedirs(output_dir, exist_ok=True)
+    suffix = ""
+    attempt = 1
+    while True:
+        path = os.path.join(output_dir, f"{stem}{suffix}.md")
+        try:
+            # Create the file exclusively, so a concurrent run can't claim the same name
+            open(path, "x", encoding="utf-8").close()
+            return path
+        except FileExistsError:
+            attempt += 1
+            suffix = f"_{attempt}"
 
-    Args:
-        summary (str): The summarized text.
-        articles (list): List of article dictionaries.
-        output_dir (str): Directory to save the summary report (default is 'reports').
-        filename_prefix (str): Optional prefix to include in the filename, before the timestamp.
+def _section_anchor(index: int) -> str:
+    return f"section-{index + 1}"
 
-    Returns:
-        str: Path to the generated report.
+class _SectionWriter:
+    """
+    Receives one section's text as it streams in; see StreamingReport.open_section.
+    Article numbers the text cites are shifted by offset on the way through.
     """
-    # Generate a timestamp for the filename
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    if filename_prefix:
-        filename = f"{filename_prefix}_summary_report_{timestamp}.md"
-    else:
-        filename = f"summary_report_{timestamp}.md"
 
-    output_path = os.path.join(output_dir, filename)
+    def __init__(self, report, index: int, offset: int = 0):
+        self.report = report
+        self.index = index
+        self.offset = offset
+        self.part = None
+        self.done = False
+        self._pending = ""
 
-    # Create the output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    def write(self, text: str) -> None:
+        if not self.offset:
+            self.report._write(self, text)
+            return
+        self._pending += text
+        # Keep back the tail, and any citation reaching into it, until it can't grow any more
+        cut = len(self._pending) - CITATION_HOLD_CHARS
+        for citation in CITATION_PATTERN.finditer(self._pending):
+            if citation.end() > cut:
+                cut = min(cut, citation.start())
+                break
+        if cut > 0:
+            self.report._write(self, renumber_citations(self._pending[:cut], self.offset))
+            self._pending = self._pending[cut:]
+
+    def close(self) -> None:
+        if self._pending:
+            self.report._write(self, renumber_citations(self._pending, self.offset))
+            self._pending = ""
+        self.report._close(self)
+
+class StreamingReport:
+    """
+    A summary report written to disk while the summaries stream in.
+
+    begin() writes the title and, for a report of several sections, a table of contents.
+    Each section's text streams straight into the report while every section before it is
+    complete. Sections that run ahead of that (requests run concurrently) spill to part
+    files next to the report and are copied in, in order, as soon as their turn comes, so
+    the report never has to be held in memory. The cross-section synthesis, the reference
+    list (numbered across the whole report) and the excluded articles follow at the end.
+    If the run fails, abort() keeps everything that arrived and notes where it stopped.
+    """
+
+    def __init__(self, output_dir: str = "reports", filename_prefix: str = None):
+        self.path = report_path(output_dir, filename_prefix)
+        self.parts_dir = self.path + ".parts"
+        self.titles = []
+        self.articles = []
+        self.sections = []
+        self._offsets = []
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._writers = {}
+        self._head = 0
+
+    @property
+    def consolidated(self) -> bool:
+        return len(self.titles) > 1
+
+    def begin(self, titles, articles, section_sizes=None) -> None:
+        """
+        Start the report. titles name the sections in order (one per summarized batch);
+        articles are all summarized articles in reference order. With section_sizes, the
+        number of articles in each section, section text streamed in cites its articles by
+        their number within the section (1..n) and is mapped to the reference list's numbers.
+        """
+        self.titles = list(titles)
+        self.articles = list(articles)
+        self.sections = [None] * len(self.titles)
+        self._offsets = [0] * len(self.titles)
+        if section_sizes:
+            offset = 0
+            for i, size in enumerate(section_sizes):
+                self._offsets[i] = offset
+                offset += size
+        with self._lock:
+            self._file.write("# Summary of Google Scholar Alerts\n\n")
+            if self.consolidated:
+                self._file.write("## Contents\n")
+                for i, title in enumerate(self.titles):
+                    self._file.write(f"- [{i + 1}. {title}](#{_section_anchor(i)})\n")
+                self._file.write(f"- [{SYNTHESIS_TITLE}](#synthesis)\n- [References](#references)\n\n")
+            self._file.flush()
+
+    def open_section(self, index: int) -> _SectionWriter:
+        """
+        Writer for section index, or for the synthesis with index == len(titles).
+        A single-section report has no headings: its one section is the summary itself.
+        """
+        writer = _SectionWriter(self, index, self._offsets[index] if index < len(self._offsets) else 0)
+        with self._lock:
+            self._writers[index] = writer
+            if index != self._head:
+                os.makedirs(self.parts_dir, exist_ok=True)
+                writer.part = open(os.path.join(self.parts_dir, f"section_{index + 1}.md"), "w+", encoding="utf-8")
+        if self.consolidated:
+            # Headings already use the reference list's numbers
+            if index < len(self.titles):
+                heading = f'<a id="{_section_anchor(index)}"></a>\n\n## {index + 1}. {self.titles[index]}\n\n'
+                self._write(writer, heading)
+            else:
+                self._write(writer, f'<a id="synthesis"></a>\n\n## {SYNTHESIS_TITLE}\n\n')
+        return writer
+
+    def _write(self, writer: _SectionWriter, text: str) -> None:
+        with self._lock:
+            target = writer.part or self._file
+            target.write(text)
+            target.flush()
+
+    def _close(self, writer: _SectionWriter) -> None:
+        with self._lock:
+            writer.done = True
+            (writer.part or self._file).write("\n\n")
+            self._advance()
+
+    def _advance(self) -> None:
+        """Copy finished sections in order; the first unfinished one continues straight into the report."""
+        while self._head in self._writers:
+            writer = self._writers[self._head]
+            if writer.part is not None:
+                writer.part.seek(0)
+                shutil.copyfileobj(writer.part, self._file)
+                writer.part.close()
+                os.remove(writer.part.name)
+                writer.part = None
+            if not writer.done:
+                break
+            self._head += 1
+        self._file.flush()
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("# Summary of Google Scholar Alerts\n\n")
-        f.write(summary + "\n\n")
+    def set_section_text(self, index: int, text: str) -> None:
+        """Keep the final text of a section, with the reference list's numbers, e.g. for the run journal."""
+        self.sections[index] = text
+
+    def _write_references(self, excluded_articles) -> None:
+        f = self._file
+        f.write('<a id="references"></a>\n\n' if self.consolidated else "")
         f.write("## References\n")
-        for i, article in enumerate(articles, start=1):
+        for i, article in enumerate(self.articles, start=1):
             title = article.get("title", "No Title")
             authors = ", ".join(article.get("authors", [])) if article.get("authors") else "Unknown authors"
             source = article.get("source", "Unknown source")
@@ -48,4 +194,94 @@ def generate_summary_report(summary: str, articles: list, output_dir: str = "rep
                 citation += f" [Link]({link})."
             f.write(f"- {citation}\n")
 
-    return output_path
\ No newline at end of file
+        if excluded_articles:
+            f.write("\n## Excluded by Relevance Filter\n")
+            f.write(f"{len(excluded_articles)} articles scored too low against the topic profile and were not summarized.\n\n")
+            for article, score in excluded_articles:
+                title = article.get("title", "No Title")
+                link = article.get("link", "")
+                entry = f"*{title}* (relevance {score:.3f})."
+                if link:
+                    entry += f" [Link]({link})."
+                f.write(f"- {entry}\n")
+
+    def finish(self, excluded_articles: list = None) -> str:
+        """Write the references and close the report. Returns its path."""
+        with self._lock:
+            self._write_references(excluded_articles)
+            self._close_file()
+        return self.path
+
+    def abort(self, error: str) -> str:
+        """Keep whatever has streamed in, in section order, note the failure and close the report."""
+        with self._lock:
+            for index in sorted(self._writers):
+                writer = self._writers[index]
+                if writer.part is not None:
+                    writer.part.seek(0)
+                    shutil.copyfileobj(writer.part, self._file)
+                    writer.part.close()
+                    os.remove(writer.part.name)
+                if not writer.done:
+                    self._file.write("\n\n")
+            self._file.write(f"\n\n_Report incomplete: the run stopped with {error}_\n")
+            self._close_file()
+        return self.path
+
+    def _close_file(self) -> None:
+        self._file.close()
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+
+@timed("generate_summary_report")
+def generate_summary_report(summary: str, articles: list, output_dir: str = "reports", filename_prefix: str = None,
+                            excluded_articles: list = None, sections: list = None) -> str:
+    """
+    Generate a Markdown report with the summary and list of articles with citations,
+    saving each report with a unique timestamp in the filename within the specified reports directory.
+
+    Args:
+        summary (str): The summarized text.
+        articles (list): List of article dictionaries.
+        output_dir (str): Directory to save the summary report (default is 'reports').
+        filename_prefix (str): Optional prefix to include in the filename, before the timestamp.
+        excluded_articles (list): Optional (article, relevance score) pairs left out by the relevance filter.
+        sections (list): Optional (title, text) pairs of a consolidated report; summary is then its synthesis.
+
+    Returns:
+        str: Path to the generated report.
+    """
+    sections = sections or []
+    report = StreamingReport(output_dir, filename_prefix)
+    report.begin([title for title, _ in sections], articles)
+    texts = [text for _, text in sections] if len(sections) > 1 else []
+    for index, text in enumerate(texts + [summary]):
+        writer = report.open_section(index)
+        writer.write(text)
+        writer.close()
+    return report.finish(excluded_articles)
+
+def generate_digest_report(digest: str, output_dir: str = "reports", filename: str = "rolling_digest.md") -> str:
+    """
+    Write the rolling digest to a fixed file in the reports directory, replacing the previous version.
+
+    Args:
+        digest (str): The updated digest text.
+        output_dir (str): Directory to save the digest (default is 'reports').
+        filename (str): Name of the digest file.
+
+    Returns:
+        str: Path to the digest file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, filename)
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Write to a temp file first so a crash never leaves a half-written digest behind
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("# Rolling Digest of Google Scholar Alerts\n\n")
+        f.write(f"_Last updated {timestamp}._\n\n")
+        f.write(digest + "\n")
+    os.replace(tmp_path, output_path)
+
+    return output_path
@@ -1,17 +1,22 @@
 # summarize_existing.py
 from src.data_store.db_handler import load_articles
 from src.summarizer.summarizer import summarize_articles
-from src.renderer.report_generator import generate_summary_report
+from src.renderer.report_generator import StreamingReport
 from src.utils.logger import logger
 
 def main():
     articles = load_articles()
     if not articles:
-        logger.info("No articles found in articles.json. Nothing to summarize.")
+        logger.info("No articles found in the article store. Nothing to summarize.")
         return
-    summary = summarize_articles(articles)
-    report_path = generate_summary_report(summary, articles)
+    report = StreamingReport()
+    try:
+        summarize_articles(articles, report=report)
+    except BaseException as e:
+        report.abort(f"{type(e).__name__}: {e}")
+        raise
+    report_path = report.finish()
     logger.info(f"Summary report generated at: {report_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,120 @@
+# src/summarizer/batching.py
+from typing import Dict, List, Tuple
+from src.config import SUMMARY_CONTEXT_TOKENS, SUMMARY_MAX_TOKENS, SUMMARY_OUTPUT_TOKENS_PER_ARTICLE
+from src.summarizer.prompt_builder import build_prompt, format_article_block
+
+try:
+    import tiktoken
+except ImportError:  # optional; fall back to a character-based estimate
+    tiktoken = None
+
+# Safety margin for estimate error and chat message framing
+SAFETY_MARGIN_TOKENS = 200
+# Never shrink an abstract below this many characters
+MIN_SNIPPET_CHARS = 200
+
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when it is installed, else estimate ~4 characters per token."""
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+def prompt_budget(system_message: str, context_tokens: int = None, max_tokens: int = None, topics: List[str] = None,
+                  profile_instructions: str = None) -> int:
+    """
+    Tokens left for article blocks once instructions, system message and completion are reserved.
+    The instructions are measured as sent: with the request's topic labels and the profile's
+    instructions, both of which can be long.
+    """
+    context_tokens = context_tokens or SUMMARY_CONTEXT_TOKENS
+    max_tokens = max_tokens or SUMMARY_MAX_TOKENS
+    instructions = build_prompt([], topics, profile_instructions=profile_instructions)
+    overhead = count_tokens(instructions) + count_tokens(system_message) + SAFETY_MARGIN_TOKENS
+    return context_tokens - max_tokens - overhead
+
+def article_tokens(article: Dict) -> int:
+    # Numbering is at most a few digits, so block size barely depends on the position
+    return count_tokens(format_article_block(999, article)) + 1
+
+def shrink_article(article: Dict, budget_tokens: int) -> Dict:
+    """
+    Return a copy of article whose abstract is cut down so its block fits budget_tokens.
+    The stored article is left untouched.
+    """
+    shrunk = dict(article)
+    snippet = shrunk.get("snippet", "")
+    excess = article_tokens(shrunk) - budget_tokens
+    if excess <= 0 or not snippet:
+        return shrunk
+    # Cut proportionally, then tighten until the estimate fits
+    keep = max(MIN_SNIPPET_CHARS, len(snippet) - excess * 4)
+    while True:
+        shrunk["snippet"] = snippet[:keep].rstrip() + "..."
+        if keep <= MIN_SNIPPET_CHARS or article_tokens(shrunk) <= budget_tokens:
+            return shrunk
+        keep = max(MIN_SNIPPET_CHARS, int(keep * 0.8))
+
+def _request_limits(system_message: str, context_tokens: int = None, max_tokens: int = None, topics: List[str] = None,
+                    profile_instructions: str = None) -> Tuple[int, int]:
+    """(token budget for article blocks, max articles per request)."""
+    budget = prompt_budget(system_message, context_tokens, max_tokens, topics, profile_instructions)
+    max_articles = max(1, (max_tokens or SUMMARY_MAX_TOKENS) // max(1, SUMMARY_OUTPUT_TOKENS_PER_ARTICLE))
+    return budget, max_articles
+
+def pack_batches(articles: List[Dict], system_message: str, context_tokens: int = None, max_tokens: int = None,
+                 topics: List[str] = None, profile_instructions: str = None) -> List[List[Dict]]:
+    """
+    Greedily pack articles, in order, into as few requests as possible. Each request
+    stays within the context budget (instructions + articles + max_tokens) and gives
+    every article room in the completion for its own summary. Only an article too big
+    to fit in a request on its own has its abstract shrunk. topics and
+    profile_instructions are the ones the requests' prompts will carry.
+    """
+    budget, max_articles = _request_limits(system_message, context_tokens, max_tokens, topics, profile_instructions)
+
+    batches, current, current_tokens = [], [], 0
+    for article in articles:
+        tokens = article_tokens(article)
+        if tokens > budget:
+            article = shrink_article(article, budget)
+            tokens = article_tokens(article)
+        if current and (current_tokens + tokens > budget or len(current) >= max_articles):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(article)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def pack_groups(groups: List[Tuple[str, List[Dict]]], system_message: str, context_tokens: int = None,
+                max_tokens: int = None, profile_instructions: str = None) -> List[Tuple[List[str], List[Dict]]]:
+    """
+    Pack (topic label, articles) groups into requests, keeping each group in one request
+    so the model sees related papers side by side. Only a group too big for a request
+    on its own is split. Returns (topic labels, articles) per request. Every label a
+    request collects is listed in its prompt, so the budget shrinks as labels are added.
+    """
+    batches, labels, current, current_tokens = [], [], [], 0
+    for label, articles in groups:
+        chunks = pack_batches(articles, system_message, context_tokens, max_tokens, [label], profile_instructions)
+        for chunk in chunks:
+            tokens = sum(article_tokens(article) for article in chunk)
+            merged_labels = labels if label in labels else labels + [label]
+            budget, max_articles = _request_limits(system_message, context_tokens, max_tokens, merged_labels,
+                                                   profile_instructions)
+            if current and (current_tokens + tokens > budget or len(current) + len(chunk) > max_articles):
+                batches.append((labels, current))
+                labels, current, current_tokens = [], [], 0
+            if label not in labels:
+                labels.append(label)
+            current.extend(chunk)
+            current_tokens += tokens
+    if current:
+        batches.append((labels, current))
+    return batches
@@ -1,6 +1,28 @@
 # src/summarizer/prompt_builder.py
+import re
 
-def build_prompt(articles):
+# Who the summaries are written for, unless a profile supplies its own instructions
+COMPANY_CONTEXT = (
+    "You are a scholarly assistant working for a company that integrates behavioral and physiological monitoring from multiple "
+    "passive sensing sources to better predict mental and neurological health treatments and disease progression, "
+    "leveraging machine learning (ML) technologies."
+)
+COMPANY_FOCUS_AREAS = (
+    "behavioral and physiological monitoring, wearables and passive sensing, ML applications, mental health, and "
+    "neurological/psychiatric disease progression"
+)
+# How the prompts refer back to a profile's own instructions
+PROFILE_FOCUS = "the focus described above"
+# Article citations in a reply: "Article 3", "(Article 3, Lastname)", "Articles 3 and 5", "Articles 3–7"
+CITATION_PATTERN = re.compile(r"\bArticles?\s+\d+(?:\s*(?:,|and|&|–|-|to)\s*\d{1,3}(?!\d))*")
+
+def _focus(profile_instructions):
+    """(opening context, short focus reference, focus reference listing the focus areas) for a prompt."""
+    if profile_instructions:
+        return profile_instructions.strip(), PROFILE_FOCUS, PROFILE_FOCUS
+    return COMPANY_CONTEXT, "our company's focus", f"our company's focus on {COMPANY_FOCUS_AREAS}"
+
+def build_prompt(articles, topics=None, start_index=1, profile_instructions=None):
     """
     Build a prompt to be sent to the LLM tailored to the company's context.
     The prompt will:
@@ -13,15 +35,20 @@ def build_prompt(articles):
     - Use consistent article citations (e.g., Article X) based on the numbered list.
     - Conclude with trends observed across the papers.
     - Suggest specific papers for closer reading and rationale based on the company's focus.
+    When topics are given, the articles arrive pre-grouped by topic similarity and the
+    topic labels are offered as a starting point for the categories.
+    Articles are numbered from start_index within the batch (1 for a whole batch), not by
+    their place in the report, so the prompt and its cached reply stay the same when other
+    batches change. renumber_citations maps the reply to the report's reference numbers.
+    profile_instructions, a profile's description of its readers and what matters to them,
+    replaces the company context.
     """
+    context, focus, focus_areas = _focus(profile_instructions)
 
     instructions = (
-        "You are a scholarly assistant working for a company that integrates behavioral and physiological monitoring from multiple "
-        "passive sensing sources to better predict mental and neurological health treatments and disease progression, "
-        "leveraging machine learning (ML) technologies. I will provide you with several scholarly articles, each containing "
+        f"{context} I will provide you with several scholarly articles, each containing "
         "a title, authors, source, abstract/snippet, and possibly a DOI. Your tasks are as follows:\n\n"
-        "1. **Categorization:** Organize the articles into broad categories that align with our company's focus on behavioral and physiological "
-        "monitoring, wearables and passive sensing, ML applications, mental health, and neurological/psychiatric disease progression. Each "
+        f"1. **Categorization:** Organize the articles into broad categories that align with {focus_areas}. Each "
         "category should have a title. The categories should be logical and relevant based on the provided context. At the top of each "
         "category, provide a summary of that category. The summary should have a 2 sections: 1) Synthesis of the main findings and "
         "highlights of the major themes and 2) Important nuances and differences across the studies. Cite the papers as they are relevant "
@@ -30,29 +57,19 @@ def build_prompt(articles):
         "2. **Individual Paper Summaries:** After the summary for the category, provide a concise summary for each study in the category. The "
         " format for the summary should be: Article X: Summary. You do not need to give links or authors.\n\n"
         "3. **Suggestions for Further Reading:** Recommend specific papers for closer examination, explaining why they are particularly relevant "
-        "given our company's focus.\n\n"
+        f"given {focus}.\n\n"
         "Ensure that every article that is referenced matches its number and author to the provided list. . Check again at the end before "
         "proceeding to ensure that no hallucinations or mistakes were made." 
     )
 
-    article_strs = []
-    for i, article in enumerate(articles, start=1):
-        # Extract available fields, using defaults if missing
-        title = article.get("title", "No Title")
-        authors = ", ".join(article.get("authors", [])) if article.get("authors") else "Unknown authors"
-        source = article.get("source", "Unknown source")
-        doi = article.get("doi", "")
-        snippet = article.get("snippet", "")
+    if topics:
+        instructions += (
+            "\n\nThe articles below have been pre-grouped by topic similarity, with related papers listed next to "
+            f"each other. Tentative topics: {'; '.join(topics)}. Use these as a starting point for the categories, "
+            "renaming, merging or splitting them where the content calls for it."
+        )
 
-        # Format each article block
-        art_block = f"**Article {i}:**\n" \
-                    f"**Title:** {title}\n" \
-                    f"**Authors:** {authors}\n" \
-                    f"**Source:** {source}\n"
-        if doi:
-            art_block += f"**DOI:** {doi}\n"
-        art_block += f"**Abstract/Snippet:** {snippet}\n"
-        article_strs.append(art_block.strip())
+    article_strs = [format_article_block(i, article) for i, article in enumerate(articles, start=start_index)]
 
     articles_text = "\n\n".join(article_strs)
 
@@ -67,4 +84,85 @@ def build_prompt(articles):
         f"4. Draw conclusoins about trends, gaps, and opportunities acorss the papers.\n"
         f"5. Suggest specific papers to read closely and explain why they are relevant.\n"
     )
-    return prompt
\ No newline at end of file
+    return prompt
+
+def renumber_citations(text, offset):
+    """Shift every article number cited in text by offset, e.g. a batch's numbering to the report's."""
+    if not offset:
+        return text
+    return CITATION_PATTERN.sub(
+        lambda citation: re.sub(r"\d+", lambda number: str(int(number.group()) + offset), citation.group()), text,
+    )
+
+def format_article_block(i, article):
+    """Format one numbered article the way it appears in the prompt."""
+    # Extract available fields, using defaults if missing
+    title = article.get("title", "No Title")
+    authors = ", ".join(article.get("authors", [])) if article.get("authors") else "Unknown authors"
+    source = article.get("source", "Unknown source")
+    doi = article.get("doi", "")
+    snippet = article.get("snippet", "")
+
+    # Format each article block
+    art_block = f"**Article {i}:**\n" \
+                f"**Title:** {title}\n" \
+                f"**Authors:** {authors}\n" \
+                f"**Source:** {source}\n"
+    if doi:
+        art_block += f"**DOI:** {doi}\n"
+    art_block += f"**Abstract/Snippet:** {snippet}\n"
+    return art_block.strip()
+
+def build_merge_prompt(summaries, titles=None, profile_instructions=None):
+    """
+    Build a prompt that merges summaries of separate article batches (the sections of a
+    consolidated report) into one synthesis. Citations already use the report's global
+    article numbers, so they are kept as written.
+    """
+    context, focus, _ = _focus(profile_instructions)
+    instructions = (
+        f"{context} Below are summaries of several sections of one "
+        "literature report, each covering a different set of articles. Write a synthesis across all sections:\n\n"
+        "1. **Cross-cutting themes:** The main findings and themes that span sections, and the important differences "
+        "and nuances between them.\n\n"
+        f"2. **Trends, gaps and opportunities:** What the papers together suggest for {focus}.\n\n"
+        "3. **Suggestions for Further Reading:** The papers most worth reading closely, and why.\n\n"
+        "Cite papers exactly as the sections do, as (Article X, Author Lastname): article numbers refer to the report's "
+        "reference list and must not be renumbered. Do not repeat the individual paper summaries."
+    )
+    blocks = []
+    for i, summary in enumerate(summaries, start=1):
+        title = titles[i - 1] if titles and i <= len(titles) else f"Section {i}"
+        blocks.append(f"**Section {i}: {title}**\n{summary.strip()}")
+    sections_text = "\n\n".join(blocks)
+    return f"{instructions}\n\n### Section Summaries:\n\n{sections_text}\n"
+
+def build_digest_update_prompt(previous_digest, new_summary, profile_instructions=None):
+    """
+    Build a prompt that folds a summary of newly added articles into the previous rolling digest,
+    keeping its category structure so the digest reads as one document.
+    """
+    if profile_instructions:
+        reader = f"{profile_instructions.strip()} You maintain a rolling digest of the scholarly literature for these readers."
+    else:
+        reader = (
+            "You maintain a rolling digest of the scholarly literature for a company that integrates behavioral and "
+            "physiological monitoring from passive sensing sources to predict mental and neurological health treatments "
+            "and disease progression using machine learning."
+        )
+    instructions = (
+        f"{reader} Below are the current digest and a summary of articles "
+        "added since it was written. Update the digest:\n\n"
+        "1. Merge the new findings into the existing categories, adding a new category only when nothing fits.\n"
+        "2. Update each category summary so it reflects both earlier and new work, noting where new studies "
+        "confirm, extend or contradict earlier ones.\n"
+        "3. Refer to papers by first author's last name and short title, not by article number, since article "
+        "numbers are only meaningful within a single report.\n"
+        "4. Keep the digest concise: condense older material rather than letting the digest grow without bound.\n"
+        "5. End with an updated list of trends and papers worth reading closely."
+    )
+    return (
+        f"{instructions}\n\n"
+        f"### Current Digest:\n\n{previous_digest}\n\n"
+        f"### Summary of Newly Added Articles:\n\n{new_summary}\n"
+    )
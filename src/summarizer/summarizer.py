@@ -1,67 +1,329 @@
 # src/summarizer/summarizer.py
-import openai
-from src.config import OPENAI_API_KEY
-from src.summarizer.prompt_builder import build_prompt
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.config import (
+    OPENAI_API_KEY, OPENAI_API_BASE, OPENAI_MODEL,
+    SUMMARY_MAX_CONCURRENCY, SUMMARY_MAX_TOKENS, SUMMARY_STREAM,
+    LLM_CACHE_PATH, LLM_CACHE_TTL_DAYS, LLM_CACHE_MAX_ENTRIES,
+)
+from src.summarizer.batching import count_tokens, pack_batches, pack_groups, prompt_budget, shrink_article, article_tokens
+from src.summarizer.prompt_builder import (
+    build_prompt, build_merge_prompt, build_digest_update_prompt, renumber_citations,
+)
+from src.utils.cache import PersistentCache, MISSING
 from src.utils.logger import logger
-import math
-
-MAX_ARTICLES_PER_BATCH = 30  # adjust this based on trial and error
-
-def summarize_articles(articles):
-    openai.api_key = OPENAI_API_KEY
-
-    # If too many articles, summarize in batches
-    if len(articles) > MAX_ARTICLES_PER_BATCH:
-        logger.info(f"Too many articles ({len(articles)}) to summarize at once. Splitting into batches.")
-        
-        batch_size = MAX_ARTICLES_PER_BATCH
-        num_batches = math.ceil(len(articles) / batch_size)
-        batch_summaries = []
-
-        for i in range(num_batches):
-            start = i * batch_size
-            end = start + batch_size
-            batch = articles[start:end]
-            logger.info(f"Summarizing batch {i+1}/{num_batches} with {len(batch)} articles.")
-            batch_summary = summarize_batch(batch)
-            batch_summaries.append(batch_summary)
-
-        # Now summarize the batch summaries themselves
-        logger.info(f"Summarizing {len(batch_summaries)} batch summaries into a final summary.")
-        final_summary = summarize_batch_summaries(batch_summaries)
-        return final_summary
+from src.utils.metrics import metrics, timed
+
+SYSTEM_MESSAGE = "You are a helpful and knowledgeable assistant."
+TEMPERATURE = 0.7
+
+_cache = None
+_cache_lock = threading.Lock()
+# Run journal that completed LLM calls are saved to and replayed from on --resume. A context
+# variable, so profiles summarized concurrently each checkpoint into their own run's journal.
+_checkpoint = contextvars.ContextVar("llm_checkpoint", default=None)
+
+def get_response_cache() -> PersistentCache:
+    """Return the on-disk cache of LLM responses."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PersistentCache(
+                LLM_CACHE_PATH,
+                ttl_seconds=LLM_CACHE_TTL_DAYS * 24 * 60 * 60 or None,
+                max_entries=LLM_CACHE_MAX_ENTRIES,
+                name="llm",
+            )
+        return _cache
+
+def set_checkpoint(journal) -> None:
+    """
+    Save every completed LLM call to journal (a RunJournal) and reuse calls it already holds,
+    so a resumed run only repeats the calls that never finished. None turns this off.
+    Applies to the calling thread and the summarization threads it starts.
+    """
+    _checkpoint.set(journal)
+
+def response_cache_key(model, params, system_message, prompt) -> str:
+    """Content address of a chat request: identical requests always map to the same key."""
+    payload = json.dumps(
+        {"model": model, "params": params, "system": system_message, "prompt": prompt},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class RequestTooLargeError(Exception):
+    """The prompt plus max_tokens did not fit the model's context window."""
+
+_openai = None
+
+def configure_openai():
+    """
+    Import and configure the openai client on first use. It is the slowest import in the
+    project, so runs that are served entirely from caches never pay for it.
+    """
+    global _openai
+    with _cache_lock:
+        if _openai is None:
+            import openai
+            openai.api_key = OPENAI_API_KEY
+            if OPENAI_API_BASE:
+                openai.api_base = OPENAI_API_BASE
+            _openai = openai
+        return _openai
+
+def run_concurrently(func, items, max_workers=None):
+    """
+    Apply func to every item on a bounded thread pool, keeping input order. Each call runs
+    in a copy of the caller's context, so it sees the caller's checkpoint.
+    """
+    if max_workers is None:
+        max_workers = SUMMARY_MAX_CONCURRENCY
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+        return [future.result() for future in futures]
+
+def section_title(labels, start_index, count):
+    """Report section heading for a batch: its topic labels, if any, and the article numbers it covers."""
+    numbers = f"Articles {start_index}–{start_index + count - 1}" if count > 1 else f"Article {start_index}"
+    return f"{'; '.join(labels)} ({numbers})" if labels else numbers
+
+@timed("summarize_articles")
+def summarize_articles(articles, groups=None, report=None, profile_instructions=None):
+    """
+    Summarize articles into one report. With groups, a list of (topic label, articles)
+    from src.ranking.clustering, whole topic clusters are packed into each request.
+    Articles are numbered across all batches in request order; each request numbers its
+    own articles from 1, so a batch's prompt (and cached reply) doesn't change when an
+    earlier batch grows, and its citations are shifted to the report's numbers. With report, a
+    StreamingReport, every summary streams into it as it is generated: one section per
+    batch, then the synthesis across them. Returns the final summary (the synthesis when
+    there are several batches). profile_instructions replaces the prompts' company context.
+    """
+    # Pack articles into as few requests as fit the context budget
+    if groups:
+        batches = pack_groups(groups, SYSTEM_MESSAGE, profile_instructions=profile_instructions)
+    else:
+        batches = [(None, batch) for batch in pack_batches(articles, SYSTEM_MESSAGE,
+                                                           profile_instructions=profile_instructions)]
+    starts, start = [], 1
+    for _, batch in batches:
+        starts.append(start)
+        start += len(batch)
+    titles = [section_title(labels, first, len(batch)) for (labels, batch), first in zip(batches, starts)]
+    if report is not None:
+        report.begin(titles, [article for _, batch in batches for article in batch],
+                     [len(batch) for _, batch in batches])
+
+    def summarize_section(index):
+        labels, batch = batches[index]
+        writer = report.open_section(index) if report is not None else None
+        text = summarize_batch(batch, labels, on_token=writer.write if writer else None,
+                               profile_instructions=profile_instructions)
+        text = renumber_citations(text, starts[index] - 1)
+        if writer:
+            writer.close()
+            report.set_section_text(index, text)
+        return text
+
+    if len(batches) > 1:
+        logger.info(
+            f"Too many articles ({len(articles)}) to summarize at once. "
+            f"Summarizing {len(batches)} token-packed batches, up to {SUMMARY_MAX_CONCURRENCY} at a time."
+        )
+        batch_summaries = run_concurrently(summarize_section, list(range(len(batches))))
+
+        # Now merge the batch summaries into a synthesis across them
+        writer = report.open_section(len(batches)) if report is not None else None
+        summary = reduce_summaries(batch_summaries, titles, on_token=writer.write if writer else None,
+                                   profile_instructions=profile_instructions)
+        if writer:
+            writer.close()
     else:
         # If we have a manageable number of articles, summarize directly
-        return summarize_batch(articles)
+        summary = summarize_section(0) if batches else ""
 
-MAX_SNIPPET_LENGTH = 500  # characters
+    cache_stats = get_response_cache().stats()
+    logger.info(
+        f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"(hit rate {cache_stats['hit_rate']:.0%})."
+    )
+    return summary
 
-def summarize_batch(articles_batch):
-    # Truncate long snippets
-    for a in articles_batch:
-        if len(a.get("snippet", "")) > MAX_SNIPPET_LENGTH:
-            a["snippet"] = a["snippet"][:MAX_SNIPPET_LENGTH] + "..."
-    
-    prompt = build_prompt(articles_batch)
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a helpful and knowledgeable assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=2000,  # reduce max_tokens if needed
-            temperature=0.7,
+# Section heading framing around each batch summary in the merge prompt
+SECTION_OVERHEAD_TOKENS = 30
+
+def group_summaries(summaries, budget_tokens):
+    """
+    Split summaries into consecutive groups whose combined size fits in budget_tokens.
+    Every group holds at least two summaries so each reduce level makes progress.
+    """
+    groups, current, current_tokens = [], [], 0
+    for summary in summaries:
+        tokens = count_tokens(summary) + SECTION_OVERHEAD_TOKENS
+        if len(current) >= 2 and current_tokens + tokens > budget_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        else:
+            groups.append(current)
+    return groups
+
+def reduce_summaries(summaries, titles=None, on_token=None, profile_instructions=None):
+    """
+    Merge batch summaries with a multi-level reduce tree. Each level merges groups that
+    fit in the context window (concurrently), until a single summary remains.
+    Only the last merge streams to on_token; titles name the first level's summaries.
+    """
+    budget = prompt_budget(SYSTEM_MESSAGE, profile_instructions=profile_instructions)
+    level = 1
+    while len(summaries) > 1:
+        groups = group_summaries(summaries, budget)
+        logger.info(f"Reduce level {level}: merging {len(summaries)} summaries in {len(groups)} groups.")
+        if len(groups) == 1:
+            return merge_summaries(groups[0], titles if level == 1 else None, on_token=on_token,
+                                   profile_instructions=profile_instructions)
+        summaries = run_concurrently(
+            lambda group: merge_summaries(group, profile_instructions=profile_instructions), groups,
         )
-        return response.choices[0].message.content.strip()
-    except openai.error.InvalidRequestError as e:
-        # If you still hit the limit, consider retrying with fewer articles or shorter snippets
-        logger.error(f"Request too large: {e}. Trying fewer articles or shorter snippets next time.")
-        return "Summary could not be generated due to token limits."
-
-def summarize_batch_summaries(batch_summaries):
-    # Summarize the summaries themselves
-    # Treat each batch summary as "article snippet" for simplicity
-    pseudo_articles = [{"title": f"Batch {i+1}", "authors": [], "source": "SummaryBatch", "snippet": s, "publication_date": ""} 
-                       for i, s in enumerate(batch_summaries)]
-    return summarize_batch(pseudo_articles)
\ No newline at end of file
+        level += 1
+    if summaries and on_token:
+        on_token(summaries[0])
+    return summaries[0] if summaries else ""
+
+def chat_completion(prompt, on_token=None):
+    """
+    Send one prompt to the model through the response cache and return the reply text.
+    With on_token, the reply is streamed (when SUMMARY_STREAM is on) and passed to
+    on_token piece by piece as it arrives; a reply from the cache or journal is passed whole.
+    Raises RequestTooLargeError if the request is too large.
+    """
+    params = {"max_tokens": SUMMARY_MAX_TOKENS, "temperature": TEMPERATURE}
+    cache = get_response_cache()
+    cache_key = response_cache_key(OPENAI_MODEL, params, SYSTEM_MESSAGE, prompt)
+    checkpoint = _checkpoint.get()
+    if checkpoint is not None:
+        saved = checkpoint.reuse_llm_result(cache_key)
+        if saved is not None:
+            metrics.count("llm.journal_hits")
+            if on_token:
+                on_token(saved)
+            return saved
+    cached = cache.lookup(cache_key)
+    if cached is not MISSING:
+        metrics.count("llm.cache_hits")
+        if checkpoint is not None:
+            checkpoint.record(cache_key, cached)
+        if on_token:
+            on_token(cached)
+        return cached
+
+    openai = configure_openai()
+    messages = [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+    with metrics.timer("llm.request"):
+        try:
+            if on_token and SUMMARY_STREAM:
+                content = stream_completion(openai, messages, params, on_token)
+                # Streamed replies carry no usage block; count them with the batching estimate
+                usage = {"prompt_tokens": count_tokens(SYSTEM_MESSAGE) + count_tokens(prompt),
+                         "completion_tokens": count_tokens(content)}
+            else:
+                response = openai.ChatCompletion.create(model=OPENAI_MODEL, messages=messages, **params)
+                usage = response.get("usage") or {}
+                content = response.choices[0].message.content.strip()
+                if on_token:
+                    on_token(content)
+        except openai.error.InvalidRequestError as e:
+            raise RequestTooLargeError(str(e)) from e
+    metrics.count("llm.requests")
+    metrics.count("llm.prompt_tokens", usage.get("prompt_tokens", 0))
+    metrics.count("llm.completion_tokens", usage.get("completion_tokens", 0))
+    cache.set(cache_key, content)
+    if checkpoint is not None:
+        checkpoint.record(cache_key, content)
+    return content
+
+def stream_completion(openai, messages, params, on_token):
+    """Stream one chat completion, passing each piece of the reply to on_token. Returns the whole reply."""
+    pieces = []
+    started = time.perf_counter()
+    for chunk in openai.ChatCompletion.create(model=OPENAI_MODEL, messages=messages, stream=True, **params):
+        piece = chunk.choices[0].get("delta", {}).get("content")
+        if not piece:
+            continue
+        if not pieces:
+            metrics.add_time("llm.first_token", time.perf_counter() - started)
+            # Leading whitespace is dropped, as the non-streamed reply is stripped
+            piece = piece.lstrip()
+        if piece:
+            pieces.append(piece)
+            on_token(piece)
+    return "".join(pieces).strip()
+
+@timed("summarize_batch")
+def summarize_batch(articles_batch, topics=None, start_index=1, on_token=None, profile_instructions=None):
+    try:
+        prompt = build_prompt(articles_batch, topics, start_index, profile_instructions=profile_instructions)
+        return chat_completion(prompt, on_token=on_token)
+    except RequestTooLargeError as e:
+        # The token estimate was off: retry with half the articles, or a shorter abstract.
+        # The second half continues the batch's numbering, so the halves read as one section.
+        logger.warning(f"Request too large for {len(articles_batch)} articles: {e}. Retrying smaller.")
+        if len(articles_batch) > 1:
+            middle = len(articles_batch) // 2
+            first = summarize_batch(articles_batch[:middle], topics, start_index, on_token=on_token,
+                                    profile_instructions=profile_instructions)
+            if on_token:
+                on_token("\n\n")
+            second = summarize_batch(articles_batch[middle:], topics, start_index + middle, on_token=on_token,
+                                     profile_instructions=profile_instructions)
+            return f"{first}\n\n{second}"
+        article = articles_batch[0]
+        smaller = shrink_article(article, article_tokens(article) // 2)
+        if smaller.get("snippet") == article.get("snippet"):
+            logger.error(f"Request too large even for a single article: {e}.")
+            message = "Summary could not be generated due to token limits."
+            if on_token:
+                on_token(message)
+            return message
+        return summarize_batch([smaller], topics, start_index, on_token=on_token,
+                               profile_instructions=profile_instructions)
+
+def merge_summaries(summaries, titles=None, on_token=None, profile_instructions=None):
+    """Merge batch (or lower-level merged) summaries into one synthesis."""
+    try:
+        prompt = build_merge_prompt(summaries, titles, profile_instructions=profile_instructions)
+        return chat_completion(prompt, on_token=on_token)
+    except RequestTooLargeError as e:
+        logger.error(f"Merge of {len(summaries)} summaries too large: {e}. Keeping them side by side.")
+        merged = "\n\n".join(summaries)
+        if on_token:
+            on_token(merged)
+        return merged
+
+def update_digest(previous_digest, new_summary, profile_instructions=None):
+    """
+    Fold the summary of newly added articles into the previous rolling digest.
+    Without a previous digest, the new summary becomes the digest.
+    """
+    if not previous_digest:
+        return new_summary
+    try:
+        prompt = build_digest_update_prompt(previous_digest, new_summary, profile_instructions=profile_instructions)
+        return chat_completion(prompt)
+    except RequestTooLargeError as e:
+        logger.error(f"Rolling digest update too large: {e}. Keeping the new summary as the digest.")
+        return new_summary
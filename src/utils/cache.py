@@ -0,0 +1,157 @@
+# src/utils/cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+# Returned by PersistentCache.lookup() on a miss, since None is a legitimate cached value
+MISSING = object()
+# A hit refreshes the entry's LRU position only if it was last touched longer ago than this
+TOUCH_INTERVAL_SECONDS = 60
+# Pending LRU touches are written once this many have accumulated (or on the next set/close)
+TOUCH_BATCH = 256
+
+# Every cache created in this process, by name, so run profiles can report them
+_caches = {}
+
+
+class PersistentCache:
+    """
+    A small on-disk key/value cache backed by SQLite.
+
+    Entries expire after `ttl_seconds` (None keeps them forever) and the least recently
+    used entries are evicted once the cache holds more than `max_entries`. Recency is
+    tracked to within TOUCH_INTERVAL_SECONDS and written in batches, so hits don't write.
+    Values are stored as JSON, so `None` is a legitimate cached value (e.g. a negative
+    lookup). Hit/miss counters are kept per process.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None,
+                 name: Optional[str] = None):
+        self.path = path
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._count = 0
+        self._touched = {}
+        _caches[self.name] = self
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, ttl REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+            conn.commit()
+            self._count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for key, or default if it is missing or expired."""
+        value = self.lookup(key)
+        return default if value is MISSING else value
+
+    def lookup(self, key: str) -> Any:
+        """Like get(), but returns the module-level MISSING sentinel on a miss."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at, accessed_at, ttl FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value, created_at, accessed_at, ttl = row
+                if ttl is None or now - created_at <= ttl:
+                    # Reads stay read-only: LRU touches are coarse and written in batches
+                    if now - accessed_at > TOUCH_INTERVAL_SECONDS:
+                        self._touched[key] = now
+                        if len(self._touched) >= TOUCH_BATCH:
+                            self._flush_touches(conn)
+                            conn.commit()
+                    self.hits += 1
+                    return json.loads(value)
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                conn.commit()
+                self._count -= 1
+                self._touched.pop(key, None)
+            self.misses += 1
+            return MISSING
+
+    def contains(self, key: str) -> bool:
+        return self.lookup(key) is not MISSING
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = MISSING) -> None:
+        """Store value under key. ttl_seconds overrides the cache-wide TTL for this entry."""
+        ttl = self.ttl_seconds if ttl_seconds is MISSING else ttl_seconds
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            self._touched.pop(key, None)
+            replaced = conn.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount
+            conn.execute(
+                "INSERT INTO cache (key, value, created_at, accessed_at, ttl) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now, ttl),
+            )
+            self._count += 1 - replaced
+            self._evict(conn)
+            conn.commit()
+
+    def _flush_touches(self, conn: sqlite3.Connection) -> None:
+        if self._touched:
+            conn.executemany("UPDATE cache SET accessed_at = ? WHERE key = ?",
+                             [(accessed, key) for key, accessed in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        excess = self._count - self.max_entries if self.max_entries else 0
+        if excess > 0:
+            self._flush_touches(conn)
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            self._count -= excess
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry. Returns the number removed."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            cur = conn.execute("DELETE FROM cache WHERE ttl IS NOT NULL AND ? - created_at > ttl", (now,))
+            conn.commit()
+            self._count -= cur.rowcount
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touches(self._conn)
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+
+def cache_stats() -> dict:
+    """Hit/miss statistics of every cache created in this process, by name."""
+    return {name: cache.stats() for name, cache in sorted(_caches.items())}
@@ -0,0 +1,61 @@
+# src/utils/http.py
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def build_session(pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5, user_agent: str = "") -> requests.Session:
+    """
+    Build a requests Session with a connection pool sized for pool_size concurrent workers.
+    Retries on 429/5xx with exponential backoff, honoring Retry-After when the server sends one.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    return session
+
+
+class HostRateLimiter:
+    """
+    Spaces out requests per host so that no host sees more than `rate` requests per second,
+    no matter how many worker threads share the limiter.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self.rate = rate
+
+    def wait(self, url: str) -> None:
+        """Block until the host of `url` may be called again."""
+        if not self.rate or self.rate <= 0:
+            return
+        host = urllib.parse.urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / self.rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
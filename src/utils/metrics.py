@@ -0,0 +1,87 @@
+# src/utils/metrics.py
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict
+
+
+class Metrics:
+    """
+    Process-wide timers and counters. Timers accumulate call count, total and slowest
+    wall-clock seconds per stage; counters accumulate numbers such as bytes, HTTP calls,
+    retries, cache hits and tokens. Safe to update from worker threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.timers: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.perf_counter()
+            self.timers.clear()
+            self.counters.clear()
+
+    def add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timer = self.timers.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+            timer["calls"] += 1
+            timer["seconds"] += seconds
+            timer["max_seconds"] = max(timer["max_seconds"], seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "elapsed_seconds": round(time.perf_counter() - self.started, 3),
+                "timers": {
+                    name: {key: round(value, 4) for key, value in timer.items()}
+                    for name, timer in sorted(self.timers.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+
+metrics = Metrics()
+
+
+def timed(name: str):
+    """Decorator that adds each call's wall-clock time to the named timer."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def write_profile(directory: str, extra: Dict = None, name: str = "run_profile") -> str:
+    """
+    Write the current metrics, plus any extra fields, as a JSON run profile in directory.
+    Returns the file path. One file per run, so runs can be compared over time.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    profile = {"timestamp": stamp, **(extra or {}), **metrics.snapshot()}
+    path = os.path.join(directory, f"{name}_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    return path
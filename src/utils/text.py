@@ -0,0 +1,16 @@
+# src/utils/text.py
+import re
+import unicodedata
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a title for use as a lookup key: drop leading [PDF]/[HTML] markers,
+    fold case and accents, and collapse punctuation and whitespace.
+    """
+    if not title:
+        return ""
+    cleaned = re.sub(r"^\[.*?\]\s*", "", title, flags=re.IGNORECASE).strip()
+    cleaned = unicodedata.normalize("NFKD", cleaned)
+    cleaned = "".join(ch for ch in cleaned if not unicodedata.combining(ch))
+    cleaned = re.sub(r"[\W_]+", " ", cleaned.lower())
+    return cleaned.strip()
@@ -0,0 +1,227 @@
+# src/watcher.py
+"""
+Watch mode: keep one authenticated IMAP connection open, wait for new alerts with
+IDLE, and run parse -> enrich -> store on them in micro-batches. Summaries run on a
+schedule or once enough articles are waiting, through the same incremental run as
+`python -m src.cli summarize --incremental`, for every digest profile.
+"""
+import imaplib
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from src.config import (
+    PROFILE_DIR, WATCH_BATCH_SECONDS, WATCH_IDLE_SECONDS, WATCH_SUMMARY_THRESHOLD, WATCH_SUMMARY_HOURS, WATCH_SUMMARY_AT,
+    WATCH_RECONNECT_MAX_SECONDS,
+)
+from src.data_store.db_handler import get_meta, set_meta, max_article_id
+from src.data_store.dedup import KnownArticleIndex
+from src.email_client.email_fetcher import open_scholar_mailbox, close_mailbox, idle_wait
+from src.main import WATERMARK_KEY, run_pipeline
+from src.pipeline import IngestStats, ingest_new_articles
+from src.profiles import load_profiles
+from src.utils.logger import logger
+from src.utils.metrics import metrics, write_profile
+
+LAST_SUMMARY_KEY = "watch_last_summary"
+# Failures that mean the connection is gone; anything else (bad credentials, bugs) stops the watcher
+CONNECTION_ERRORS = (imaplib.IMAP4.abort, OSError)
+# A failed summary is retried after this long (resuming the interrupted run)
+SUMMARY_RETRY_SECONDS = 900
+# Alerts left unread by a batch with failed emails are retried after this long
+INGEST_RETRY_SECONDS = 300
+
+
+def next_summary_time(last: datetime, hours: float, at: str) -> Optional[datetime]:
+    """When the next scheduled summary is due after one at `last`, or None without a schedule."""
+    if at:
+        hour, minute = (int(part) for part in at.split(":"))
+        due = last.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return due if due > last else due + timedelta(days=1)
+    if hours > 0:
+        return last + timedelta(hours=hours)
+    return None
+
+
+class Watcher:
+    """
+    The long-running ingest loop. The mailbox connection, the known-article index and the
+    module-level caches and pools behind parsing, CrossRef and the LLM stay warm across
+    batches; a dropped connection is reopened with exponential backoff.
+    """
+
+    def __init__(self, options, batch_seconds=None, threshold=None, summary_hours=None, summary_at=None,
+                 idle_seconds=None):
+        self.options = dict(options, summarize_only=True, incremental=True)
+        self.profiles = load_profiles(self.options.get("profiles"))
+        self.batch_seconds = WATCH_BATCH_SECONDS if batch_seconds is None else batch_seconds
+        self.threshold = WATCH_SUMMARY_THRESHOLD if threshold is None else threshold
+        self.summary_hours = WATCH_SUMMARY_HOURS if summary_hours is None else summary_hours
+        self.summary_at = WATCH_SUMMARY_AT if summary_at is None else summary_at
+        self.idle_seconds = idle_seconds or WATCH_IDLE_SECONDS
+        self.mail = None
+        self.known_index = None
+        self.batches = 0
+        self.summaries = 0
+        self.resume_summary = False
+        self.summary_retry_at = 0.0
+        self.ingest_retry_at = 0.0
+        last = get_meta(LAST_SUMMARY_KEY)
+        self.last_summary = datetime.fromisoformat(last) if last else datetime.now()
+
+    def connect(self) -> None:
+        self.mail = open_scholar_mailbox()
+        metrics.count("watch.connects")
+        logger.info("Watching the alert folder for new mail.")
+
+    def disconnect(self) -> None:
+        if self.mail is None:
+            return
+        try:
+            close_mailbox(self.mail)
+        except (imaplib.IMAP4.error, OSError):
+            self.drop()
+        self.mail = None
+
+    def drop(self) -> None:
+        """Close a connection that is already broken, without talking to the server."""
+        if self.mail is None:
+            return
+        try:
+            self.mail.shutdown()
+        except OSError:
+            pass
+        self.mail = None
+
+    def ingest(self) -> None:
+        """Process every unread alert on the open connection as one micro-batch."""
+        if self.known_index is None:
+            self.known_index = KnownArticleIndex.load()
+        stats = IngestStats()
+        stored = None
+        try:
+            stored = ingest_new_articles(mail=self.mail, known_index=self.known_index, stats=stats)
+        finally:
+            if stored is None or stats.failed_emails:
+                # Articles of failed or interrupted emails entered the index without being
+                # stored; their messages stay unread, so reload the index to let the retry
+                # (after a reconnect, if the connection dropped) see them as new
+                self.known_index = None
+        # Failed emails stay unread; without new mail nothing would search for them again
+        self.ingest_retry_at = time.monotonic() + INGEST_RETRY_SECONDS if stats.failed_emails else 0.0
+        self.batches += 1
+        if stats.emails or stats.failed_emails:
+            logger.info(f"Batch {self.batches}: stored {len(stored)} new articles, "
+                        f"{self.pending_articles()} awaiting summary.")
+
+    def pending_articles(self) -> int:
+        """Articles stored since the last summary of the profile furthest behind."""
+        oldest = min(int(get_meta(profile.meta_key(WATERMARK_KEY), "0")) for profile in self.profiles)
+        return max(max_article_id() - oldest, 0)
+
+    def summary_due(self) -> Optional[str]:
+        """Why a summary should run now, or None."""
+        if time.monotonic() < self.summary_retry_at:
+            return None
+        pending = self.pending_articles()
+        due = next_summary_time(self.last_summary, self.summary_hours, self.summary_at)
+        scheduled = due is not None and datetime.now() >= due
+        if not pending:
+            if scheduled:
+                # Nothing to report in this slot; wait for the next one
+                self.last_summary = datetime.now()
+            return None
+        if self.threshold and pending >= self.threshold:
+            return f"{pending} articles waiting"
+        if scheduled:
+            return f"scheduled, {pending} articles waiting"
+        return None
+
+    def maybe_summarize(self) -> None:
+        reason = self.summary_due()
+        if reason is None:
+            return
+        logger.info(f"Summarizing ({reason})...")
+        try:
+            # The run's profile also covers the micro-batches and reconnects since the last summary
+            run_pipeline(self.options, resume=self.resume_summary, reset_metrics=False)
+        except Exception as e:
+            # The run is journaled; the retry resumes it without repeating finished LLM calls
+            logger.error(f"Summary failed: {e}. Retrying in {SUMMARY_RETRY_SECONDS // 60} minutes.")
+            self.resume_summary = True
+            self.summary_retry_at = time.monotonic() + SUMMARY_RETRY_SECONDS
+            return
+        finally:
+            metrics.reset()
+        self.resume_summary = False
+        self.summaries += 1
+        self.last_summary = datetime.now()
+        set_meta(LAST_SUMMARY_KEY, self.last_summary.isoformat(timespec="seconds"))
+
+    def idle_timeout(self) -> float:
+        """
+        IDLE until the next scheduled summary or retry of failed emails, but re-issue it
+        at least every idle_seconds.
+        """
+        timeout = self.idle_seconds
+        due = next_summary_time(self.last_summary, self.summary_hours, self.summary_at)
+        if due is not None:
+            until_retry = self.summary_retry_at - time.monotonic()
+            timeout = min(timeout, max((due - datetime.now()).total_seconds(), until_retry, 1.0))
+        if self.ingest_retry_at:
+            timeout = min(timeout, max(self.ingest_retry_at - time.monotonic(), 1.0))
+        return timeout
+
+    def ingest_retry_due(self) -> bool:
+        """Whether the alerts a failed batch left unread should be searched for again."""
+        return bool(self.ingest_retry_at) and time.monotonic() >= self.ingest_retry_at
+
+    def collect_batch(self) -> None:
+        """After the first new alert, keep listening for batch_seconds so later arrivals join the batch."""
+        deadline = time.monotonic() + self.batch_seconds
+        while time.monotonic() < deadline:
+            idle_wait(self.mail, deadline - time.monotonic())
+
+    def run(self, stop: threading.Event = None) -> None:
+        """Watch until KeyboardInterrupt (or SIGTERM mapped to it) or until stop is set."""
+        stop = stop or threading.Event()
+        delay = 1.0
+        new_mail = True
+        try:
+            while not stop.is_set():
+                try:
+                    if self.mail is None:
+                        self.connect()
+                        # Catch up on anything that arrived while disconnected
+                        new_mail = True
+                    if new_mail:
+                        self.ingest()
+                        delay = 1.0
+                    self.maybe_summarize()
+                    new_mail = idle_wait(self.mail, self.idle_timeout())
+                    if new_mail:
+                        self.collect_batch()
+                    elif self.ingest_retry_due():
+                        new_mail = True
+                except CONNECTION_ERRORS as e:
+                    self.drop()
+                    metrics.count("watch.reconnects")
+                    logger.warning(f"IMAP connection lost ({type(e).__name__}: {e}). Reconnecting in {delay:.0f}s.")
+                    stop.wait(delay)
+                    delay = min(delay * 2, WATCH_RECONNECT_MAX_SECONDS)
+        except KeyboardInterrupt:
+            logger.info("Stopping watch mode.")
+            # Interrupted mid-command (usually inside IDLE), so don't wait for the server's replies
+            self.drop()
+        finally:
+            self.disconnect()
+            self.write_profile()
+        logger.info(f"Watch mode processed {self.batches} batches and wrote {self.summaries} summaries.")
+
+    def write_profile(self) -> None:
+        """Save what was recorded since the last summary, which no run profile covers yet."""
+        snapshot = metrics.snapshot()
+        if not snapshot["timers"] and not snapshot["counters"]:
+            return
+        path = write_profile(PROFILE_DIR, {"batches": self.batches, "summaries": self.summaries}, name="watch_profile")
+        logger.info(f"Watch profile written to {path}")
@@ -0,0 +1,22 @@
+# tests/conftest.py
+import os
+import pytest
+from src.data_store import db_handler
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    """Run from the repository root, where the relative data/ and config paths resolve."""
+    monkeypatch.chdir(REPO_ROOT)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """An empty article store in tmp_path instead of data/."""
+    db_handler.close_connection()
+    monkeypatch.setattr(db_handler, "DB_FILE_PATH", str(tmp_path / "articles.db"))
+    monkeypatch.setattr(db_handler, "DATA_FILE_PATH", str(tmp_path / "articles.json"))
+    yield tmp_path
+    db_handler.close_connection()
@@ -0,0 +1,38 @@
+# tests/test_batching.py
+from src.benchmarks.fixtures import synthetic_articles
+from src.summarizer.batching import count_tokens, pack_batches, pack_groups, prompt_budget
+from src.summarizer.prompt_builder import build_prompt
+
+SYSTEM = "You are a helpful and knowledgeable assistant."
+CONTEXT_TOKENS = 4000
+MAX_TOKENS = 600
+INSTRUCTIONS = "You write for a sleep research lab that studies insomnia, circadian rhythms and apnea. " * 12
+
+
+def request_tokens(batch, topics=None, profile_instructions=None):
+    prompt = build_prompt(batch, topics, profile_instructions=profile_instructions)
+    return count_tokens(prompt) + count_tokens(SYSTEM) + MAX_TOKENS
+
+
+def test_budget_counts_topics_and_profile_instructions():
+    plain = prompt_budget(SYSTEM, CONTEXT_TOKENS, MAX_TOKENS)
+    topics = ["wearable sleep staging", "digital phenotyping of depression"]
+    assert prompt_budget(SYSTEM, CONTEXT_TOKENS, MAX_TOKENS, topics=topics) < plain
+    assert prompt_budget(SYSTEM, CONTEXT_TOKENS, MAX_TOKENS, profile_instructions=INSTRUCTIONS) < plain
+
+
+def test_packed_batches_fit_with_profile_instructions():
+    articles = synthetic_articles(60, distinct=True)
+    batches = pack_batches(articles, SYSTEM, CONTEXT_TOKENS, MAX_TOKENS, profile_instructions=INSTRUCTIONS)
+    assert sum(len(batch) for batch in batches) == len(articles)
+    for batch in batches:
+        assert request_tokens(batch, profile_instructions=INSTRUCTIONS) <= CONTEXT_TOKENS
+
+
+def test_packed_groups_fit_with_their_topic_labels():
+    articles = synthetic_articles(60, distinct=True)
+    groups = [(f"topic {i} " + "with a long descriptive label " * 4, articles[i::6]) for i in range(6)]
+    batches = pack_groups(groups, SYSTEM, CONTEXT_TOKENS, MAX_TOKENS, profile_instructions=INSTRUCTIONS)
+    assert sum(len(batch) for _, batch in batches) == len(articles)
+    for labels, batch in batches:
+        assert request_tokens(batch, labels, INSTRUCTIONS) <= CONTEXT_TOKENS
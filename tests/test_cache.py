@@ -0,0 +1,46 @@
+# tests/test_cache.py
+import sqlite3
+from src.utils import cache as cache_module
+from src.utils.cache import MISSING, PersistentCache
+
+
+def row_count(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+def test_lookup_distinguishes_missing_from_none(tmp_path):
+    cache = PersistentCache(str(tmp_path / "c.db"), name="test-none")
+    cache.set("negative", None)
+    assert cache.lookup("negative") is None
+    assert cache.lookup("absent") is MISSING
+    assert cache.contains("negative") and not cache.contains("absent")
+
+
+def test_hits_do_not_write(tmp_path):
+    cache = PersistentCache(str(tmp_path / "c.db"), name="test-reads")
+    cache.set("key", 1)
+    conn = cache._connect()
+    changes = conn.total_changes
+    for _ in range(10):
+        assert cache.get("key") == 1
+    assert conn.total_changes == changes
+
+
+def test_eviction_keeps_recently_used_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "TOUCH_INTERVAL_SECONDS", -1)
+    path = str(tmp_path / "c.db")
+    cache = PersistentCache(path, max_entries=3, name="test-lru")
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    cache.set("a", "a2")
+    assert cache.get("b") == "b"
+    cache.set("d", "d")
+    assert cache.lookup("c") is MISSING
+    assert cache.get("a") == "a2" and cache.get("b") == "b"
+    assert row_count(path) == 3
+    cache.close()
+    # The row count is read back from the file on the next connect
+    cache = PersistentCache(path, max_entries=3, name="test-lru")
+    cache.set("f", "f")
+    assert row_count(path) == 3
@@ -0,0 +1,21 @@
+# tests/test_cli.py
+import argparse
+import logging
+from src import cli
+from src.data_store.db_handler import load_articles, store_articles
+from src.enrichment import crossref
+
+
+def test_enrich_counts_articles_that_gained_a_doi(store, monkeypatch, caplog):
+    store_articles([{"title": "Passive sensing of mood in bipolar disorder", "link": "https://example.org/1"},
+                    {"title": "Keyboard dynamics and depressive symptoms", "link": "https://example.org/2"}])
+
+    def enrich(articles):
+        articles[0]["doi"] = "10.5555/example.1"
+        return articles
+
+    monkeypatch.setattr(crossref, "enrich_articles", enrich)
+    with caplog.at_level(logging.INFO, logger="scholar_summarizer"):
+        assert cli.cmd_enrich(argparse.Namespace(all=False, limit=0)) == 0
+    assert "Updated 2 articles; 1 gained or changed a DOI." in caplog.text
+    assert load_articles()[0]["doi"] == "10.5555/example.1"
@@ -0,0 +1,67 @@
+# tests/test_crossref_concurrency.py
+import copy
+import time
+import pytest
+from src.benchmarks.fake_services import CrossRefStub
+from src.benchmarks.fixtures import crossref_item, synthetic_articles, synthetic_crossref_responses
+from src.enrichment import crossref
+from src.utils.cache import PersistentCache
+from src.utils.http import HostRateLimiter
+from src.utils.text import normalize_title
+
+ARTICLES = 16
+LATENCY = 0.1
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    articles = synthetic_articles(ARTICLES, distinct=True)
+    server = CrossRefStub(synthetic_crossref_responses(articles), latency=LATENCY)
+    port = server.start()
+    monkeypatch.setattr(crossref, "CROSSREF_API_URL", f"http://127.0.0.1:{port}/works")
+    monkeypatch.setattr(crossref, "CROSSREF_MAILTO", "")
+    monkeypatch.setattr(crossref, "_rate_limiter", HostRateLimiter(0))
+    monkeypatch.setattr(crossref, "_session", None)
+    yield articles
+    server.stop()
+
+
+def enrich_uncached(articles, tmp_path, name, max_workers):
+    """Enrich copies of articles against an empty cache and return them with the wall time."""
+    crossref._cache = PersistentCache(str(tmp_path / f"{name}.db"), name=f"test-{name}")
+    articles = copy.deepcopy(articles)
+    start = time.perf_counter()
+    enriched = crossref.enrich_articles(articles, max_workers=max_workers)
+    return enriched, time.perf_counter() - start
+
+
+def test_concurrent_enrichment_overlaps_requests(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(crossref, "_cache", None)
+    enriched, elapsed = enrich_uncached(stub, tmp_path, "concurrent", max_workers=8)
+    assert elapsed < ARTICLES * LATENCY / 2
+    assert all(article.get("doi") for article in enriched)
+
+
+def test_concurrent_enrichment_matches_sequential(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(crossref, "_cache", None)
+    concurrent, _ = enrich_uncached(stub, tmp_path, "concurrent", max_workers=8)
+    sequential, _ = enrich_uncached(stub, tmp_path, "sequential", max_workers=1)
+    assert concurrent == sequential
+
+
+def test_doi_with_a_comma_is_looked_up_on_its_own(tmp_path, monkeypatch):
+    articles = synthetic_articles(2, distinct=True)
+    dois = ["10.1002/(sici)1097-0258(19960315)15:5<445::aid-sim181>3.0.co;2-8,a", "10.5555/bench.plain"]
+    items = [crossref_item(article, doi) for article, doi in zip(articles, dois)]
+    server = CrossRefStub({normalize_title(a["title"]): [item] for a, item in zip(articles, items)})
+    port = server.start()
+    monkeypatch.setattr(crossref, "CROSSREF_API_URL", f"http://127.0.0.1:{port}/works")
+    monkeypatch.setattr(crossref, "CROSSREF_MAILTO", "")
+    monkeypatch.setattr(crossref, "_rate_limiter", HostRateLimiter(0))
+    monkeypatch.setattr(crossref, "_session", None)
+    monkeypatch.setattr(crossref, "_cache", PersistentCache(str(tmp_path / "dois.db"), name="test-dois"))
+    try:
+        records = crossref.lookup_dois(dois)
+    finally:
+        server.stop()
+    assert set(records) == set(dois)
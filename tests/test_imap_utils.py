@@ -0,0 +1,96 @@
+# tests/test_imap_utils.py
+import socket
+import time
+import imaplib
+import pytest
+from src.email_client.email_fetcher import _SocketLines
+from src.email_client.imap_utils import compress_uid_set, decode_part, find_html_part, parse_fetch_response
+
+# UID FETCH responses in the shape imaplib returns them, with Gmail-style BODYSTRUCTUREs
+# trimmed to the items the fetcher asks for.
+SINGLE_HTML = [
+    b'1 (UID 4101 BODYSTRUCTURE ("text" "html" ("charset" "UTF-8") NIL NIL "quoted-printable" 5210 104 '
+    b'NIL NIL NIL NIL))',
+]
+NESTED_MULTIPART = [
+    b'2 (UID 4102 BODYSTRUCTURE ((("text" "plain" ("charset" "utf-8") NIL NIL "7bit" 812 17 NIL NIL NIL NIL)'
+    b'("text" "html" ("charset" "iso-8859-1") NIL NIL "base64" 2440 32 NIL NIL NIL NIL) "alternative" '
+    b'("boundary" "000000000000b2") NIL NIL NIL)("application" "pdf" ("name" "alert (week 12).pdf") NIL NIL '
+    b'"base64" 10822 NIL ("attachment" ("filename" "alert (week 12).pdf")) NIL NIL) "mixed" '
+    b'("boundary" "000000000000b1") NIL NIL NIL))',
+]
+NO_HTML = [
+    b'3 (UID 4103 BODYSTRUCTURE (("text" "plain" ("charset" "utf-8") NIL NIL "7bit" 812 17 NIL NIL NIL NIL)'
+    b'("application" "pdf" ("name" "paper.pdf") NIL NIL "base64" 10822 NIL NIL NIL NIL) "mixed" '
+    b'("boundary" "000000000000c1") NIL NIL NIL))',
+]
+# Two messages' bodies in one response: each literal arrives as its own (header, data) tuple,
+# and the text between and after them as the following chunks
+SPLIT_LITERALS = [
+    (b'1 (UID 4101 BODY[1.2] {14}', b'<p>one (1)</p>'),
+    b')',
+    (b'2 (UID 4102 BODY[1] {19}', b'<p>two "quoted"</p>'),
+    b' FLAGS (\\Seen))',
+]
+
+
+def test_single_part_html_is_section_1():
+    [message] = parse_fetch_response(SINGLE_HTML)
+    assert message[b"UID"] == b"4101"
+    assert find_html_part(message[b"BODYSTRUCTURE"]) == ("1", "quoted-printable", "UTF-8")
+
+
+def test_html_inside_alternative_inside_mixed():
+    [message] = parse_fetch_response(NESTED_MULTIPART)
+    assert find_html_part(message[b"BODYSTRUCTURE"]) == ("1.2", "base64", "iso-8859-1")
+
+
+def test_quoted_strings_keep_their_parentheses():
+    [message] = parse_fetch_response(NESTED_MULTIPART)
+    attachment = message[b"BODYSTRUCTURE"][1]
+    assert attachment[2] == [b"name", b"alert (week 12).pdf"]
+    assert attachment[8] == [b"attachment", [b"filename", b"alert (week 12).pdf"]]
+
+
+def test_escaped_quote_in_string():
+    [message] = parse_fetch_response([b'1 (UID 7 ENVELOPE ("say \\"hi\\" (now)"))'])
+    assert message[b"ENVELOPE"] == [b'say "hi" (now)']
+
+
+def test_missing_html_part():
+    [message] = parse_fetch_response(NO_HTML)
+    assert find_html_part(message[b"BODYSTRUCTURE"]) is None
+    assert find_html_part(None) is None
+
+
+def test_literals_split_across_response_items():
+    first, second = parse_fetch_response(SPLIT_LITERALS)
+    assert (first[b"UID"], first[b"BODY[1.2]"]) == (b"4101", b"<p>one (1)</p>")
+    assert (second[b"UID"], second[b"BODY[1]"]) == (b"4102", b'<p>two "quoted"</p>')
+    assert second[b"FLAGS"] == [b"\\Seen"]
+
+
+def test_decode_part():
+    assert decode_part(b"PHA+w6k8L3A+", "base64", "utf-8") == "<p>é</p>"
+    assert decode_part(b"<p>=E9t=E9</p>", "quoted-printable", "iso-8859-1") == "<p>été</p>"
+    assert decode_part(b"<p>x</p>", "7bit", "x-unknown") == "<p>x</p>"
+
+
+def test_compress_uid_set():
+    assert compress_uid_set([b"10", 1, 2, 3, 7, 9]) == "1:3,7,9:10"
+
+
+def test_socket_lines_joins_a_line_split_across_reads():
+    server, client = socket.socketpair()
+    try:
+        lines = _SocketLines(client)
+        server.sendall(b"* 12 EXI")
+        assert lines.readline(time.monotonic() + 0.05) is None
+        server.sendall(b"STS\r\n+ idling\r\n")
+        assert lines.readline(time.monotonic() + 1) == b"* 12 EXISTS"
+        assert lines.readline(time.monotonic() + 1) == b"+ idling"
+        server.close()
+        with pytest.raises(imaplib.IMAP4.abort):
+            lines.readline(time.monotonic() + 1)
+    finally:
+        client.close()
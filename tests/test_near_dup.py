@@ -0,0 +1,60 @@
+# tests/test_near_dup.py
+from src.data_store.db_handler import count_articles, find_near_duplicate_id, store_articles
+from src.data_store.near_dup import same_paper, titles_conflict
+from src.utils.text import normalize_title
+
+
+def article(title, link, authors=("M Example", "N Sample"), year="2024"):
+    return {"title": title, "link": link, "authors": list(authors), "year": year, "snippet": "", "source": ""}
+
+
+CBT_ADULTS = "Cognitive behavioral therapy for insomnia in adults with depression: a randomized controlled trial"
+CBT_ADOLESCENTS = CBT_ADULTS.replace("adults", "adolescents")
+REVIEW = "Machine learning for passive sensing of mental health: a systematic review. Part {}"
+
+
+def test_titles_conflict_on_numbers_and_populations():
+    assert titles_conflict(normalize_title(CBT_ADULTS), normalize_title(CBT_ADOLESCENTS))
+    assert titles_conflict(normalize_title(REVIEW.format(1)), normalize_title(REVIEW.format(2)))
+    assert titles_conflict(normalize_title(REVIEW.format("I")), normalize_title(REVIEW.format("II")))
+    assert not titles_conflict("wearable sensing of sleep behaviour", "wearable sensing of sleep behavior")
+
+
+def test_same_paper_needs_first_author_and_year():
+    preprint = article("Wearable sensing of sleep behaviour in depression", "a", year="2023")
+    assert same_paper(article("Wearable sensing of sleep behavior in depression", "b"), preprint)
+    assert not same_paper(article("Wearable sensing of sleep behavior in depression", "b",
+                                  authors=["Q Other", "M Example"]), preprint)
+    assert not same_paper(article("Wearable sensing of sleep behavior in depression", "b", year="2021"), preprint)
+    assert not same_paper(article("Wearable sensing of sleep behavior in depression", "b", authors=[]), preprint)
+
+
+def test_different_populations_are_not_merged(store):
+    store_articles([article(CBT_ADULTS, "https://example.org/adults")])
+    adolescents = article(CBT_ADOLESCENTS, "https://example.org/adolescents")
+    assert find_near_duplicate_id(adolescents) is None
+    assert len(store_articles([adolescents])) == 1
+    assert count_articles() == 2
+
+
+def test_parts_of_a_series_are_not_merged(store):
+    store_articles([article(REVIEW.format(1), "https://example.org/part-1")])
+    assert len(store_articles([article(REVIEW.format(2), "https://example.org/part-2")])) == 1
+    assert count_articles() == 2
+
+
+def test_same_title_by_other_authors_is_not_merged(store):
+    store_articles([article(CBT_ADULTS, "https://example.org/first")])
+    other = article(CBT_ADULTS, "https://example.org/second", authors=["Q Other"])
+    assert len(store_articles([other])) == 1
+    assert count_articles() == 2
+
+
+def test_spelling_variant_of_the_same_paper_is_merged(store):
+    store_articles([article("Wearable sensing of sleep behaviour in adolescents with depression",
+                            "https://arxiv.org/abs/2401.00001", year="2023")])
+    published = article("Wearable sensing of sleep behavior in adolescents with depression",
+                        "https://doi.org/10.5555/example.1")
+    assert find_near_duplicate_id(published) is not None
+    assert store_articles([published]) == []
+    assert count_articles() == 1
@@ -0,0 +1,72 @@
+# tests/test_parser_golden.py
+import glob
+import os
+import threading
+import pytest
+from src.email_client import email_parser
+from src.email_client.email_parser import (
+    parse_scholar_alert_fast, parse_scholar_alert_reference, parse_scholar_alerts, shutdown_parse_pool,
+)
+
+# Saved alerts with names, titles and links replaced
+ALERTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "alerts")
+ALERT_FILES = sorted(glob.glob(os.path.join(ALERTS_DIR, "*.html")))
+
+
+def load_alert(name):
+    with open(os.path.join(ALERTS_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("path", ALERT_FILES, ids=os.path.basename)
+def test_fast_parser_matches_reference(path):
+    with open(path, "r", encoding="utf-8") as f:
+        body = f.read()
+    fast = parse_scholar_alert_fast(body)
+    assert fast
+    assert fast == parse_scholar_alert_reference(body)
+
+
+def test_missing_author_div_does_not_borrow_the_next_article():
+    erratum, paper = parse_scholar_alert_fast(load_alert("missing_author_mid.html"))
+    assert (erratum["authors"], erratum["source"], erratum["year"]) == ([], "", "")
+    assert erratum["snippet"].startswith("An author name was misspelled")
+    assert paper["authors"] == ["W Example", "X Sample"]
+
+
+def test_missing_snippet_div_does_not_borrow_the_next_article():
+    first, second, correction = parse_scholar_alert_fast(load_alert("missing_author_last.html"))
+    assert first["snippet"] == ""
+    assert second["snippet"].startswith("Ambient light sensor data")
+    assert correction["authors"] == [] and correction["snippet"].startswith("The original version")
+
+
+def test_non_ascii_titles_and_authors():
+    articles = parse_scholar_alert_fast(load_alert("non_ascii_titles.html"))
+    assert articles[1]["title"] == "基于可穿戴设备的睡眠监测在抑郁症患者中的应用"
+    assert articles[2]["title"] == ("Rythme veille–sommeil, α-synucléine & déclin cognitif : "
+                                    "étude « SOMNO-Exemple »")
+    assert articles[0]["authors"] == ["J Müller", "K Größer", "L Ñúñez"]
+
+
+def test_pdf_links_and_markers():
+    thesis, paper, book = parse_scholar_alert_fast(load_alert("pdf_links.html"))
+    assert thesis["link"] == ("https://repository.example.edu/bitstream/handle/1234/5678/"
+                              "thesis_final (2).pdf?sequence=1&isAllowed=y")
+    assert paper["link"] == "https://www.example-proceedings.org/papers/2024/ema_wearables.pdf"
+    assert paper["title"] == "Combining EMA and wearables: lessons from three field deployments"
+    assert book["link"] == "https://books.example.com/books?id=AbCdEf&pg=PA12"
+
+
+def test_pool_parses_from_a_worker_thread_without_fork(monkeypatch):
+    monkeypatch.setattr(email_parser, "PARSE_POOL_MIN_EMAILS", 1)
+    bodies = [load_alert(os.path.basename(path)) for path in ALERT_FILES] * 2
+    results = []
+    thread = threading.Thread(target=lambda: results.append(parse_scholar_alerts(bodies, workers=2)))
+    thread.start()
+    thread.join(timeout=60)
+    try:
+        assert email_parser._pool._mp_context.get_start_method() != "fork"
+    finally:
+        shutdown_parse_pool()
+    assert results == [[parse_scholar_alert_fast(body) for body in bodies]]
@@ -0,0 +1,61 @@
+# tests/test_pipeline.py
+import pytest
+from src import pipeline
+from src.data_store import db_handler
+from src.benchmarks.fixtures import render_alert_html, synthetic_articles
+from src.data_store.dedup import KnownArticleIndex
+from src.pipeline import IngestStats, process_emails
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """No CrossRef: articles pass through enrichment unchanged."""
+    monkeypatch.setattr(pipeline, "enrich_articles", lambda articles: articles)
+
+
+def test_failed_batch_is_not_counted_as_processed(store, offline, monkeypatch):
+    def fail(articles):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pipeline, "store_articles", fail)
+    articles = synthetic_articles(6, distinct=True)
+    bodies = [render_alert_html(articles[:3]), render_alert_html(articles[3:])]
+    stats = IngestStats()
+    with pytest.raises(OSError):
+        process_emails(bodies, KnownArticleIndex(), stats)
+    assert (stats.emails, stats.parsed, stats.stored) == (0, 0, 0)
+
+
+def test_stored_batch_is_counted(store, offline):
+    articles = synthetic_articles(6, distinct=True)
+    bodies = [render_alert_html(articles[:3]), render_alert_html(articles[3:])]
+    stats = IngestStats()
+    stored = process_emails(bodies, KnownArticleIndex(), stats)
+    assert len(stored) == 6
+    assert (stats.emails, stats.parsed, stats.stored) == (2, 6, 6)
+
+
+def alert_article(title, link, year):
+    return {"title": title, "link": link, "authors": ["M Example", "N Sample"], "snippet": "Abstract.",
+            "publication_date": f"{year}-01-01"}
+
+
+def test_published_version_is_merged_into_the_preprint_across_runs(store, offline):
+    preprint = alert_article("Wearable sensing of sleep behaviour in adolescents with depression",
+                             "https://osf.io/preprints/psyarxiv/abc12", 2023)
+    published = alert_article("Wearable sensing of sleep behavior in adolescents with depression",
+                              "https://doi.org/10.5555/example.1", 2024)
+    same_title = alert_article(published["title"], "https://pubmed.example.org/12345", 2024)
+
+    first_run = IngestStats()
+    assert len(process_emails([render_alert_html([preprint])], KnownArticleIndex.load(), first_run)) == 1
+
+    second_run = IngestStats()
+    stored = process_emails([render_alert_html([published, same_title])], KnownArticleIndex.load(), second_run)
+    assert stored == [] and second_run.enriched == 0
+
+    [record] = db_handler.load_articles()
+    assert record["link"] == preprint["link"]
+    assert record["alternate_links"] == [published["link"], same_title["link"]]
+    assert record["doi"] == "10.5555/example.1"
+    assert KnownArticleIndex.load().is_known(same_title)
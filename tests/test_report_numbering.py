@@ -0,0 +1,78 @@
+# tests/test_report_numbering.py
+import re
+import pytest
+from src.benchmarks.fixtures import synthetic_articles
+from src.renderer.report_generator import StreamingReport
+from src.summarizer import summarizer
+from src.summarizer.prompt_builder import renumber_citations
+
+REPLY = "Category A (Article 1, Example; Articles 2 and 3) and Articles 1–{n}. Article {n}: a summary of 2024 data."
+
+
+def test_renumber_citations():
+    text = "See (Article 2, Smith), Articles 1, 3 and 4, Articles 1–3. Article 3: 2024 cohort, 12 sites."
+    assert renumber_citations(text, 10) == (
+        "See (Article 12, Smith), Articles 11, 13 and 14, Articles 11–13. Article 13: 2024 cohort, 12 sites."
+    )
+    assert renumber_citations(text, 0) == text
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 7, 50])
+def test_streamed_section_is_renumbered_like_the_whole_text(tmp_path, chunk):
+    text = REPLY.format(n=5) * 20
+    report = StreamingReport(str(tmp_path))
+    report.begin(["first", "second"], synthetic_articles(12), [7, 5])
+    writer = report.open_section(1)
+    for i in range(0, len(text), chunk):
+        writer.write(text[i:i + chunk])
+    writer.close()
+    with open(report.abort("stop"), encoding="utf-8") as f:
+        assert renumber_citations(text, 7) in f.read()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Record every prompt; replies cite the batch's articles by their numbers in the prompt."""
+    prompts = []
+
+    def chat_completion(prompt, on_token=None):
+        prompts.append(prompt)
+        numbers = re.findall(r"^\*\*Article (\d+):\*\*", prompt, flags=re.MULTILINE)
+        reply = REPLY.format(n=numbers[-1]) if numbers else "Synthesis."
+        if on_token:
+            for i in range(0, len(reply), 4):
+                on_token(reply[i:i + 4])
+        return reply
+
+    monkeypatch.setattr(summarizer, "chat_completion", chat_completion)
+    # One request per topic group, as if each group filled a context window
+    monkeypatch.setattr(summarizer, "pack_groups", lambda groups, *args, **kwargs: [([l], a) for l, a in groups])
+    return prompts
+
+
+def test_batch_prompts_survive_an_insert_into_an_earlier_batch(fake_llm, tmp_path):
+    articles = synthetic_articles(13, distinct=True)
+    groups = [("sleep", articles[0:4]), ("speech", articles[4:8]), ("mobility", articles[8:12])]
+    summarizer.summarize_articles(articles[:12], groups)
+    first_run = set(fake_llm)
+    fake_llm.clear()
+
+    groups[0] = ("sleep", articles[0:4] + [articles[12]])
+    report = StreamingReport(str(tmp_path))
+    summarizer.summarize_articles(articles, groups, report=report)
+    batch_prompts = fake_llm[:3]
+    assert [prompt in first_run for prompt in batch_prompts] == [False, True, True]
+
+    # The report cites the second batch's articles by their reference numbers, 6-9
+    path = report.finish()
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert "(Article 6, Example; Articles 7 and 8) and Articles 6–9. Article 9:" in text
+
+
+def test_reports_started_in_the_same_second_get_their_own_files(tmp_path):
+    first = StreamingReport(output_dir=str(tmp_path))
+    second = StreamingReport(output_dir=str(tmp_path))
+    first.abort("stopped")
+    second.abort("stopped")
+    assert first.path != second.path
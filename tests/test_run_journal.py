@@ -0,0 +1,22 @@
+# tests/test_run_journal.py
+from src.data_store.run_journal import RunJournal
+from src.summarizer import summarizer
+
+
+def test_only_reused_llm_calls_count_as_resumed(store):
+    journal = RunJournal.start({})
+    journal.record("summary", "the summary")
+    journal.record("report_sections", "[]")
+    assert journal.lookup("summary") == "the summary"
+    assert journal.lookup("report_sections") == "[]"
+    assert journal.resumed_results == 0
+
+    params = {"max_tokens": summarizer.SUMMARY_MAX_TOKENS, "temperature": summarizer.TEMPERATURE}
+    key = summarizer.response_cache_key(summarizer.OPENAI_MODEL, params, summarizer.SYSTEM_MESSAGE, "prompt")
+    journal.record(key, "saved reply")
+    summarizer.set_checkpoint(journal)
+    try:
+        assert summarizer.chat_completion("prompt") == "saved reply"
+    finally:
+        summarizer.set_checkpoint(None)
+    assert journal.resumed_results == 1
@@ -0,0 +1,74 @@
+# tests/test_watcher.py
+import imaplib
+import threading
+import pytest
+from src import watcher
+from src.data_store.dedup import KnownArticleIndex
+from src.watcher import Watcher
+
+
+@pytest.mark.parametrize("error", [imaplib.IMAP4.abort("socket error: EOF"), OSError("connection reset")])
+def test_interrupted_batch_reloads_the_known_index(store, monkeypatch, error):
+    def ingest_new_articles(mail, known_index, stats):
+        known_index.add({"link": "https://example.org/unstored", "title": "An article that was never stored"})
+        raise error
+
+    monkeypatch.setattr(watcher, "ingest_new_articles", ingest_new_articles)
+    watch = Watcher({})
+    watch.known_index = KnownArticleIndex()
+    with pytest.raises(type(error)):
+        watch.ingest()
+    assert watch.known_index is None
+
+
+def test_clean_batch_keeps_the_known_index(store, monkeypatch):
+    monkeypatch.setattr(watcher, "ingest_new_articles", lambda mail, known_index, stats: [])
+    watch = Watcher({})
+    index = watch.known_index = KnownArticleIndex()
+    watch.ingest()
+    assert watch.known_index is index
+
+
+def test_failed_emails_are_retried_without_new_mail(store, monkeypatch):
+    stop = threading.Event()
+    calls = []
+
+    def ingest_new_articles(mail, known_index, stats):
+        calls.append(mail)
+        if len(calls) == 1:
+            # A CrossRef outage, say: the email fails and stays unread
+            stats.emails = stats.failed_emails = 1
+        else:
+            stop.set()
+        return []
+
+    monkeypatch.setattr(watcher, "ingest_new_articles", ingest_new_articles)
+    monkeypatch.setattr(watcher, "open_scholar_mailbox", lambda: "mailbox")
+    monkeypatch.setattr(watcher, "close_mailbox", lambda mail: None)
+    waits = []
+
+    def idle_wait(mail, timeout):
+        # No new mail ever arrives; give up rather than spin if the retry never comes
+        waits.append(timeout)
+        if len(waits) > 3:
+            stop.set()
+        return False
+
+    monkeypatch.setattr(watcher, "idle_wait", idle_wait)
+    monkeypatch.setattr(watcher, "INGEST_RETRY_SECONDS", 0)
+    watch = Watcher({}, summary_hours=0)
+    watch.run(stop)
+    assert len(calls) == 2
+    assert not watch.ingest_retry_at
+
+
+def test_failed_emails_shorten_the_idle_timeout(store, monkeypatch):
+    def ingest_new_articles(mail, known_index, stats):
+        stats.emails = stats.failed_emails = 1
+        return []
+
+    monkeypatch.setattr(watcher, "ingest_new_articles", ingest_new_articles)
+    watch = Watcher({}, summary_hours=0, idle_seconds=3600)
+    watch.ingest()
+    assert not watch.ingest_retry_due()
+    assert watch.idle_timeout() <= watcher.INGEST_RETRY_SECONDS